@@ -1,13 +1,69 @@
+from datetime import date
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.db.session import get_db
-from app.services.calculator import CustomsCalculator, CalculationInput
+from app.core.config import settings
+from app.crud.country import country_registry_store
+from app.db.session import get_db, read_session_pool
+from app.services.calculator import CustomsCalculator, CalculationInput, CalculationResult
+from app.services.rate_book import rate_book_store, load_scoped_rate_book
+from app.services.result_cache import (
+    calculation_cache,
+    calculation_key,
+    db_snapshot_matches,
+    get_reference_versions,
+    snapshot_version,
+)
+from app.services.single_flight import calculation_flight
 
 router = APIRouter()
 
 
+async def _make_calculator(db: AsyncSession) -> CustomsCalculator:
+    """RateBook yoqilgan bo'lsa - xotiradan, aks holda bazadan hisoblaydigan kalkulyator"""
+    if settings.USE_RATE_BOOK:
+        return CustomsCalculator(rate_book=await rate_book_store.get(db))
+    if read_session_pool is not None:
+        return CustomsCalculator(db, read_sessions=read_session_pool)
+    return CustomsCalculator(db)
+
+
+async def _calculate_cached(
+    db: AsyncSession,
+    calc_input: CalculationInput,
+    response: Response
+) -> CalculationResult:
+    """
+    Natija keshda bo'lsa - qaytarish, aks holda hisoblab saqlash. Javob sarlavhasi: X-Cache.
+    Bir xil kirish bilan parallel kelgan so'rovlar bitta hisoblashni kutadi.
+    """
+    # Kalit hisoblash ishlatadigan holatdan: RateBook rejimida - aynan shu kitob versiyalari
+    if settings.USE_RATE_BOOK:
+        book = await rate_book_store.get(db)
+        versions, as_of = book.versions, book.as_of
+    else:
+        book = None
+        versions, as_of = await get_reference_versions(db), date.today()
+    key = calculation_key(calc_input, snapshot_version(versions, as_of))
+    if calculation_cache.enabled:
+        result = calculation_cache.get(key)
+        if result is not None:
+            response.headers["X-Cache"] = "HIT"
+            return result
+        response.headers["X-Cache"] = "MISS"
+    
+    async def calculate() -> CalculationResult:
+        calculator = CustomsCalculator(rate_book=book) if book is not None else await _make_calculator(db)
+        result = await calculator.calculate(calc_input)
+        # DB rejimida hisoblash davomida ma'lumotnoma o'zgargan bo'lsa - kalitga mos emas
+        if book is not None or await db_snapshot_matches(db, versions, as_of):
+            calculation_cache.put(key, result)
+        return result
+    
+    return await calculation_flight.do(key, calculate)
+
+
 class CalculateRequest(BaseModel):
     code: str = Field(..., description="TN VED kodi (10 raqam)", min_length=2, max_length=10)
     price: float = Field(..., description="Tovar narxi (invoys)", gt=0)
@@ -47,9 +103,54 @@ class CalculationResponse(BaseModel):
     sync_info: Optional[str] = "TN VED kodlar va tariflar incustoms.ai dan sinxronlangan"
 
 
+def _to_calculation_input(payload: CalculateRequest) -> CalculationInput:
+    return CalculationInput(
+        tnved_code=payload.code,
+        price=payload.price,
+        currency_code=payload.currency,
+        weight_kg=payload.weight,
+        quantity=payload.quantity,
+        country_origin=payload.country_origin,
+        has_origin_certificate=payload.has_certificate,
+        delivery_cost=payload.delivery_cost,
+        insurance_cost=payload.insurance_cost,
+        engine_volume_cc=payload.engine_volume,
+        vehicle_age_years=payload.vehicle_age
+    )
+
+
+def _to_calculation_response(result: CalculationResult) -> CalculationResponse:
+    return CalculationResponse(
+        customs_value_uzs=round(result.customs_value_uzs, 2),
+        customs_value_usd=round(result.customs_value_usd, 2),
+        payments=[
+            PaymentItemResponse(
+                name=p.name,
+                name_uz=p.name_uz,
+                base=round(p.base, 2),
+                rate=p.rate,
+                rate_type=p.rate_type,
+                amount=round(p.amount, 2),
+                note=p.note
+            )
+            for p in result.payments
+        ],
+        total_uzs=round(result.total_uzs, 2),
+        total_usd=round(result.total_usd, 2),
+        effective_rate_percent=result.effective_rate_percent,
+        exchange_rate=result.exchange_rate,
+        duty_rate_type=result.duty_rate_type.value,
+        details=result.details,
+        warnings=result.warnings,
+        data_source="incustoms.ai",
+        sync_info="TN VED kodlar va tariflar incustoms.ai dan sinxronlangan (14,033 kod)"
+    )
+
+
 @router.post("/calculate", response_model=CalculationResponse)
 async def calculate_customs(
     payload: CalculateRequest,
+    response: Response,
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -67,47 +168,8 @@ async def calculate_customs(
     - **vehicle_age**: Avtomobil yoshi (yil) - avtomobillar uchun
     """
     try:
-        calc_input = CalculationInput(
-            tnved_code=payload.code,
-            price=payload.price,
-            currency_code=payload.currency,
-            weight_kg=payload.weight,
-            quantity=payload.quantity,
-            country_origin=payload.country_origin,
-            has_origin_certificate=payload.has_certificate,
-            delivery_cost=payload.delivery_cost,
-            insurance_cost=payload.insurance_cost,
-            engine_volume_cc=payload.engine_volume,
-            vehicle_age_years=payload.vehicle_age
-        )        
-        calculator = CustomsCalculator(db)
-        result = await calculator.calculate(calc_input)
-        
-        return CalculationResponse(
-            customs_value_uzs=round(result.customs_value_uzs, 2),
-            customs_value_usd=round(result.customs_value_usd, 2),
-            payments=[
-                PaymentItemResponse(
-                    name=p.name,
-                    name_uz=p.name_uz,
-                    base=round(p.base, 2),
-                    rate=p.rate,
-                    rate_type=p.rate_type,
-                    amount=round(p.amount, 2),
-                    note=p.note
-                )
-                for p in result.payments
-            ],
-            total_uzs=round(result.total_uzs, 2),
-            total_usd=round(result.total_usd, 2),
-            effective_rate_percent=result.effective_rate_percent,
-            exchange_rate=result.exchange_rate,
-            duty_rate_type=result.duty_rate_type.value,
-            details=result.details,
-            warnings=result.warnings,
-            data_source="incustoms.ai",
-            sync_info="TN VED kodlar va tariflar incustoms.ai dan sinxronlangan (14,033 kod)"
-        )
+        result = await _calculate_cached(db, _to_calculation_input(payload), response)
+        return _to_calculation_response(result)
         
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -115,6 +177,101 @@ async def calculate_customs(
         raise HTTPException(status_code=500, detail=f"Hisoblash xatosi: {str(e)}")
 
 
+class BatchCalculateRequest(BaseModel):
+    items: List[CalculateRequest] = Field(..., description="Deklaratsiya tovar qatorlari", min_length=1, max_length=1000)
+
+
+class BatchLineResult(BaseModel):
+    index: int
+    code: str
+    result: Optional[CalculationResponse] = None
+    error: Optional[str] = None
+
+
+class BatchTotals(BaseModel):
+    customs_value_uzs: float
+    customs_fee: float
+    duty: float
+    excise: float
+    vat: float
+    utilization: float
+    total_uzs: float
+    total_usd: float
+    lines_ok: int
+    lines_failed: int
+
+
+class BatchCalculationResponse(BaseModel):
+    lines: List[BatchLineResult]
+    totals: BatchTotals
+
+
+@router.post("/calculate/batch", response_model=BatchCalculationResponse)
+async def calculate_customs_batch(
+    payload: BatchCalculateRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Ko'p qatorli deklaratsiya bo'yicha bojxona to'lovlarini hisoblash.
+    
+    Barcha TN VED kodlar, tariflar, valyuta kurslari va mamlakatlar bir martada olinadi,
+    keyin har bir qator alohida hisoblanadi. Qatordagi xato butun deklaratsiyani to'xtatmaydi.
+    """
+    try:
+        if settings.USE_RATE_BOOK:
+            book = await rate_book_store.get(db)
+        else:
+            book = await load_scoped_rate_book(
+                db,
+                tnved_codes=[item.code for item in payload.items],
+                currency_codes=[item.currency for item in payload.items],
+                country_codes=[item.country_origin for item in payload.items]
+            )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Hisoblash xatosi: {str(e)}")
+    
+    calculator = CustomsCalculator(rate_book=book)
+    lines: List[BatchLineResult] = []
+    sums = {"Customs Fee": 0.0, "Import Duty": 0.0, "Excise Tax": 0.0, "VAT (QQS)": 0.0, "Utilization Fee": 0.0}
+    customs_value_uzs = total_uzs = total_usd = 0.0
+    
+    for index, item in enumerate(payload.items):
+        try:
+            result = await calculator.calculate(_to_calculation_input(item))
+        except ValueError as e:
+            lines.append(BatchLineResult(index=index, code=item.code, error=str(e)))
+            continue
+        except Exception as e:
+            lines.append(BatchLineResult(index=index, code=item.code, error=f"Hisoblash xatosi: {str(e)}"))
+            continue
+        
+        for p in result.payments:
+            if p.name in sums:
+                sums[p.name] += p.amount
+        customs_value_uzs += result.customs_value_uzs
+        total_uzs += result.total_uzs
+        total_usd += result.total_usd
+        lines.append(BatchLineResult(index=index, code=item.code, result=_to_calculation_response(result)))
+    
+    lines_failed = sum(1 for line in lines if line.error)
+    
+    return BatchCalculationResponse(
+        lines=lines,
+        totals=BatchTotals(
+            customs_value_uzs=round(customs_value_uzs, 2),
+            customs_fee=round(sums["Customs Fee"], 2),
+            duty=round(sums["Import Duty"], 2),
+            excise=round(sums["Excise Tax"], 2),
+            vat=round(sums["VAT (QQS)"], 2),
+            utilization=round(sums["Utilization Fee"], 2),
+            total_uzs=round(total_uzs, 2),
+            total_usd=round(total_usd, 2),
+            lines_ok=len(lines) - lines_failed,
+            lines_failed=lines_failed
+        )
+    )
+
+
 class SimpleCalculateRequest(BaseModel):
     code: str
     price: float
@@ -136,11 +293,13 @@ class SimpleCalculationResult(BaseModel):
 @router.post("/calculate/simple", response_model=SimpleCalculationResult)
 async def calculate_customs_simple(
     payload: SimpleCalculateRequest,
+    response: Response,
     db: AsyncSession = Depends(get_db)
 ):
     try:
-        cis_countries = ["RU", "KZ", "KG", "TJ", "BY", "AM", "AZ", "MD", "UA", "GE"]
-        has_cert = payload.country_origin in cis_countries
+        # RNB (MDH) mamlakatlari uchun kelib chiqish sertifikati bor deb hisoblanadi
+        countries = await country_registry_store.get(db)
+        has_cert = countries.is_rnb(payload.country_origin)
         
         calc_input = CalculationInput(
             tnved_code=payload.code,
@@ -151,8 +310,7 @@ async def calculate_customs_simple(
             has_origin_certificate=has_cert
         )
         
-        calculator = CustomsCalculator(db)
-        result = await calculator.calculate(calc_input)
+        result = await _calculate_cached(db, calc_input, response)
         payments_dict = {p.name: p.amount for p in result.payments}
         
         return SimpleCalculationResult(
@@ -174,3 +332,9 @@ async def calculate_customs_simple(
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Hisoblash xatosi: {str(e)}")
+
+
+@router.get("/cache/stats")
+async def calculation_cache_stats() -> dict:
+    """Hisoblash natijalari keshi: hajmi va hit rate (sozlash uchun)"""
+    return {**calculation_cache.stats(), "single_flight": calculation_flight.stats()}
@@ -2,7 +2,7 @@ from typing import List, Any
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.session import get_db
-from app.crud.country import country, free_trade_country
+from app.crud.country import country, country_registry_store
 from app.schemas.country import Country, FreeTradeCountry
 
 router = APIRouter()
@@ -12,24 +12,28 @@ router = APIRouter()
 async def get_countries(
     db: AsyncSession = Depends(get_db)
 ) -> Any:
-    countries = await country.get_all_active(db)
-    return countries
+    registry = await country_registry_store.get(db)
+    return list(registry.countries.values())
 
 
 @router.get("/list", response_model=List[Country])
 async def get_countries_list(
     db: AsyncSession = Depends(get_db)
 ) -> Any:
-    countries = await country.get_all_active(db)
-    return countries
+    registry = await country_registry_store.get(db)
+    return list(registry.countries.values())
 
 
 @router.get("/search", response_model=List[Country])
 async def search_countries(
     q: str,
     db: AsyncSession = Depends(get_db),
-    limit: int = 20
+    limit: int = 20,
+    fuzzy: bool = False
 ) -> Any:
+    if fuzzy:
+        # Xato yozilgan nomlar uchun - trigram o'xshashligi bo'yicha
+        return await country.fuzzy_search(db, q=q, limit=limit)
     results = await country.search(db, q=q, limit=limit)
     return results
 
@@ -38,8 +42,8 @@ async def search_countries(
 async def get_free_trade_countries(
     db: AsyncSession = Depends(get_db)
 ) -> Any:
-    countries = await free_trade_country.get_all(db)
-    return countries
+    registry = await country_registry_store.get(db)
+    return list(registry.free_trade.values())
 
 
 @router.get("/check-free-trade/{country_code}")
@@ -47,12 +51,14 @@ async def check_free_trade(
     country_code: str,
     db: AsyncSession = Depends(get_db)
 ) -> dict:
-    is_free = await free_trade_country.is_free_trade(db, country_code=country_code)
-    ftc = await free_trade_country.get_by_code(db, country_code=country_code)
+    # Xotiradagi reestrdan: yozuv bo'lsa - erkin savdo zonasida
+    registry = await country_registry_store.get(db)
+    ftc = registry.get_free_trade(country_code)
     
     return {
         "country_code": country_code.upper(),
-        "is_free_trade": is_free,
+        "is_free_trade": ftc is not None,
+        "is_rnb": registry.is_rnb(country_code),
         "agreement_name": ftc.agreement_name if ftc else None,
         "requires_certificate": ftc.requires_certificate if ftc else None
     }
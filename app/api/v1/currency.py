@@ -1,10 +1,12 @@
 from typing import List, Any, Optional
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.db.session import get_db
+from app.db.session import get_db, get_write_db
 from app.crud.currency import currency
 from app.schemas.currency import Currency
 from app.parsers.currency_updater import currency_updater
+from app.services.rate_book import rate_book_store
+from app.services.result_cache import invalidate_calculation_cache
 
 router = APIRouter()
 
@@ -59,7 +61,7 @@ async def get_rate(
 
 @router.post("/update")
 async def update_rates(
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_write_db)
 ) -> dict:
     """
     CBU API dan valyuta kurslarini yangilash.
@@ -67,6 +69,8 @@ async def update_rates(
     Bu endpoint Markaziy Bank API dan joriy kurslarni oladi va bazaga saqlaydi.
     """
     result = await currency_updater.update_rates(db)
+    rate_book_store.invalidate()
+    invalidate_calculation_cache()
     return {
         "status": "success" if not result["errors"] else "partial",
         "updated": result["updated"],
@@ -1,9 +1,15 @@
-from typing import List, Any
-from fastapi import APIRouter, Depends
+from typing import List, Any, Awaitable, Callable, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
 from app.db.session import get_db
-from app.crud.tnved import tnved
-from app.schemas.tnved import TNVed
+from app.crud.tariff import tariff
+from app.crud.tnved import tnved, tnved_tree_version_store, tnved_typeahead_store
+from app.schemas.tnved import (
+    TNVed, TNVedResolved, TNVedResolveRequest, TNVedSuggestion, TNVedSuggestRequest, TNVedTreeNode
+)
+from app.services.rate_book import rate_book_store
+from app.services.single_flight import tnved_search_flight
 
 router = APIRouter()
 
@@ -11,10 +17,157 @@ router = APIRouter()
 async def search_tnved(
     q: str,
     db: AsyncSession = Depends(get_db),
-    limit: int = 20
+    limit: int = 20,
+    fuzzy: bool = False
 ) -> Any:
     """
     Search TNVED codes by code or description.
+    With fuzzy=true, descriptions are matched by trigram similarity (tolerates typos).
+    Identical concurrent searches share one database query.
     """
-    results = await tnved.search(db, q=q, limit=limit)
+    async def search() -> List[TNVed]:
+        if fuzzy and not q.strip().isdigit():
+            results = await tnved.fuzzy_search(db, q=q, limit=limit)
+        else:
+            results = await tnved.search(db, q=q, limit=limit)
+        return [TNVed.model_validate(item) for item in results]
+
+    return await tnved_search_flight.do((q.strip(), limit, fuzzy), search)
+
+
+@router.get("/typeahead", response_model=List[TNVed])
+async def typeahead_tnved(
+    q: str,
+    db: AsyncSession = Depends(get_db)
+) -> Any:
+    """
+    Autocomplete: top 10 codes for a 1-6 character code or word prefix.
+    Answers come from a table precomputed after each sync (ready JSON bytes);
+    longer or multi-word queries fall back to the regular search.
+    """
+    table = await tnved_typeahead_store.get(db)
+    payload = table.get(q)
+    if payload is None:
+        results = await tnved.search(db, q=q, limit=table.top_k)
+        return [TNVed.model_validate(item) for item in results]
+    return Response(content=payload, media_type="application/json")
+
+
+async def _cached_tree_response(
+    request: Request,
+    response: Response,
+    db: AsyncSession,
+    load: Callable[[], Awaitable[List[Any]]]
+) -> Optional[List[Any]]:
+    """
+    Tree only changes on sync: ETag is derived from tn_ved_codes/tariff_rates versions.
+    Returns None when the client's copy is still valid (304 is sent instead).
+    """
+    versions = await tnved_tree_version_store.get(db)
+    etag = 'W/"tnved-tree-' + "-".join(str(v) for v in versions) + '"'
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = f"public, max-age={settings.TNVED_TREE_CACHE_SECONDS}"
+    if request.headers.get("if-none-match") == etag:
+        return None
+    return await load()
+
+
+def _not_modified(response: Response) -> Response:
+    return Response(status_code=304, headers=dict(response.headers))
+
+
+@router.get("/tree", response_model=List[TNVedTreeNode])
+async def tnved_tree_roots(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db)
+) -> Any:
+    """Top level of the nomenclature tree (chapters)."""
+    nodes = await _cached_tree_response(request, response, db, lambda: tnved.get_tree_children(db))
+    return _not_modified(response) if nodes is None else nodes
+
+
+@router.get("/tree/{code}/children", response_model=List[TNVedTreeNode])
+async def tnved_tree_children(
+    code: str,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db)
+) -> Any:
+    """Direct children of a code, each with child_count and has_tariff (one query)."""
+    nodes = await _cached_tree_response(
+        request, response, db, lambda: tnved.get_tree_children(db, code=code)
+    )
+    return _not_modified(response) if nodes is None else nodes
+
+
+@router.get("/tree/{code}/path", response_model=List[TNVedTreeNode])
+async def tnved_tree_path(
+    code: str,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db)
+) -> Any:
+    """Path from the chapter down to the code itself (one query)."""
+    nodes = await _cached_tree_response(request, response, db, lambda: tnved.get_tree_path(db, code=code))
+    if nodes is None:
+        return _not_modified(response)
+    if not nodes or nodes[-1].code != code:
+        raise HTTPException(status_code=404, detail=f"TNVED kod topilmadi: {code}")
+    return nodes
+
+
+@router.post("/resolve", response_model=List[TNVedResolved])
+async def resolve_tnved(
+    payload: TNVedResolveRequest,
+    db: AsyncSession = Depends(get_db)
+) -> Any:
+    """
+    Bulk validation of invoice lines: for each code - whether it exists, its description
+    and the effective tariff. Served from the RateBook when enabled, otherwise with
+    chunked IN queries (no per-code round-trips); codes missing from resolved_tariffs are
+    resolved the same way /calculate does. Order of the input is preserved.
+    """
+    codes = [code.strip() for code in payload.codes]
+
+    if settings.USE_RATE_BOOK:
+        book = await rate_book_store.get(db)
+        found = {code: book.get_tnved(code) for code in set(codes)}
+        tariffs = {
+            code_obj.id: book.get_tariff(code_obj) for code_obj in found.values() if code_obj
+        }
+    else:
+        found = {row.code: row for row in await tnved.get_by_codes(db, codes=codes)}
+        tariffs = await tariff.get_effective_many(db, codes={row.code: row.id for row in found.values()})
+
+    results: List[TNVedResolved] = []
+    for code in codes:
+        code_obj = found.get(code)
+        if not code_obj:
+            results.append(TNVedResolved(code=code, exists=False))
+            continue
+        tariff_obj, resolution = tariffs.get(code_obj.id, (None, None))
+        results.append(TNVedResolved(
+            code=code,
+            exists=True,
+            description=code_obj.description,
+            tariff=tariff_obj,
+            tariff_resolution=resolution
+        ))
     return results
+
+
+@router.post("/suggest", response_model=List[TNVedSuggestion])
+async def suggest_tnved(
+    payload: TNVedSuggestRequest,
+    db: AsyncSession = Depends(get_db)
+) -> Any:
+    """
+    Ranked candidate 10-digit codes for a free-text product description
+    (TF-IDF cosine similarity over the nomenclature, kept in memory).
+    """
+    suggestions = await tnved.suggest(db, description=payload.description, limit=payload.limit)
+    return [
+        TNVedSuggestion(**TNVed.model_validate(row).model_dump(), score=score)
+        for row, score in suggestions
+    ]
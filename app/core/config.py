@@ -6,6 +6,20 @@ from typing import Optional
 
 load_dotenv()
 
+
+def async_database_url(url: str) -> str:
+    """DATABASE_URL dagi sinxron drayverni async drayverga almashtirish (postgres:// -> postgresql+asyncpg://)"""
+    scheme, sep, rest = url.partition("://")
+    if not sep:
+        return url
+    backend = scheme.split("+", 1)[0]
+    if backend in ("postgres", "postgresql"):
+        return f"postgresql+asyncpg://{rest}"
+    if backend == "sqlite":
+        return f"sqlite+aiosqlite://{rest}"
+    return url
+
+
 class Settings(BaseSettings):
     PROJECT_NAME: str = "Uzbekistan Customs Calculator"
     API_V1_STR: str = "/api/v1"
@@ -19,14 +33,60 @@ class Settings(BaseSettings):
     POSTGRES_DB: str = "customs_db"
 
     DATABASE_URL: str = os.getenv("DATABASE_URL", "")
+    # DATABASE_URL berilmasa: "sqlite" (SQLITE_PATH) yoki "postgresql" (POSTGRES_* sozlamalari)
+    DATABASE_BACKEND: str = "sqlite"
+    SQLITE_PATH: str = "./customs_app.db"
+
+    # Ulanishlar puli (PostgreSQL; SQLite uchun SQLAlchemy standart pulidan foydalaniladi)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # asyncpg tayyorlangan so'rovlar keshi (pgbouncer transaction rejimida 0 qilinadi)
+    DB_STATEMENT_CACHE_SIZE: int = 100
+
+    # SQLite profili - har bir ulanishda PRAGMA lar sifatida qo'llanadi
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_MMAP_SIZE: int = 268435456  # 256 MB
+    SQLITE_CACHE_SIZE: int = -65536  # manfiy - KiB (64 MB)
+    SQLITE_TEMP_STORE: str = "MEMORY"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    # So'rovlar uchun faqat o'qiydigan ulanishlar soni (yozish - bitta ulanish orqali)
+    SQLITE_READ_POOL_SIZE: int = 8
 
     LEX_UZ_DUTY_URL: str = "https://lex.uz/docs/3802366"
     LEX_UZ_EXCISE_URL: str = "https://lex.uz/docs/6718877"
+
+    # Xotiradagi ma'lumotnoma (RateBook) sozlamalari
+    USE_RATE_BOOK: bool = True
+    REFERENCE_DATA_CHECK_SECONDS: float = 30.0
+    # Valyuta kurslari keshida saqlanadigan kunlar soni
+    EXCHANGE_RATE_CACHE_DAYS: int = 31
+    # Barcha hisoblashlar bo'lishadigan parallel o'qish sessiyalari soni (0 - ketma-ket, so'rov sessiyasida)
+    READ_SESSION_POOL_SIZE: int = 4
+    # Hisoblash natijalari keshi (0 - o'chirilgan)
+    CALCULATION_CACHE_SIZE: int = 10000
+    CALCULATION_CACHE_TTL_SECONDS: float = 600.0
+    # TN VED daraxti javoblari uchun Cache-Control max-age (daraxt faqat sinxronlashda o'zgaradi)
+    TNVED_TREE_CACHE_SECONDS: int = 3600
     
     @computed_field
     @property
     def SQLALCHEMY_DATABASE_URI(self) -> str:
-        return "sqlite+aiosqlite:///./customs_app.db"
+        if self.DATABASE_URL:
+            return async_database_url(self.DATABASE_URL)
+        if self.DATABASE_BACKEND == "postgresql":
+            return str(PostgresDsn.build(
+                scheme="postgresql+asyncpg",
+                username=self.POSTGRES_USER,
+                password=self.POSTGRES_PASSWORD,
+                host=self.POSTGRES_SERVER,
+                port=int(self.POSTGRES_PORT),
+                path=self.POSTGRES_DB,
+            ))
+        return f"sqlite+aiosqlite:///{self.SQLITE_PATH}"
 
     @computed_field
     @property
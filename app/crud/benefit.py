@@ -1,11 +1,130 @@
-from typing import List, Optional
+import logging
+import math
+from bisect import bisect_left
+from types import SimpleNamespace
+from typing import Any, Iterable, List, Optional, Tuple
 from datetime import date
+import numpy as np
 from sqlalchemy import select, and_, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.crud.base import CRUDBase
+from app.crud.data_version import VersionedCache
 from app.models.benefit import TariffBenefit, CustomsFeeRate, BRVRate
 from app.schemas.benefit import TariffBenefitCreate, CustomsFeeRateCreate, BRVRateCreate
 
+logger = logging.getLogger(__name__)
+
+# TP-55 bo'yicha bojxona rasmiylash yig'imi: bojxona qiymati (USD) yuqori chegarasi va BRV koeffitsienti.
+# customs_fee_rates jadvalida faol qatorlar bo'lmasa ishlatiladi.
+DEFAULT_CUSTOMS_FEE_BRACKETS = (
+    (1000, 0.3),
+    (5000, 0.5),
+    (10000, 1.0),
+    (20000, 1.5),
+    (50000, 3.0),
+    (100000, 5.0),
+    (None, 10.0),
+)
+
+
+class CustomsFeeSchedule:
+    """
+    Bojxona rasmiylash yig'imi jadvali (customs_fee_rates).
+
+    Qatorlar `max_customs_value` bo'yicha saralanadi; bojxona qiymati birinchi
+    yuqori chegarasi undan kichik bo'lmagan qatorga tushadi (chegara o'z ichiga oladi).
+    Oxirgi chegaradan katta (yoki NaN) qiymatlar oxirgi qatorga tushadi.
+    Chegaralar bir valyutada bo'lishi kerak (birinchi qator valyutasi). Boshqa
+    valyutadagi qatorlar, chegaralar orasidagi bo'shliqlar va yuqoridan cheklangan
+    oxirgi qator `warnings` ga yoziladi va logga chiqariladi.
+
+    Skalyar qidiruv - bisect, vektor qidiruv - numpy.searchsorted, ikkalasi bir xil massivlarda.
+    """
+
+    def __init__(self, rates: Iterable[Any]):
+        rows = sorted(
+            rates,
+            key=lambda r: (r.max_customs_value is None, r.max_customs_value or 0.0)
+        )
+        if not rows:
+            rows = [
+                SimpleNamespace(
+                    max_customs_value=upper, value_currency="USD", fee_type="brv",
+                    fee_value=coefficient, min_fee=None, max_fee=None
+                )
+                for upper, coefficient in DEFAULT_CUSTOMS_FEE_BRACKETS
+            ]
+
+        self.currency: str = (rows[0].value_currency or "UZS").upper()
+        self.warnings: List[str] = []
+        other = [r for r in rows if (r.value_currency or "UZS").upper() != self.currency]
+        if other:
+            self.warnings.append(
+                f"Bojxona yig'imi jadvalida {len(other)} ta qator {self.currency} dan boshqa "
+                f"valyutada - ular e'tiborga olinmadi"
+            )
+            rows = [r for r in rows if (r.value_currency or "UZS").upper() == self.currency]
+
+        uppers = [
+            float(r.max_customs_value) if r.max_customs_value is not None else math.inf
+            for r in rows
+        ]
+        lower = 0.0
+        for row, upper in zip(rows, uppers):
+            row_min = getattr(row, "min_customs_value", None)
+            if row_min is not None and float(row_min) > lower:
+                self.warnings.append(
+                    f"Bojxona yig'imi jadvalida bo'shliq: {lower:g} - {float(row_min):g} {self.currency}"
+                )
+            lower = upper
+        if uppers[-1] != math.inf:
+            self.warnings.append(
+                f"Bojxona yig'imi jadvali {uppers[-1]:g} {self.currency} bilan cheklangan - "
+                f"undan katta qiymatlarga oxirgi qator qo'llanadi"
+            )
+        for warning in self.warnings:
+            logger.warning(warning)
+
+        self._uppers: List[float] = uppers
+        self.upper_bounds = np.array(uppers, dtype=float)
+        self.fee_types: Tuple[str, ...] = tuple(r.fee_type for r in rows)
+        self.fee_values = np.array([float(r.fee_value) for r in rows], dtype=float)
+        self.min_fees = np.array([r.min_fee if r.min_fee else -math.inf for r in rows], dtype=float)
+        self.max_fees = np.array([r.max_fee if r.max_fee else math.inf for r in rows], dtype=float)
+
+    def bracket_value(self, customs_value_uzs: Any, customs_value_usd: Any) -> Any:
+        """Chegaralar bilan solishtiriladigan qiymat (jadval valyutasida)"""
+        return customs_value_usd if self.currency == "USD" else customs_value_uzs
+
+    def find(self, value: float) -> int:
+        """Qiymat tushadigan qator raqami (NaN va oxirgi chegaradan kattasi - oxirgi qator)"""
+        if math.isnan(value):
+            return len(self._uppers) - 1
+        return min(bisect_left(self._uppers, value), len(self._uppers) - 1)
+
+    def find_many(self, values: np.ndarray) -> np.ndarray:
+        """Vektor variant: find bilan bir xil natija"""
+        indices = np.searchsorted(self.upper_bounds, values, side="left")
+        return np.minimum(indices, len(self._uppers) - 1)
+
+    def fee(self, index: int, customs_value_uzs: float, brv_amount: float) -> float:
+        """Yig'im summasi (so'm)"""
+        fee_type = self.fee_types[index]
+        value = float(self.fee_values[index])
+        if fee_type == "brv":
+            return brv_amount * value
+        if fee_type == "percent":
+            amount = customs_value_uzs * value / 100
+            return min(max(amount, float(self.min_fees[index])), float(self.max_fees[index]))
+        return value
+
+    def fees(self, indices: np.ndarray, customs_value_uzs: np.ndarray, brv_amount: float) -> np.ndarray:
+        """Vektor variant: fee bilan bir xil natija"""
+        values = self.fee_values[indices]
+        types = np.array(self.fee_types, dtype=object)[indices]
+        percent = np.clip(customs_value_uzs * values / 100, self.min_fees[indices], self.max_fees[indices])
+        return np.select([types == "brv", types == "percent"], [brv_amount * values, percent], default=values)
+
 
 class CRUDTariffBenefit(CRUDBase[TariffBenefit, TariffBenefitCreate, TariffBenefitCreate]):
     async def get_by_tnved_code(
@@ -84,6 +203,24 @@ class CRUDCustomsFeeRate(CRUDBase[CustomsFeeRate, CustomsFeeRateCreate, CustomsF
         result = await db.execute(query)
         return result.scalars().first()
 
+    async def get_schedule(self, db: AsyncSession) -> CustomsFeeSchedule:
+        """Faol yig'im stavkalari jadvali (xotiradan, jadval o'zgarganda qayta quriladi)"""
+        return await customs_fee_schedule_store.get(db)
+
+
+async def load_customs_fee_schedule(db: AsyncSession) -> CustomsFeeSchedule:
+    result = await db.execute(
+        select(CustomsFeeRate.__table__)
+        .where(CustomsFeeRate.is_active == True)
+        .order_by(CustomsFeeRate.id)
+    )
+    return CustomsFeeSchedule(result.all())
+
+
+customs_fee_schedule_store: VersionedCache[CustomsFeeSchedule] = VersionedCache(
+    (CustomsFeeRate.__tablename__,), load_customs_fee_schedule
+)
+
 
 class CRUDBRVRate(CRUDBase[BRVRate, BRVRateCreate, BRVRateCreate]):
     async def get_current(self, db: AsyncSession) -> Optional[BRVRate]:
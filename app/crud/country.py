@@ -1,9 +1,72 @@
-from typing import List, Optional
+from types import MappingProxyType
+from typing import Any, FrozenSet, Iterable, List, Mapping, Optional
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.crud.base import CRUDBase
+from app.crud.data_version import VersionedCache
 from app.models.country import Country, FreeTradeCountry
 from app.schemas.country import CountryCreate, CountryUpdate, FreeTradeCountryCreate
+from app.utils.helpers import chunked
+from app.utils.translit import normalize_search_text
+from app.utils.trigram import TrigramIndex
+
+
+async def load_country_trigram_index(db: AsyncSession) -> TrigramIndex:
+    """Faol mamlakatlarning o'zbekcha va inglizcha nomlari bo'yicha trigram indeksi (normallashtirilgan)"""
+    result = await db.execute(
+        select(Country.__table__).where(Country.is_active == True).order_by(Country.name_uz)
+    )
+    return TrigramIndex(
+        (row, normalize_search_text(f"{row.name_uz} {row.name_en or ''}")) for row in result.all()
+    )
+
+
+country_trigram_store: VersionedCache[TrigramIndex] = VersionedCache(
+    (Country.__tablename__,), load_country_trigram_index
+)
+
+
+class CountryRegistry:
+    """
+    Mamlakatlar, erkin savdo shartnomalari va RNB a'zoligi - xotiradagi o'zgarmas nusxa.
+    Kalkulyator va mamlakat endpointlari bazaga murojaat qilmasdan shu yerdan o'qiydi.
+    """
+
+    def __init__(self, countries: Iterable[Any], free_trade: Iterable[Any]):
+        # Nomi bo'yicha tartiblangan faol mamlakatlar
+        self.countries: Mapping[str, Any] = MappingProxyType({row.code.upper(): row for row in countries})
+        self.free_trade: Mapping[str, Any] = MappingProxyType(
+            {row.country_code.upper(): row for row in free_trade}
+        )
+        self.rnb: FrozenSet[str] = frozenset(code for code, row in self.countries.items() if row.is_rnb)
+
+    def get(self, code: str) -> Optional[Any]:
+        return self.countries.get(code.upper())
+
+    def get_free_trade(self, code: str) -> Optional[Any]:
+        return self.free_trade.get(code.upper())
+
+    def is_free_trade(self, code: str) -> bool:
+        return code.upper() in self.free_trade
+
+    def is_rnb(self, code: str) -> bool:
+        return code.upper() in self.rnb
+
+
+async def load_country_registry(db: AsyncSession) -> CountryRegistry:
+    countries = await db.execute(
+        select(Country.__table__).where(Country.is_active == True).order_by(Country.name_uz)
+    )
+    free_trade = await db.execute(
+        select(FreeTradeCountry.__table__).where(FreeTradeCountry.is_active == True).order_by(FreeTradeCountry.id)
+    )
+    return CountryRegistry(countries.all(), free_trade.all())
+
+
+# Mamlakatlar yoki erkin savdo jadvali o'zgarganda (data_versions) qayta quriladi
+country_registry_store: VersionedCache[CountryRegistry] = VersionedCache(
+    (Country.__tablename__, FreeTradeCountry.__tablename__), load_country_registry
+)
 
 
 class CRUDCountry(CRUDBase[Country, CountryCreate, CountryUpdate]):
@@ -29,6 +92,11 @@ class CRUDCountry(CRUDBase[Country, CountryCreate, CountryUpdate]):
         )
         return result.scalars().all()
 
+    async def fuzzy_search(self, db: AsyncSession, *, q: str, limit: int = 20) -> List[Any]:
+        """Xato yozilgan nomlar bilan ham qidirish (trigram o'xshashligi)"""
+        index = await country_trigram_store.get(db)
+        return [row for row, _ in index.search(normalize_search_text(q), limit)]
+
 
 class CRUDFreeTradeCountry(CRUDBase[FreeTradeCountry, FreeTradeCountryCreate, FreeTradeCountryCreate]):
     async def get_by_code(self, db: AsyncSession, *, country_code: str) -> Optional[FreeTradeCountry]:
@@ -40,6 +108,19 @@ class CRUDFreeTradeCountry(CRUDBase[FreeTradeCountry, FreeTradeCountryCreate, Fr
         )
         return result.scalars().first()
 
+    async def get_by_codes(self, db: AsyncSession, *, country_codes: List[str]) -> List[FreeTradeCountry]:
+        """Bir nechta mamlakat uchun erkin savdo yozuvlari"""
+        items: List[FreeTradeCountry] = []
+        for chunk in chunked(sorted({c.upper() for c in country_codes})):
+            result = await db.execute(
+                select(FreeTradeCountry).filter(
+                    FreeTradeCountry.country_code.in_(chunk),
+                    FreeTradeCountry.is_active == True
+                )
+            )
+            items.extend(result.scalars().all())
+        return items
+
     async def is_free_trade(self, db: AsyncSession, *, country_code: str) -> bool:
         """Tekshirish: mamlakat erkin savdo zonasidami?"""
         result = await self.get_by_code(db, country_code=country_code)
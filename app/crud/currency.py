@@ -1,10 +1,63 @@
-from datetime import date
-from typing import List, Optional
+from dataclasses import dataclass
+from datetime import date, timedelta
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
 from sqlalchemy import select, desc, func
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
 from app.crud.base import CRUDBase
+from app.crud.data_version import VersionedCache
 from app.models.currency import Currency
 from app.schemas.currency import CurrencyCreate, CurrencyUpdate
+from app.utils.helpers import chunked
+
+
+@dataclass(frozen=True, slots=True)
+class CurrencyEntry:
+    code: str
+    rate_uzs: float
+    nominal: int
+    date: date
+
+
+def currency_entry(row: Any) -> CurrencyEntry:
+    return CurrencyEntry(
+        code=row.code,
+        rate_uzs=float(row.rate_uzs),
+        nominal=row.nominal or 1,
+        date=row.date,
+    )
+
+
+class ExchangeRates:
+    """
+    Valyuta kurslarining o'zgarmas nusxasi.
+
+    - (kod, sana) bo'yicha kurslar - oxirgi EXCHANGE_RATE_CACHE_DAYS kun uchun
+      (bir kunda bir nechta yozuv bo'lsa, birinchisi - get_by_code_and_date kabi)
+    - har bir kod uchun so'nggi faol kurs (get_latest_rates kabi)
+    """
+
+    def __init__(self, *, as_of: date, rows: Iterable[Any], latest_rows: Iterable[Any]):
+        self.as_of = as_of
+        by_date: Dict[Tuple[str, date], CurrencyEntry] = {}
+        for row in rows:
+            by_date.setdefault((row.code, row.date), currency_entry(row))
+        latest: Dict[str, CurrencyEntry] = {}
+        for row in latest_rows:
+            latest.setdefault(row.code, currency_entry(row))
+        self.by_date: Mapping[Tuple[str, date], CurrencyEntry] = MappingProxyType(by_date)
+        self.latest: Mapping[str, CurrencyEntry] = MappingProxyType(latest)
+
+    def get(self, code: str, date_obj: date) -> Optional[CurrencyEntry]:
+        return self.by_date.get((code, date_obj))
+
+    def get_latest(self, code: str) -> Optional[CurrencyEntry]:
+        return self.latest.get(code)
+
+    def on_date(self, date_obj: date) -> List[CurrencyEntry]:
+        """Berilgan sanadagi barcha kurslar"""
+        return [entry for (_, day), entry in self.by_date.items() if day == date_obj]
 
 class CRUDCurrency(CRUDBase[Currency, CurrencyCreate, CurrencyUpdate]):
     async def get_by_code_and_date(self, db: AsyncSession, *, code: str, date_obj: date) -> Optional[Currency]:
@@ -13,6 +66,18 @@ class CRUDCurrency(CRUDBase[Currency, CurrencyCreate, CurrencyUpdate]):
         )
         return result.scalars().first()
 
+    async def get_by_codes_and_date(self, db: AsyncSession, *, codes: List[str], date_obj: date) -> List[Currency]:
+        """Bir nechta valyutaning berilgan sanadagi kurslari"""
+        items: List[Currency] = []
+        for chunk in chunked(sorted(set(codes))):
+            result = await db.execute(
+                select(Currency)
+                .filter(Currency.code.in_(chunk), Currency.date == date_obj)
+                .order_by(Currency.id)
+            )
+            items.extend(result.scalars().all())
+        return items
+
     async def get_latest_rate(self, db: AsyncSession, code: str = "USD") -> Optional[Currency]:
         """Eng oxirgi kursni olish."""
         result = await db.execute(
@@ -53,3 +118,26 @@ class CRUDCurrency(CRUDBase[Currency, CurrencyCreate, CurrencyUpdate]):
 
 
 currency = CRUDCurrency(Currency)
+
+
+async def load_exchange_rates(db: AsyncSession) -> ExchangeRates:
+    """Oxirgi kunlar kurslari va har bir valyutaning so'nggi kursini o'qish"""
+    today = date.today()
+    rows = await db.execute(
+        select(Currency.__table__)
+        .where(Currency.date >= today - timedelta(days=settings.EXCHANGE_RATE_CACHE_DAYS))
+        # Sana indeksi bo'yicha; bir kun ichida id tartibi saqlanadi
+        .order_by(Currency.date, Currency.id)
+    )
+    return ExchangeRates(
+        as_of=today,
+        rows=rows.all(),
+        latest_rows=await currency.get_latest_rates(db),
+    )
+
+
+# Jarayon bo'yicha umumiy kesh: ishga tushishda to'ldiriladi,
+# CurrencyUpdater.update_rates commitdan keyin yangisini almashtiradi
+exchange_rate_store: VersionedCache[ExchangeRates] = VersionedCache(
+    (Currency.__tablename__,), load_exchange_rates
+)
@@ -0,0 +1,181 @@
+"""
+Ma'lumotnoma jadvallari versiyalari va ularga bog'langan xotiradagi keshlar.
+
+Skriptlar va updaterlar jadvalni o'zgartirganda `data_version.bump(...)` ni
+chaqiradi. Server jarayonidagi keshlar (`VersionedCache`) versiyalarni arzon
+bitta so'rov bilan tekshiradi va o'zgargan bo'lsa qayta quriladi.
+"""
+
+import asyncio
+import time
+from datetime import date
+from typing import Awaitable, Callable, Dict, Generic, Mapping, Optional, Sequence, Tuple, TypeVar
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.data_version import DataVersion
+
+T = TypeVar("T")
+
+
+class CRUDDataVersion:
+    """Jadval versiyalari uchun CRUD"""
+
+    async def get_versions(
+        self,
+        db: AsyncSession,
+        table_names: Sequence[str]
+    ) -> Dict[str, int]:
+        """Berilgan jadvallarning joriy versiyalari (yo'q bo'lsa - 0)"""
+        result = await db.execute(
+            select(DataVersion.table_name, DataVersion.version).where(
+                DataVersion.table_name.in_(list(table_names))
+            )
+        )
+        versions = {name: 0 for name in table_names}
+        versions.update({row.table_name: row.version for row in result})
+        return versions
+
+    async def bump(self, db: AsyncSession, *table_names: str) -> None:
+        """
+        Jadval versiyalarini oshirish.
+        Commit qilinmaydi - o'zgarish ma'lumotlar bilan bitta tranzaksiyada saqlanadi.
+        """
+        result = await db.execute(
+            select(DataVersion).where(DataVersion.table_name.in_(table_names))
+        )
+        existing = {row.table_name: row for row in result.scalars().all()}
+
+        for name in table_names:
+            if name in existing:
+                existing[name].version += 1
+            else:
+                db.add(DataVersion(table_name=name, version=1))
+        await db.flush()
+
+
+class VersionedCache(Generic[T]):
+    """
+    Jadval versiyalariga bog'langan xotiradagi kesh.
+
+    - `loader` qiymatni bazadan quradi (masalan, RateBook yoki indeks)
+    - Versiyalar `check_interval` soniyada bir martadan ko'p tekshirilmaydi
+    - `daily=True` bo'lsa kun almashganda qiymat qayta quriladi (bugungi kurs, joriy BRV);
+      sanaga bog'liq bo'lmagan indekslar (TN VED) uchun `daily=False`
+    - Versiya o'zgarganda qiymatni birinchi sezgan so'rov quradi, qolganlar qurish
+      tugaguncha eski qiymatni oladi; qulf faqat birinchi qurishda kutiladi
+    """
+
+    def __init__(
+        self,
+        table_names: Sequence[str],
+        loader: Callable[[AsyncSession], Awaitable[T]],
+        check_interval: Optional[float] = None,
+        daily: bool = True
+    ):
+        self.table_names = tuple(table_names)
+        self.loader = loader
+        self.check_interval = (
+            settings.REFERENCE_DATA_CHECK_SECONDS if check_interval is None else check_interval
+        )
+        self._value: Optional[T] = None
+        self._versions: Optional[Tuple[int, ...]] = None
+        self._day: Optional[date] = None
+        self.daily = daily
+        self._checked_at = 0.0
+        self._building = False
+        self._lock = asyncio.Lock()
+
+    @property
+    def current(self) -> Optional[T]:
+        """Oxirgi qurilgan qiymat (tekshiruvsiz)"""
+        return self._value
+
+    @property
+    def versions(self) -> Optional[Tuple[int, ...]]:
+        return self._versions
+
+    def matches(self, versions: Mapping[str, int], as_of: date) -> bool:
+        """Qiymat aynan shu jadval versiyalari (va `daily` bo'lsa - shu sana) bo'yicha qurilganmi"""
+        if self._versions is None:
+            return False
+        if self.daily and self._day != as_of:
+            return False
+        return self._versions == tuple(versions.get(name, 0) for name in self.table_names)
+
+    def invalidate(self) -> None:
+        """Keyingi `get` chaqiruvida versiyalarni qayta tekshirishga majburlash"""
+        self._checked_at = 0.0
+        self._versions = None
+
+    def _same_day(self) -> bool:
+        return not self.daily or self._day == date.today()
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._value is not None
+            and self._versions is not None
+            and self._same_day()
+            and time.monotonic() - self._checked_at < self.check_interval
+        )
+
+    def _store(self, value: T, key: Tuple[int, ...]) -> None:
+        self._value = value
+        self._versions = key
+        self._day = date.today()
+        self._checked_at = time.monotonic()
+
+    async def _load_key(self, db: AsyncSession) -> Tuple[int, ...]:
+        versions = await data_version.get_versions(db, self.table_names)
+        return tuple(versions[name] for name in self.table_names)
+
+    async def get(self, db: AsyncSession) -> T:
+        if self._is_fresh():
+            return self._value
+
+        async with self._lock:
+            if self._is_fresh():
+                return self._value
+            if self._building:
+                # Boshqa so'rov yangi qiymatni qurmoqda - hozircha eskisi
+                return self._value
+
+            key = await self._load_key(db)
+            if self._value is None:
+                # Berishga eski qiymat yo'q - birinchi qurishni hamma kutadi
+                self._store(await self.loader(db), key)
+                return self._value
+            if key == self._versions and self._same_day():
+                self._checked_at = time.monotonic()
+                return self._value
+            self._building = True
+
+        try:
+            value = await self.loader(db)
+            async with self._lock:
+                self._store(value, key)
+            return value
+        finally:
+            self._building = False
+
+    async def reload(self, db: AsyncSession) -> T:
+        """Versiyadan qat'i nazar qayta qurish"""
+        self._value = None
+        self.invalidate()
+        return await self.get(db)
+
+    async def swap(self, db: AsyncSession) -> T:
+        """
+        Yangi qiymatni qurib, eskisi bilan bir zumda almashtirish.
+        Qurish davomida o'quvchilar eski qiymatni oladi (commitdan keyin chaqiriladi).
+        """
+        key = await self._load_key(db)
+        value = await self.loader(db)
+        async with self._lock:
+            self._store(value, key)
+        return value
+
+
+data_version = CRUDDataVersion()
@@ -1,11 +1,95 @@
 """Aksiz stavkalari CRUD operatsiyalari"""
 
-from typing import Optional, List
+from typing import Any, Dict, Iterable, Optional, List, Tuple
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.crud.data_version import VersionedCache
 from app.models.excise import ExciseRate
 
+# (-kod uzunligi, tartib raqami) - kichigi yaxshiroq
+_Rank = Tuple[int, int]
+
+
+class _TrieNode:
+    __slots__ = ("children", "rate", "rank", "best_rate", "best_rank")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        # Aynan shu tugunda tugaydigan aksiz kodi
+        self.rate: Any = None
+        self.rank: Optional[_Rank] = None
+        # Shu tugun va uning ostidagi eng yaxshi kod
+        self.best_rate: Any = None
+        self.best_rank: Optional[_Rank] = None
+
+
+class ExciseTrie:
+    """
+    Aksiz stavkalarining `tnved_codes` kodlari bo'yicha prefix daraxti.
+
+    Moslik qoidasi:
+    - TN VED kodi aksiz kodi bilan boshlansa (ota-kod), yoki
+    - aksiz kodi TN VED kodi bilan boshlansa (qisqa kodlar uchun).
+    Eng uzun aksiz kodi tanlanadi, teng bo'lsa - ro'yxatda birinchisi.
+    Qidiruv O(kod uzunligi). ExciseRate va RateBook yozuvlari bilan ishlaydi.
+    """
+
+    def __init__(self, rates: Iterable[Any]):
+        self.root = _TrieNode()
+        order = 0
+        for rate in rates:
+            if not rate.tnved_codes:
+                continue
+            # tnved_codes maydonida vergul bilan ajratilgan kodlar bo'lishi mumkin
+            for code in (c.strip() for c in rate.tnved_codes.split(",")):
+                if code:
+                    self._insert(code, rate, (-len(code), order))
+                order += 1
+
+    def _insert(self, code: str, rate: Any, rank: _Rank) -> None:
+        node = self.root
+        path = [node]
+        for char in code:
+            node = node.children.setdefault(char, _TrieNode())
+            path.append(node)
+        if node.rank is None or rank < node.rank:
+            node.rate, node.rank = rate, rank
+        for item in path:
+            if item.best_rank is None or rank < item.best_rank:
+                item.best_rate, item.best_rank = rate, rank
+
+    def match(self, tnved_code: str) -> Any:
+        best_rate, best_rank = None, None
+        node = self.root
+        for char in tnved_code:
+            node = node.children.get(char)
+            if node is None:
+                return best_rate
+            # Ota-kod: TN VED kodi shu aksiz kodi bilan boshlanadi
+            if node.rank is not None and (best_rank is None or node.rank < best_rank):
+                best_rate, best_rank = node.rate, node.rank
+
+        # TN VED kodi bilan boshlanadigan uzunroq aksiz kodlari
+        if node.best_rank is not None:
+            if best_rank is None or node.best_rank < best_rank:
+                best_rate = node.best_rate
+        return best_rate
+
+
+async def load_excise_trie(db: AsyncSession) -> ExciseTrie:
+    """Faol aksiz stavkalaridan daraxt qurish (o'zgarmas SQL qatorlari bilan)"""
+    result = await db.execute(
+        select(ExciseRate.__table__).where(ExciseRate.is_active == True).order_by(ExciseRate.id)
+    )
+    return ExciseTrie(result.all())
+
+
+# excise_rates jadvali o'zgarganda qayta quriladi
+excise_trie_store: VersionedCache[ExciseTrie] = VersionedCache(
+    (ExciseRate.__tablename__,), load_excise_trie
+)
+
 
 class CRUDExcise:
     """Aksiz stavkalari uchun CRUD"""
@@ -14,39 +98,13 @@ class CRUDExcise:
         self, 
         db: AsyncSession, 
         tnved_code: str
-    ) -> Optional[ExciseRate]:
-        """TN VED kodi bo'yicha aksiz stavkasini topish"""
-        
-        # Barcha faol aksiz stavkalarini olish
-        result = await db.execute(
-            select(ExciseRate).where(ExciseRate.is_active == True)
-        )
-        all_excise = result.scalars().all()
-        
-        # Eng mos keluvchisini topish (prefix bo'yicha)
-        best_match: Optional[ExciseRate] = None
-        best_match_len = 0
-        
-        for excise in all_excise:
-            if not excise.tnved_codes:
-                continue
-            
-            # tnved_codes maydonida vergul bilan ajratilgan kodlar bo'lishi mumkin
-            codes = [c.strip() for c in excise.tnved_codes.split(",")]
-            
-            for code in codes:
-                # Agar berilgan TN VED kodi shu code bilan boshlansa
-                if tnved_code.startswith(code):
-                    if len(code) > best_match_len:
-                        best_match = excise
-                        best_match_len = len(code)
-                # Yoki agar aksiz kodi berilgan TN VED kodi bilan boshlansa (qisqa kodlar uchun)
-                elif code.startswith(tnved_code[:len(code)]):
-                    if len(code) > best_match_len:
-                        best_match = excise
-                        best_match_len = len(code)
-        
-        return best_match
+    ):
+        """
+        TN VED kodi bo'yicha aksiz stavkasini topish (prefix daraxtidan).
+        excise_rates ustunlari bilan o'zgarmas qator qaytaradi.
+        """
+        trie = await excise_trie_store.get(db)
+        return trie.match(tnved_code)
     
     async def get_by_category(
         self, 
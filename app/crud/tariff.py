@@ -1,19 +1,82 @@
-from typing import Optional
-from sqlalchemy import select, text
+from bisect import bisect_right
+from typing import Any, Dict, Generic, List, Mapping, Optional, Tuple, TypeVar
+from sqlalchemy import delete, func, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.crud.base import CRUDBase
-from app.models.tariff import TariffRate
+from app.crud.data_version import data_version
+from app.crud.tnved import tnved
+from app.models.tariff import TariffRate, ResolvedTariff
 from app.models.tnved import TNVedCode
 from app.schemas.tariff import TariffRateCreate, TariffRateUpdate
+from app.utils.helpers import IN_CHUNK_SIZE, chunked, starts_with
+
+T = TypeVar("T")
+
+
+class TariffResolver(Generic[T]):
+    """
+    Kod uchun amaldagi tarifni bazasiz topish.
+
+    get_by_tnved_id + get_by_code_prefix bilan bir xil tartib:
+    1. Aniq kod ('exact')
+    2. Kod bilan boshlanadigan uzunroq kodlardan birinchisi ('child')
+    3. Kodning prefikslari, eng uzunidan boshlab ('parent')
+
+    Bola/ota kodlar faqat import_duty_percent bor tariflardan olinadi.
+    """
+
+    def __init__(self, codes: Mapping[str, int], tariffs: Mapping[int, T]):
+        self.tariffs = tariffs
+        self._duty_tariffs: Dict[str, T] = {
+            code: tariffs[tnved_id]
+            for code, tnved_id in codes.items()
+            if tnved_id in tariffs and tariffs[tnved_id].import_duty_percent is not None
+        }
+        self._duty_codes: List[str] = sorted(self._duty_tariffs)
+
+    def resolve(self, code: str, tnved_id: Optional[int] = None) -> Tuple[Optional[T], Optional[str]]:
+        exact = self.tariffs.get(tnved_id) if tnved_id is not None else None
+        if exact:
+            return exact, "exact"
+
+        # 1. Bola-kodlar
+        i = bisect_right(self._duty_codes, code)
+        if i < len(self._duty_codes) and self._duty_codes[i].startswith(code):
+            return self._duty_tariffs[self._duty_codes[i]], "child"
+
+        # 2. Ota-kodlar
+        for prefix_len in range(len(code) - 1, 3, -1):
+            parent = self._duty_tariffs.get(code[:prefix_len])
+            if parent:
+                return parent, "parent"
+
+        return None, None
+
 
 class CRUDTariff(CRUDBase[TariffRate, TariffRateCreate, TariffRateUpdate]):
     async def get_by_tnved_id(self, db: AsyncSession, *, tnved_id: int) -> Optional[TariffRate]:
         result = await db.execute(select(TariffRate).filter(TariffRate.tnved_id == tnved_id))
         return result.scalars().first()
+
+    async def get_by_tnved_ids(self, db: AsyncSession, *, tnved_ids: List[int]) -> List[TariffRate]:
+        """Bir nechta kod uchun tariflarni IN (...) so'rovlari bilan olish"""
+        items: List[TariffRate] = []
+        for chunk in chunked(sorted(set(tnved_ids))):
+            result = await db.execute(select(TariffRate).filter(TariffRate.tnved_id.in_(chunk)))
+            items.extend(result.scalars().all())
+        return items
     
     async def get_by_code_prefix(self, db: AsyncSession, *, code: str) -> Optional[TariffRate]:
+        """Bola yoki ota-kodlardan tarif (qanday topilgani kerak bo'lmasa)"""
+        tariff_obj, _ = await self.resolve_by_code_prefix(db, code=code)
+        return tariff_obj
+
+    async def resolve_by_code_prefix(
+        self, db: AsyncSession, *, code: str
+    ) -> Tuple[Optional[TariffRate], Optional[str]]:
         """
         Kod bo'yicha tarif topish - iyerarxik qidiruv.
+        TariffResolver bilan bir xil belgilar: 'child', 'parent' yoki None.
         
         Qidiruv tartibi:
         1. Kod bilan boshlanadigan uzunroq kodlardan (bola-kodlar)
@@ -21,54 +84,153 @@ class CRUDTariff(CRUDBase[TariffRate, TariffRateCreate, TariffRateUpdate]):
         
         Masalan: 87032310 -> avval 8703231xxx dan, keyin 8703231, 870323, 87032 dan qidiradi
         """
+        with_duty = (
+            select(TariffRate)
+            .join(TNVedCode, TariffRate.tnved_id == TNVedCode.id)
+            .where(TariffRate.import_duty_percent.is_not(None))
+        )
+
         # 1. Avval bola-kodlardan qidirish (uzunroq kodlar)
-        # substr ishlatamiz - kod boshlanishi mos kelishi kerak
-        query = text("""
-            SELECT tr.* FROM tariff_rates tr
-            JOIN tn_ved_codes t ON tr.tnved_id = t.id
-            WHERE substr(t.code, 1, :code_len) = :code
-            AND length(t.code) > :code_len
-            AND tr.import_duty_percent IS NOT NULL
-            ORDER BY t.code
-            LIMIT 1
-        """)
-        
-        result = await db.execute(query, {"code": code, "code_len": len(code)})
-        row = result.fetchone()
-        
-        if row:
-            return self._row_to_tariff(row)
-        
-        # 2. Agar bola-kodlarda topilmasa, ota-kodlardan qidirish
-        # Kodning qisqartirilgan versiyalari bo'yicha
-        for prefix_len in range(len(code) - 1, 3, -1):
-            prefix = code[:prefix_len]
-            query2 = text("""
-                SELECT tr.* FROM tariff_rates tr
-                JOIN tn_ved_codes t ON tr.tnved_id = t.id
-                WHERE t.code = :prefix
-                AND tr.import_duty_percent IS NOT NULL
-                LIMIT 1
-            """)
-            result2 = await db.execute(query2, {"prefix": prefix})
-            row2 = result2.fetchone()
-            if row2:
-                return self._row_to_tariff(row2)
+        # Oraliq sharti - kod indeksi bo'yicha, SQLite va PostgreSQL da bir xil
+        result = await db.execute(
+            with_duty.where(
+                starts_with(TNVedCode.code, code),
+                TNVedCode.code != code,
+            ).order_by(TNVedCode.code).limit(1)
+        )
+        child = result.scalars().first()
+        if child:
+            return child, "child"
         
-        return None
+        # 2. Agar bola-kodlarda topilmasa, ota-kodlardan qidirish - eng uzun prefiksdan
+        prefixes = [code[:prefix_len] for prefix_len in range(len(code) - 1, 3, -1)]
+        if not prefixes:
+            return None, None
+        result = await db.execute(
+            with_duty.where(TNVedCode.code.in_(prefixes))
+            .order_by(func.length(TNVedCode.code).desc())
+            .limit(1)
+        )
+        parent = result.scalars().first()
+        return parent, "parent" if parent else None
     
-    def _row_to_tariff(self, row) -> TariffRate:
-        """SQL row dan TariffRate obyekt yaratish"""
-        return TariffRate(
-            id=row.id,
-            tnved_id=row.tnved_id,
-            import_duty_percent=row.import_duty_percent,
-            import_duty_specific=row.import_duty_specific,
-            specific_unit=row.specific_unit,
-            excise_percent=row.excise_percent,
-            excise_specific=row.excise_specific,
-            vat_percent=row.vat_percent,
-            source_url=row.source_url
+    async def get_resolved(
+        self, db: AsyncSession, *, tnved_id: int
+    ) -> Optional[Tuple[Optional[TariffRate], Optional[str]]]:
+        """
+        resolved_tariffs jadvalidan kod uchun tarif va uning qanday topilgani.
+        Kod jadvalda bo'lmasa (jadval hali qurilmagan) None qaytaradi.
+        """
+        result = await db.execute(
+            select(ResolvedTariff.resolution, TariffRate)
+            .outerjoin(TariffRate, TariffRate.id == ResolvedTariff.tariff_id)
+            .where(ResolvedTariff.tnved_id == tnved_id)
         )
+        row = result.first()
+        if row is None:
+            return None
+        return row.TariffRate, row.resolution
+
+    async def get_resolved_many(
+        self, db: AsyncSession, *, tnved_ids: List[int]
+    ) -> Dict[int, Tuple[Optional[TariffRate], Optional[str]]]:
+        """get_resolved ning ommaviy varianti: IN (...) bo'laklari bilan, jadvalda yo'q kodlar qaytarilmaydi"""
+        resolved: Dict[int, Tuple[Optional[TariffRate], Optional[str]]] = {}
+        for chunk in chunked(sorted(set(tnved_ids))):
+            result = await db.execute(
+                select(ResolvedTariff.tnved_id, ResolvedTariff.resolution, TariffRate)
+                .outerjoin(TariffRate, TariffRate.id == ResolvedTariff.tariff_id)
+                .where(ResolvedTariff.tnved_id.in_(chunk))
+            )
+            for row in result:
+                resolved[row.tnved_id] = (row.TariffRate, row.resolution)
+        return resolved
+
+    async def get_effective_many(
+        self, db: AsyncSession, *, codes: Mapping[str, int]
+    ) -> Dict[int, Tuple[Optional[TariffRate], Optional[str]]]:
+        """
+        Kod -> tnved_id juftliklari uchun amaldagi tarif (kalkulyatorning DB rejimi bilan bir xil).
+        'exact' bo'lmagan resolved_tariffs qatorlaridan oldin kodning o'z tarifi tekshiriladi;
+        jadvalda yo'q kodlar (jadval yozuvchidan keyin qayta qurilmagan) TariffResolver bilan
+        topiladi - sarlavha (4 raqam) ostidagi kodlar va ularning tariflari IN so'rovlari bilan.
+        """
+        resolved = await self.get_resolved_many(db, tnved_ids=list(codes.values()))
+        pending = {
+            code: tnved_id for code, tnved_id in codes.items()
+            if resolved.get(tnved_id, (None, None))[1] != "exact"
+        }
+        if not pending:
+            return resolved
+
+        own = {row.tnved_id: row for row in await self.get_by_tnved_ids(db, tnved_ids=list(pending.values()))}
+        missing: Dict[str, int] = {}
+        for code, tnved_id in pending.items():
+            if tnved_id in own:
+                resolved[tnved_id] = (own[tnved_id], "exact")
+            elif tnved_id not in resolved:
+                missing[code] = tnved_id
+        if not missing:
+            return resolved
+
+        # Bola-kodlar va 4 raqamgacha ota-kodlar - hammasi kodning sarlavhasi ostida
+        related = await tnved.get_by_prefixes(db, prefixes=[code[:4] for code in missing])
+        related_codes = {row.code: row.id for row in related}
+        related_codes.update(missing)
+        related_tariffs = {
+            row.tnved_id: row
+            for row in await self.get_by_tnved_ids(db, tnved_ids=list(related_codes.values()))
+        }
+        resolver = TariffResolver(related_codes, related_tariffs)
+        for code, tnved_id in missing.items():
+            resolved[tnved_id] = resolver.resolve(code, tnved_id)
+        return resolved
+
+    async def rebuild_resolved(self, db: AsyncSession) -> Dict[str, int]:
+        """
+        resolved_tariffs jadvalini qayta qurish (sinxronlash oxirida).
+        Commit qilinmaydi. Har bir resolution bo'yicha kodlar sonini qaytaradi.
+        """
+        codes = {
+            row.code: row.id
+            for row in await db.execute(select(TNVedCode.id, TNVedCode.code))
+        }
+        tariffs = {
+            row.tnved_id: row
+            for row in await db.execute(
+                select(TariffRate.id, TariffRate.tnved_id, TariffRate.import_duty_percent)
+            )
+        }
+        resolver = TariffResolver(codes, tariffs)
+
+        rows: List[Dict[str, Any]] = []
+        stats: Dict[str, int] = {"exact": 0, "child": 0, "parent": 0, "none": 0}
+        for code, tnved_id in codes.items():
+            found, resolution = resolver.resolve(code, tnved_id)
+            rows.append({
+                "tnved_id": tnved_id,
+                "tariff_id": found.id if found else None,
+                "resolution": resolution,
+            })
+            stats[resolution or "none"] += 1
+
+        await db.execute(delete(ResolvedTariff))
+        for chunk in chunked(rows, IN_CHUNK_SIZE):
+            await db.execute(insert(ResolvedTariff), chunk)
+        await db.flush()
+        return stats
 
 tariff = CRUDTariff(TariffRate)
+
+
+async def after_tnved_write(db: AsyncSession) -> Dict[str, int]:
+    """
+    TN VED kodlari yoki tariflar yozilgandan keyin (har bir yozuvchi chaqiradi):
+    kodlar iyerarxiyasi (parent_id, lft/rgt) va resolved_tariffs qayta quriladi,
+    jadval versiyalari oshiriladi - RateBook, TN VED indekslari, daraxt ETag va
+    natijalar keshi yangilanadi. Commit qilinmaydi.
+    """
+    await tnved.rebuild_hierarchy(db)
+    stats = await tariff.rebuild_resolved(db)
+    await data_version.bump(db, TNVedCode.__tablename__, TariffRate.__tablename__)
+    return stats
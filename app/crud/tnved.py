@@ -1,10 +1,328 @@
-from typing import List, Optional
-from sqlalchemy import select, case, func
-from sqlalchemy.orm import selectinload
-from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+from sqlalchemy import bindparam, exists, select, column, func, or_, table, text, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import aliased, selectinload
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
 from app.crud.base import CRUDBase
+from app.crud.data_version import VersionedCache, data_version
+from app.models.tariff import TariffRate
 from app.models.tnved import TNVedCode
-from app.schemas.tnved import TNVedCreate, TNVedUpdate
+from app.schemas.tnved import TNVed, TNVedCreate, TNVedUpdate
+from app.utils.helpers import IN_CHUNK_SIZE, chunked, starts_with
+from app.utils.translit import normalize_search_text
+from app.utils.tfidf import TfidfIndex
+from app.utils.trigram import TrigramIndex
+
+
+def compute_hierarchy(codes: Mapping[str, int]) -> Dict[int, Tuple[Optional[int], int, int]]:
+    """
+    Kodlar iyerarxiyasini bir o'tishda hisoblash: id -> (parent_id, lft, rgt).
+
+    Ota-kod - jadvalda mavjud eng uzun prefiks (8703231010 -> 870323 -> 8703 -> 87).
+    Kodlar leksikografik tartibda aylanib chiqiladi: prefiks o'z bolalaridan oldin
+    keladi va bolalar ketma-ket turadi, shuning uchun stek yetarli.
+    Kod ostidagi kodlar: lft < x.lft va x.rgt < rgt.
+    """
+    result: Dict[int, Tuple[Optional[int], int, int]] = {}
+    stack: List[Tuple[str, int, Optional[int], int]] = []  # (kod, id, parent_id, lft)
+    counter = 0
+
+    def close() -> None:
+        nonlocal counter
+        code, node_id, parent_id, lft = stack.pop()
+        counter += 1
+        result[node_id] = (parent_id, lft, counter)
+
+    for code in sorted(codes):
+        while stack and not code.startswith(stack[-1][0]):
+            close()
+        parent_id = stack[-1][1] if stack else None
+        counter += 1
+        stack.append((code, codes[code], parent_id, counter))
+    while stack:
+        close()
+    return result
+
+
+class TNVedCodeIndex:
+    """
+    Barcha TN VED kodlarining xotiradagi tartiblangan indeksi (raqamli prefiks qidiruvi uchun).
+
+    Kodlar uzunligi bo'yicha guruhlangan, har bir guruh ichida tartiblangan.
+    `code LIKE 'q%' ORDER BY length(code), code` natijasi bilan bir xil:
+    har bir uzunlik guruhida prefiks oralig'i bisect bilan topiladi va kesib olinadi.
+    """
+
+    def __init__(self, rows: Iterable[Any]):
+        groups: Dict[int, List[Any]] = {}
+        for row in rows:
+            groups.setdefault(len(row.code), []).append(row)
+
+        self._lengths: List[int] = sorted(groups)
+        self._codes: Dict[int, List[str]] = {}
+        self._rows: Dict[int, List[Any]] = {}
+        for length in self._lengths:
+            items = sorted(groups[length], key=lambda row: row.code)
+            self._codes[length] = [row.code for row in items]
+            self._rows[length] = items
+
+    def __len__(self) -> int:
+        return sum(len(codes) for codes in self._codes.values())
+
+    def prefix_search(self, prefix: str, limit: int = 10) -> List[Any]:
+        """Prefiks bilan boshlanadigan kodlar: avval qisqalari, keyin leksikografik"""
+        found: List[Any] = []
+        if limit <= 0:
+            return found
+        # Prefiksdan keyingi birinchi satr: '87' -> '88' (oraliq [lo, hi))
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1) if prefix else None
+
+        for length in self._lengths:
+            if length < len(prefix):
+                continue
+            codes = self._codes[length]
+            lo = bisect_left(codes, prefix)
+            hi = bisect_left(codes, upper, lo) if upper else len(codes)
+            found.extend(self._rows[length][lo:min(hi, lo + limit - len(found))])
+            if len(found) >= limit:
+                break
+        return found
+
+
+async def load_tnved_code_index(db: AsyncSession) -> TNVedCodeIndex:
+    """tn_ved_codes jadvalidan indeks qurish (o'zgarmas SQL qatorlari bilan)"""
+    result = await db.execute(select(TNVedCode.__table__))
+    return await asyncio.to_thread(TNVedCodeIndex, result.all())
+
+
+# tn_ved_codes jadvali o'zgarganda qayta quriladi
+tnved_code_index_store: VersionedCache[TNVedCodeIndex] = VersionedCache(
+    (TNVedCode.__tablename__,), load_tnved_code_index, daily=False
+)
+
+
+async def load_tnved_trigram_index(db: AsyncSession) -> TrigramIndex:
+    """Normallashtirilgan tavsiflar bo'yicha trigram indeksi (teng baholarda qisqa kodlar birinchi)"""
+    result = await db.execute(
+        select(TNVedCode.__table__).order_by(func.length(TNVedCode.code), TNVedCode.code)
+    )
+    rows = result.all()
+
+    def build() -> TrigramIndex:
+        return TrigramIndex((row, row.search_text or normalize_search_text(row.description)) for row in rows)
+
+    return await asyncio.to_thread(build)
+
+
+tnved_trigram_store: VersionedCache[TrigramIndex] = VersionedCache(
+    (TNVedCode.__tablename__,), load_tnved_trigram_index, daily=False
+)
+
+
+class TypeaheadTable:
+    """
+    Avtoto'ldirish uchun oldindan hisoblangan jadval: 1-6 belgili har bir prefiks ->
+    eng yaxshi `top_k` natijaning tayyor JSON baytlari.
+
+    - Raqamli prefikslar kodlar bo'yicha (`prefix_search` bilan bir xil tartib)
+    - So'z prefikslari normallashtirilgan tavsif so'zlari bo'yicha
+    Qatorlar (kod uzunligi, kod) tartibida keladi - qisqa (umumiyroq) kodlar birinchi.
+    Bir xil natija ro'yxatlari bitta baytlar obyektini ulashadi.
+    """
+
+    MAX_PREFIX = 6
+
+    def __init__(self, rows: Iterable[Any], top_k: int = 10):
+        self.top_k = top_k
+        rows = list(rows)
+        code_hits: Dict[str, List[int]] = {}
+        word_hits: Dict[str, List[int]] = {}
+
+        for i, row in enumerate(rows):
+            for length in range(1, min(len(row.code), self.MAX_PREFIX) + 1):
+                self._add(code_hits, row.code[:length], i)
+
+            prefixes = set()
+            for word in (row.search_text or normalize_search_text(row.description)).split():
+                if not word.isdigit():
+                    prefixes.update(word[:length] for length in range(1, min(len(word), self.MAX_PREFIX) + 1))
+            for prefix in prefixes:
+                self._add(word_hits, prefix, i)
+
+        items = [TNVed.model_validate(row).model_dump_json().encode("utf-8") for row in rows]
+        payloads: Dict[Tuple[int, ...], bytes] = {}
+
+        def payload(ids: List[int]) -> bytes:
+            key = tuple(ids)
+            if key not in payloads:
+                payloads[key] = b"[" + b",".join(items[i] for i in ids) + b"]"
+            return payloads[key]
+
+        self._codes: Dict[str, bytes] = {prefix: payload(ids) for prefix, ids in code_hits.items()}
+        self._words: Dict[str, bytes] = {prefix: payload(ids) for prefix, ids in word_hits.items()}
+
+    def _add(self, hits: Dict[str, List[int]], prefix: str, row_index: int) -> None:
+        found = hits.setdefault(prefix, [])
+        if len(found) < self.top_k:
+            found.append(row_index)
+
+    def get(self, q: str) -> Optional[bytes]:
+        """
+        Tayyor JSON yoki None (so'rov jadvalda yo'q ko'rinishda: 6 belgidan uzun,
+        bir nechta so'z) - bunday holda oddiy qidiruv ishlatiladi.
+        """
+        q = q.strip()
+        if q.isdigit():
+            if len(q) > self.MAX_PREFIX:
+                return None
+            return self._codes.get(q, b"[]")
+
+        normalized = normalize_search_text(q)
+        if not normalized or " " in normalized or len(normalized) > self.MAX_PREFIX:
+            return None
+        return self._words.get(normalized, b"[]")
+
+
+async def load_tnved_typeahead(db: AsyncSession) -> TypeaheadTable:
+    result = await db.execute(
+        select(TNVedCode.__table__).order_by(func.length(TNVedCode.code), TNVedCode.code)
+    )
+    # ~2 soniyalik CPU ishi - event loopni band qilmasligi uchun alohida oqimda
+    return await asyncio.to_thread(TypeaheadTable, result.all())
+
+
+# Sinxronlashdan keyin (tn_ved_codes versiyasi o'zgarganda) qayta quriladi
+tnved_typeahead_store: VersionedCache[TypeaheadTable] = VersionedCache(
+    (TNVedCode.__tablename__,), load_tnved_typeahead, daily=False
+)
+
+
+# Tavsif bo'yicha taklif qilinadigan kodlar uzunligi (to'liq 10 raqamli kodlar)
+SUGGEST_CODE_LENGTH = 10
+
+
+async def load_tnved_tfidf_index(db: AsyncSession) -> TfidfIndex:
+    """
+    10 raqamli kodlar bo'yicha TF-IDF indeksi. Subpozitsiya tavsiflari ko'pincha qisqa
+    ("-- прочие"), shuning uchun hujjat matniga ota-kodlar tavsiflari ham qo'shiladi.
+    """
+    result = await db.execute(select(TNVedCode.__table__).order_by(TNVedCode.code))
+    rows = {row.code: row for row in result.all()}
+
+    def text_of(row) -> str:
+        return row.search_text or normalize_search_text(row.description)
+
+    def document(row) -> str:
+        ancestors = [rows[row.code[:length]] for length in range(1, len(row.code)) if row.code[:length] in rows]
+        return " ".join(text_of(item) for item in ancestors + [row])
+
+    def build() -> TfidfIndex:
+        return TfidfIndex(
+            (row, document(row)) for row in rows.values() if len(row.code) == SUGGEST_CODE_LENGTH
+        )
+
+    return await asyncio.to_thread(build)
+
+
+# Sinxronlashdan keyin qayta quriladi, ilova ishga tushganda oldindan yuklanadi
+tnved_tfidf_store: VersionedCache[TfidfIndex] = VersionedCache(
+    (TNVedCode.__tablename__,), load_tnved_tfidf_index, daily=False
+)
+
+
+# Daraxt javoblari (ETag) qaysi jadvallarga bog'liq
+TNVED_TREE_TABLES = (TNVedCode.__tablename__, TariffRate.__tablename__)
+
+
+async def load_tnved_tree_version(db: AsyncSession) -> Tuple[int, ...]:
+    versions = await data_version.get_versions(db, TNVED_TREE_TABLES)
+    return tuple(versions[name] for name in TNVED_TREE_TABLES)
+
+
+tnved_tree_version_store: VersionedCache[Tuple[int, ...]] = VersionedCache(
+    TNVED_TREE_TABLES, load_tnved_tree_version, daily=False
+)
+
+
+def _tree_node_columns(node) -> List[Any]:
+    """Tugun ustunlari + bolalar soni va o'z tarifi borligi (korrelyatsiyalangan so'rovlar)"""
+    child = aliased(TNVedCode)
+    return [
+        node.id, node.code, node.full_code, node.description, node.level, node.parent_id,
+        select(func.count(child.id)).where(child.parent_id == node.id)
+        .scalar_subquery().label("child_count"),
+        exists().where(TariffRate.tnved_id == node.id).label("has_tariff"),
+    ]
+
+
+# Normallashtirilgan tavsiflar bo'yicha to'liq matnli qidiruv (faqat SQLite FTS5).
+# tn_ved_codes ga tashqi kontent jadvali - triggerlar har bir o'zgarishni indeksga yozadi.
+TNVED_FTS_TABLE = "tn_ved_fts"
+TNVED_FTS_DDL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS tn_ved_fts USING fts5(
+        search_text, content='tn_ved_codes', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tn_ved_codes_fts_ai AFTER INSERT ON tn_ved_codes BEGIN
+        INSERT INTO tn_ved_fts(rowid, search_text) VALUES (new.id, new.search_text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tn_ved_codes_fts_ad AFTER DELETE ON tn_ved_codes BEGIN
+        INSERT INTO tn_ved_fts(tn_ved_fts, rowid, search_text) VALUES ('delete', old.id, old.search_text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tn_ved_codes_fts_au AFTER UPDATE OF search_text ON tn_ved_codes BEGIN
+        INSERT INTO tn_ved_fts(tn_ved_fts, rowid, search_text) VALUES ('delete', old.id, old.search_text);
+        INSERT INTO tn_ved_fts(rowid, search_text) VALUES (new.id, new.search_text);
+    END
+    """,
+)
+TNVED_FTS_DROP = (
+    "DROP TRIGGER IF EXISTS tn_ved_codes_fts_au",
+    "DROP TRIGGER IF EXISTS tn_ved_codes_fts_ad",
+    "DROP TRIGGER IF EXISTS tn_ved_codes_fts_ai",
+    "DROP TABLE IF EXISTS tn_ved_fts",
+)
+
+_tnved_fts = table(TNVED_FTS_TABLE, column("rowid"))
+
+
+async def create_tnved_fts(conn: AsyncConnection) -> None:
+    """
+    FTS5 jadvali va triggerlarni yaratish (ilova ishga tushganda, create_all dan keyin).
+    Jadval yangi yaratilsa - mavjud tavsiflar bilan to'ldiriladi.
+    """
+    if conn.dialect.name != "sqlite":
+        return
+    columns = {row.name for row in await conn.execute(text(f"PRAGMA table_info({TNVED_FTS_TABLE})"))}
+    exists = "search_text" in columns
+    if columns and not exists:
+        # Eski ko'rinish (xom description ustida) - qayta quriladi
+        for statement in TNVED_FTS_DROP:
+            await conn.execute(text(statement))
+    for statement in TNVED_FTS_DDL:
+        await conn.execute(text(statement))
+    if not exists:
+        await conn.execute(text("INSERT INTO tn_ved_fts(tn_ved_fts) VALUES ('rebuild')"))
+
+
+def fts_match_query(q: str) -> Optional[str]:
+    """
+    Foydalanuvchi matnidan FTS5 MATCH ifodasi: normallashtirilgan har bir so'z prefiks
+    sifatida, barchasi bo'lishi shart ("Авто yengil" -> "avto"* "yengil"*).
+    """
+    words = normalize_search_text(q).split()
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
+
 
 class CRUDTNVed(CRUDBase[TNVedCode, TNVedCreate, TNVedUpdate]):
     async def get_by_code(self, db: AsyncSession, *, code: str) -> Optional[TNVedCode]:
@@ -12,46 +330,183 @@ class CRUDTNVed(CRUDBase[TNVedCode, TNVedCreate, TNVedUpdate]):
         result = await db.execute(select(TNVedCode).filter(TNVedCode.code == code))
         return result.scalars().first()
 
+    async def get_by_codes(self, db: AsyncSession, *, codes: List[str]) -> List[TNVedCode]:
+        """Bir nechta kodni IN (...) so'rovlari bilan olish"""
+        items: List[TNVedCode] = []
+        for chunk in chunked(sorted(set(codes))):
+            result = await db.execute(select(TNVedCode).filter(TNVedCode.code.in_(chunk)))
+            items.extend(result.scalars().all())
+        return items
+
+    async def get_by_prefixes(self, db: AsyncSession, *, prefixes: List[str]) -> List[TNVedCode]:
+        """Berilgan prefikslar bilan boshlanadigan barcha kodlar (faqat raqamli prefikslar)"""
+        items: List[TNVedCode] = []
+        # Har bir prefiks - ikki parametrli oraliq sharti
+        for chunk in chunked(sorted({p for p in prefixes if p.isdigit()}), IN_CHUNK_SIZE // 2):
+            result = await db.execute(
+                select(TNVedCode).filter(or_(*[starts_with(TNVedCode.code, p) for p in chunk]))
+            )
+            items.extend(result.scalars().all())
+        return items
+
     async def search(self, db: AsyncSession, *, q: str, limit: int = 10) -> List[TNVedCode]:
         """
         TN VED kodlarini qidirish.
         
         Tartib:
         1. Kod boshidan mos keluvchilar (56 -> 5601, 5602...)
-        2. Tavsifda so'z bor bo'lganlar
+        2. Tavsifda so'zlar bor bo'lganlar (SQLite da FTS5 bm25 reytingi bo'yicha)
+        3. Tavsif ichida so'rov qatori uchraganlar (xotiradagi trigram indeksidan)
         
         Agar faqat raqamlar kiritilsa - kod bo'yicha qidirish ustunlik oladi.
         """
         q = q.strip()
         
-        # Agar faqat raqamlar bo'lsa - kod bo'yicha qidirish
+        # Agar faqat raqamlar bo'lsa - kod bo'yicha qidirish (xotiradagi indeksdan)
+        # Qisqa kodlar birinchi (2 -> 4 -> 6 -> 8 -> 10 raqamli)
         if q.isdigit():
-            # Avval aniq kod prefiksi bo'yicha
-            query = select(TNVedCode).filter(
-                TNVedCode.code.like(f"{q}%")
-            ).order_by(
-                # Qisqa kodlar birinchi (2 -> 4 -> 6 -> 8 -> 10 raqamli)
-                func.length(TNVedCode.code),
-                TNVedCode.code
-            ).limit(limit)
+            index = await tnved_code_index_store.get(db)
+            return index.prefix_search(q, limit)
+        
+        # Matn qidiruvida - kod prefiksi, keyin tavsif bo'yicha bm25 reytingi
+        found: List[TNVedCode] = []
+        if db.bind.dialect.name == "sqlite":
+            try:
+                found = await self._search_fts(db, q=q, limit=limit)
+            except OperationalError:
+                # FTS jadvali hali yaratilmagan - faqat kod prefiksi
+                found = await self._search_code_prefix(db, q=q, limit=limit)
         else:
-            # Matn qidiruvida - kod yoki tavsif bo'yicha
-            query = select(TNVedCode).filter(
-                (TNVedCode.code.like(f"{q}%")) | 
-                (TNVedCode.description.ilike(f"%{q}%"))
-            ).order_by(
-                # Kod bilan boshlanuvchilar birinchi
-                case(
-                    (TNVedCode.code.like(f"{q}%"), 0),
-                    else_=1
-                ),
-                func.length(TNVedCode.code),
-                TNVedCode.code
-            ).limit(limit)
+            found = await self._search_code_prefix(db, q=q, limit=limit)
+        if len(found) >= limit:
+            return found
         
-        result = await db.execute(query)
+        # Qolgan o'rinlar: normallashtirilgan tavsif ichidagi istalgan joy bo'yicha, xotiradagi
+        # trigram indeksidan - jadval o'qilmaydi (FTS faqat so'z boshini topadi:
+        # "мобил" -> "автомобиль" shu yerda topiladi)
+        index = await tnved_trigram_store.get(db)
+        seen = {item.id for item in found}
+        ids = [
+            row.id for row in index.containing(normalize_search_text(q), limit + len(found))
+            if row.id not in seen
+        ][:limit - len(found)]
+        if not ids:
+            return found
+        
+        result = await db.execute(select(TNVedCode).where(TNVedCode.id.in_(ids)))
+        by_id = {item.id: item for item in result.scalars().all()}
+        return found + [by_id[item_id] for item_id in ids if item_id in by_id]
+
+    async def fuzzy_search(self, db: AsyncSession, *, q: str, limit: int = 10) -> List[Any]:
+        """Xato yozilgan so'zlar bilan ham tavsif bo'yicha qidirish (trigram o'xshashligi)"""
+        index = await tnved_trigram_store.get(db)
+        return [row for row, _ in index.search(normalize_search_text(q), limit)]
+
+    async def get_descendants(self, db: AsyncSession, *, code: str) -> List[TNVedCode]:
+        """Kod ostidagi barcha kodlar (nested-set oralig'i, kod tartibida)"""
+        node = (
+            select(TNVedCode.lft, TNVedCode.rgt).where(TNVedCode.code == code).subquery()
+        )
+        result = await db.execute(
+            select(TNVedCode)
+            .join(node, (TNVedCode.lft > node.c.lft) & (TNVedCode.rgt < node.c.rgt))
+            .order_by(TNVedCode.lft)
+        )
+        return result.scalars().all()
+
+    async def get_ancestors(self, db: AsyncSession, *, code: str) -> List[TNVedCode]:
+        """Kodning jadvaldagi barcha ota-kodlari, bobdan boshlab (bitta IN so'rovi)"""
+        prefixes = [code[:length] for length in range(1, len(code))]
+        if not prefixes:
+            return []
+        result = await db.execute(
+            select(TNVedCode)
+            .where(TNVedCode.code.in_(prefixes))
+            .order_by(func.length(TNVedCode.code))
+        )
         return result.scalars().all()
 
+    async def get_tree_children(self, db: AsyncSession, *, code: Optional[str] = None) -> List[Any]:
+        """
+        Daraxtda kodning bevosita bolalari (code=None - eng yuqori daraja), bitta so'rov.
+        Har bir qatorda child_count va has_tariff bor.
+        """
+        query = select(*_tree_node_columns(TNVedCode)).order_by(TNVedCode.code)
+        if code is None:
+            query = query.where(TNVedCode.parent_id.is_(None))
+        else:
+            parent = aliased(TNVedCode)
+            query = query.join(parent, TNVedCode.parent_id == parent.id).where(parent.code == code)
+        result = await db.execute(query)
+        return result.all()
+
+    async def get_tree_path(self, db: AsyncSession, *, code: str) -> List[Any]:
+        """Bobdan kodning o'zigacha bo'lgan yo'l (bitta IN so'rovi), child_count va has_tariff bilan"""
+        prefixes = [code[:length] for length in range(1, len(code) + 1)]
+        result = await db.execute(
+            select(*_tree_node_columns(TNVedCode))
+            .where(TNVedCode.code.in_(prefixes))
+            .order_by(func.length(TNVedCode.code))
+        )
+        return result.all()
+
+    async def rebuild_hierarchy(self, db: AsyncSession) -> int:
+        """
+        parent_id, lft, rgt ni qayta hisoblash (sinxronlash oxirida).
+        Commit qilinmaydi. Yangilangan kodlar sonini qaytaradi.
+        """
+        codes = {row.code: row.id for row in await db.execute(select(TNVedCode.id, TNVedCode.code))}
+        hierarchy = compute_hierarchy(codes)
+        table_ = TNVedCode.__table__
+        rows = [
+            {"node_id": node_id, "parent": parent_id, "left": lft, "right": rgt}
+            for node_id, (parent_id, lft, rgt) in hierarchy.items()
+        ]
+        statement = (
+            update(table_)
+            .where(table_.c.id == bindparam("node_id"))
+            .values(parent_id=bindparam("parent"), lft=bindparam("left"), rgt=bindparam("right"))
+        )
+        for chunk in chunked(rows):
+            await db.execute(statement, chunk)
+        await db.flush()
+        return len(rows)
+
+    async def suggest(self, db: AsyncSession, *, description: str, limit: int = 10) -> List[Tuple[Any, float]]:
+        """Tovar tavsifiga eng mos 10 raqamli kodlar va ularning o'xshashlik bahosi"""
+        index = await tnved_tfidf_store.get(db)
+        return index.search(description, limit)
+
+    async def _search_code_prefix(self, db: AsyncSession, *, q: str, limit: int) -> List[TNVedCode]:
+        """Kod boshidan mos keluvchilar, qisqa kodlar birinchi (indeks oralig'i bo'yicha)"""
+        result = await db.execute(
+            select(TNVedCode)
+            .where(starts_with(TNVedCode.code, q))
+            .order_by(func.length(TNVedCode.code), TNVedCode.code)
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+
+    async def _search_fts(self, db: AsyncSession, *, q: str, limit: int) -> List[TNVedCode]:
+        """Kod boshidan mos keluvchilar birinchi, keyin FTS5 bm25 bo'yicha eng mos tavsiflar"""
+        found = await self._search_code_prefix(db, q=q, limit=limit)
+        match = fts_match_query(q)
+        if match is None or len(found) >= limit:
+            return found
+
+        result = await db.execute(
+            select(TNVedCode)
+            .join(_tnved_fts, _tnved_fts.c.rowid == TNVedCode.id)
+            .where(text("tn_ved_fts MATCH :match").bindparams(match=match))
+            .order_by(text("bm25(tn_ved_fts)"), func.length(TNVedCode.code), TNVedCode.code)
+            .limit(limit)
+        )
+        seen = {item.id for item in found}
+        for item in result.scalars().all():
+            if item.id not in seen and len(found) < limit:
+                found.append(item)
+        return found
+
     async def create_or_update(
         self, db: AsyncSession, *, obj_in: TNVedCreate
     ) -> TNVedCode:
@@ -1,9 +1,129 @@
-from typing import List, Optional
-from sqlalchemy import select, and_, or_
+import math
+from bisect import bisect_right
+from typing import Any, Iterable, List, Optional, Tuple
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.crud.base import CRUDBase
+from app.crud.data_version import VersionedCache
 from app.models.utilization import UtilizationFee
 from app.schemas.utilization import UtilizationFeeCreate, UtilizationFeeUpdate
+from app.utils.helpers import starts_with
+
+
+_Band = Tuple[bool, float, float, bool, float, float]
+
+
+def _fee_band(fee) -> _Band:
+    """
+    Yig'imning dvigatel hajmi va yosh oraliqlari.
+    0 yoki None chegara tekshirilmaydi, lekin biror chegara berilgan bo'lsa parametr majburiy.
+    """
+    return (
+        fee.engine_volume_min is not None or fee.engine_volume_max is not None,
+        fee.engine_volume_min or -math.inf,
+        fee.engine_volume_max or math.inf,
+        fee.vehicle_age_min is not None or fee.vehicle_age_max is not None,
+        fee.vehicle_age_min or -math.inf,
+        fee.vehicle_age_max or math.inf,
+    )
+
+
+def _next_prefix(prefix: str) -> str:
+    """Shu prefiks bilan boshlanadigan barcha kodlardan katta eng kichik satr"""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class UtilizationIndex:
+    """
+    Utilizatsiya yig'imlari uchun kod oraliqlari indeksi.
+
+    Har bir yig'im kodlar o'qida oraliq: diapazon [start, end] yoki
+    `start` bilan boshlanadigan kodlar. Chegaralar saralanib, har bir bo'lak uchun
+    yig'imlar ustuvorlik tartibida oldindan yoziladi:
+    1. Kodni o'z ichiga olgan diapazonlar va aynan shu koddagi yig'imlar
+    2. Ota-kodlardagi yig'imlar, eng uzun prefiksdan boshlab
+    Bir guruh ichida - jadvaldagi tartib (id).
+
+    Qidiruv: bitta bisect va bo'lakdagi oraliqlardan birinchi mosini tanlash.
+    UtilizationFee va RateBook yozuvlari bilan ishlaydi.
+    """
+
+    def __init__(self, fees: Iterable[Any]):
+        self.fees: Tuple[Any, ...] = tuple(fees)
+
+        bounds = set()
+        for fee in self.fees:
+            start, end = fee.tnved_code_start, fee.tnved_code_end
+            if end is not None:
+                bounds.update((start, end + "\0"))
+            elif start:
+                bounds.update((start, start + "\0", _next_prefix(start)))
+        self._bounds: List[str] = sorted(bounds)
+
+        self._segments: List[Tuple[Tuple[Any, ...], Tuple[_Band, ...]]] = []
+        for bound in self._bounds:
+            ordered = self._ordered_for(bound)
+            self._segments.append((ordered, tuple(_fee_band(fee) for fee in ordered)))
+
+    def _ordered_for(self, code: str) -> Tuple[Any, ...]:
+        """Kod uchun yig'imlar ustuvorlik tartibida (indeks qurishda ishlatiladi)"""
+        ordered = [
+            fee for fee in self.fees
+            if (fee.tnved_code_end is None and fee.tnved_code_start == code)
+            or (
+                fee.tnved_code_end is not None
+                and fee.tnved_code_start <= code <= fee.tnved_code_end
+            )
+        ]
+        for prefix_len in range(len(code) - 1, 0, -1):
+            prefix = code[:prefix_len]
+            ordered.extend(
+                fee for fee in self.fees
+                if fee.tnved_code_end is None and fee.tnved_code_start == prefix
+            )
+        return tuple(ordered)
+
+    def match(
+        self,
+        tnved_code: str,
+        engine_volume: Optional[int] = None,
+        vehicle_age: Optional[int] = None
+    ):
+        """
+        Kod va avtomobil parametrlariga mos yig'im.
+        Parametrlar berilmasa - eng ustuvor yig'im.
+        """
+        i = bisect_right(self._bounds, tnved_code) - 1
+        if not tnved_code or i < 0:
+            return None
+        fees, bands = self._segments[i]
+
+        if engine_volume is None and vehicle_age is None:
+            return fees[0] if fees else None
+
+        for fee, (need_volume, volume_min, volume_max, need_age, age_min, age_max) in zip(fees, bands):
+            if need_volume and (engine_volume is None or not volume_min <= engine_volume <= volume_max):
+                continue
+            if need_age and (vehicle_age is None or not age_min <= vehicle_age <= age_max):
+                continue
+            return fee
+        return None
+
+
+async def load_utilization_index(db: AsyncSession) -> UtilizationIndex:
+    """Faol yig'imlardan indeks qurish (o'zgarmas SQL qatorlari bilan)"""
+    result = await db.execute(
+        select(UtilizationFee.__table__)
+        .where(UtilizationFee.is_active == True)
+        .order_by(UtilizationFee.id)
+    )
+    return UtilizationIndex(result.all())
+
+
+# utilization_fees jadvali o'zgarganda qayta quriladi
+utilization_index_store: VersionedCache[UtilizationIndex] = VersionedCache(
+    (UtilizationFee.__tablename__,), load_utilization_index
+)
 
 
 class CRUDUtilizationFee(CRUDBase[UtilizationFee, UtilizationFeeCreate, UtilizationFeeUpdate]):
@@ -14,68 +134,14 @@ class CRUDUtilizationFee(CRUDBase[UtilizationFee, UtilizationFeeCreate, Utilizat
         tnved_code: str,
         engine_volume: Optional[int] = None,
         vehicle_age: Optional[int] = None
-    ) -> Optional[UtilizationFee]:
+    ):
         """
-        TNVED kodga mos utilizatsiya yig'imini olish.
+        TNVED kodga mos utilizatsiya yig'imini olish (oraliqlar indeksidan).
         Avtomobillar uchun dvigatel hajmi va yoshi ham hisobga olinadi.
+        Eng uzun prefiks ustuvor (8703xxxx -> avval 8703xxxx, keyin 8703).
         """
-        # Kod prefikslari bo'yicha qidirish (8703xxxx -> 8703 bilan solishtiriladi)
-        # Eng uzun prefiksdan boshlab qidirish
-        for prefix_len in range(len(tnved_code), 0, -1):
-            prefix = tnved_code[:prefix_len]
-            
-            query = select(UtilizationFee).filter(
-                UtilizationFee.is_active == True,
-                or_(
-                    # Aniq kod yoki prefiks
-                    and_(
-                        UtilizationFee.tnved_code_start == prefix,
-                        UtilizationFee.tnved_code_end.is_(None)
-                    ),
-                    # Diapazon
-                    and_(
-                        UtilizationFee.tnved_code_start <= tnved_code,
-                        UtilizationFee.tnved_code_end >= tnved_code
-                    )
-                )
-            )
-            
-            result = await db.execute(query)
-            fees = list(result.scalars().all())
-            
-            if not fees:
-                continue
-            
-            # Agar avtomobil parametrlari berilgan bo'lsa, eng mosini tanlash
-            if engine_volume is not None or vehicle_age is not None:
-                for fee in fees:
-                    # Dvigatel hajmi tekshiruvi
-                    vol_match = True
-                    if fee.engine_volume_min is not None or fee.engine_volume_max is not None:
-                        if engine_volume is None:
-                            continue
-                        if fee.engine_volume_min and engine_volume < fee.engine_volume_min:
-                            vol_match = False
-                        if fee.engine_volume_max and engine_volume > fee.engine_volume_max:
-                            vol_match = False
-                    
-                    # Yosh tekshiruvi
-                    age_match = True
-                    if fee.vehicle_age_min is not None or fee.vehicle_age_max is not None:
-                        if vehicle_age is None:
-                            continue
-                        if fee.vehicle_age_min and vehicle_age < fee.vehicle_age_min:
-                            age_match = False
-                        if fee.vehicle_age_max and vehicle_age > fee.vehicle_age_max:
-                            age_match = False
-                    
-                    if vol_match and age_match:
-                        return fee
-            else:
-                # Birinchi mos keluvchini qaytarish
-                return fees[0] if fees else None
-        
-        return None
+        index = await utilization_index_store.get(db)
+        return index.match(tnved_code, engine_volume, vehicle_age)
 
     async def get_all_for_code_prefix(
         self, 
@@ -87,7 +153,7 @@ class CRUDUtilizationFee(CRUDBase[UtilizationFee, UtilizationFeeCreate, Utilizat
         result = await db.execute(
             select(UtilizationFee).filter(
                 UtilizationFee.is_active == True,
-                UtilizationFee.tnved_code_start.startswith(code_prefix)
+                starts_with(UtilizationFee.tnved_code_start, code_prefix)
             )
         )
         return result.scalars().all()
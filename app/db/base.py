@@ -1,6 +1,17 @@
 from typing import Any
+from sqlalchemy import Index, text
 from sqlalchemy.orm import DeclarativeBase
 from sqlalchemy.ext.asyncio import AsyncAttrs
 
 class Base(AsyncAttrs, DeclarativeBase):
     pass
+
+
+def active_index(name: str, *columns: str) -> Index:
+    """Faqat faol (is_active) qatorlar ustidagi qisman indeks - CRUD so'rovlari shu shart bilan o'qiydi"""
+    return Index(
+        name,
+        *columns,
+        sqlite_where=text("is_active = 1"),
+        postgresql_where=text("is_active"),
+    )
@@ -1,22 +1,140 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from app.core.config import settings
-
-engine = create_async_engine(
-    settings.SQLALCHEMY_DATABASE_URI,
-    echo=False,
-    future=True,
-)
-
-AsyncSessionLocal = async_sessionmaker(
-    bind=engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-    autoflush=False,
-)
-
-async def get_db():
-    async with AsyncSessionLocal() as session:
-        try:
-            yield session
-        finally:
-            await session.close()
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, AsyncSession, async_sessionmaker
+from app.core.config import settings
+
+IS_SQLITE = make_url(settings.SQLALCHEMY_DATABASE_URI).get_backend_name() == "sqlite"
+
+
+def engine_options(url: str) -> Dict[str, Any]:
+    """Backendga qarab create_async_engine parametrlari (pul va asyncpg so'rovlar keshi)"""
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "connect_args": {"prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE},
+    }
+
+
+def sqlite_pragmas(read_only: bool = False) -> Dict[str, Any]:
+    """SQLite profili: WAL, synchronous, mmap, sahifa keshi va vaqtinchalik jadvallar xotirada"""
+    pragmas = {
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+        "journal_mode": settings.SQLITE_JOURNAL_MODE,
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+        "cache_size": settings.SQLITE_CACHE_SIZE,
+        "temp_store": settings.SQLITE_TEMP_STORE,
+    }
+    if read_only:
+        # O'qish ulanishi tasodifan yozib, yozuvchini bloklamasligi uchun
+        pragmas["query_only"] = "ON"
+    return pragmas
+
+
+def apply_sqlite_pragmas(target: AsyncEngine, read_only: bool = False) -> None:
+    """Har bir yangi ulanishda PRAGMA larni qo'llash"""
+    pragmas = sqlite_pragmas(read_only)
+
+    @event.listens_for(target.sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+# Yozuvchi engine: updaterlar, skriptlar va yozadigan endpointlar.
+# SQLite da bitta ulanish - yozuvlar navbat bilan, "database is locked" siz bajariladi.
+engine = create_async_engine(
+    settings.SQLALCHEMY_DATABASE_URI,
+    echo=False,
+    future=True,
+    **(
+        {"pool_size": 1, "max_overflow": 0, "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS}
+        if IS_SQLITE else engine_options(settings.SQLALCHEMY_DATABASE_URI)
+    ),
+)
+
+# O'qish engine: so'rovlarga xizmat qiladi. SQLite WAL rejimida o'quvchilar yozuvchini
+# kutmaydi; PostgreSQL da alohida pul kerak emas - yozuvchi engine ishlatiladi.
+if IS_SQLITE:
+    apply_sqlite_pragmas(engine)
+    read_engine = create_async_engine(
+        settings.SQLALCHEMY_DATABASE_URI,
+        echo=False,
+        future=True,
+        pool_size=settings.SQLITE_READ_POOL_SIZE,
+        # Hisoblash parallel o'qish sessiyalarini ham oladi - pul tugab qolmasligi uchun
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+    )
+    apply_sqlite_pragmas(read_engine, read_only=True)
+else:
+    read_engine = engine
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autoflush=False,
+)
+
+ReadSessionLocal = async_sessionmaker(
+    bind=read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autoflush=False,
+)
+
+class ReadSessionPool:
+    """
+    Parallel o'qish so'rovlari uchun kichik sessiyalar puli.
+    Bitta AsyncSession bir vaqtda bitta so'rov bajaradi - parallel qidiruvlar
+    har biri alohida qisqa sessiya oladi, bir vaqtdagi soni `size` bilan cheklanadi.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker = None, size: int = None):
+        self.session_factory = session_factory or ReadSessionLocal
+        self.size = settings.READ_SESSION_POOL_SIZE if size is None else size
+        if self.size < 1:
+            raise ValueError(f"ReadSessionPool hajmi musbat bo'lishi kerak: {self.size}")
+        self._semaphore = asyncio.Semaphore(self.size)
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[AsyncSession]:
+        async with self._semaphore:
+            async with self.session_factory() as session:
+                yield session
+
+
+# Jarayon bo'yicha umumiy pul - bir vaqtdagi barcha hisoblashlar shu limitni bo'lishadi
+# (READ_SESSION_POOL_SIZE = 0 - pul o'chirilgan)
+read_session_pool: Optional[ReadSessionPool] = (
+    ReadSessionPool() if settings.READ_SESSION_POOL_SIZE > 0 else None
+)
+
+
+async def get_db():
+    """So'rovlar uchun o'qish sessiyasi"""
+    async with ReadSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+async def get_write_db():
+    """Bazaga yozadigan endpointlar uchun (yozuvchi engine)"""
+    async with AsyncSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
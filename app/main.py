@@ -9,10 +9,15 @@ from datetime import datetime, time
 
 from app.core.config import settings
 from app.api.v1.init import api_router
-from app.db.session import engine, AsyncSessionLocal
+from app.db.session import engine, AsyncSessionLocal, ReadSessionLocal
 from app.db.base import Base
 from app.models.init import TNVedCode, TariffRate, Currency, Country, FreeTradeCountry, UtilizationFee, TariffBenefit, CustomsFeeRate, BRVRate
 from app.parsers.currency_updater import CurrencyUpdater
+from app.crud.country import country_registry_store
+from app.crud.currency import exchange_rate_store
+from app.crud.tnved import create_tnved_fts, tnved_tfidf_store, tnved_typeahead_store
+from app.services.rate_book import rate_book_store
+from app.services.result_cache import invalidate_calculation_cache
 _background_task = None
 
 
@@ -21,10 +26,24 @@ async def update_currency_rates():
         updater = CurrencyUpdater()
         async with AsyncSessionLocal() as db:
             await updater.update_rates(db)
+        rate_book_store.invalidate()
+        invalidate_calculation_cache()
     except Exception as e:
         pass  
 
 
+async def load_rate_book():
+    try:
+        async with ReadSessionLocal() as db:
+            await exchange_rate_store.get(db)
+            await country_registry_store.get(db)
+            await rate_book_store.reload(db)
+            await tnved_typeahead_store.get(db)
+            await tnved_tfidf_store.get(db)
+    except Exception as e:
+        pass
+
+
 async def daily_currency_update():
     while True:
         now = datetime.now()
@@ -44,8 +63,10 @@ async def lifespan(app: FastAPI):
     global _background_task
     
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)    
+        await conn.run_sync(Base.metadata.create_all)
+        await create_tnved_fts(conn)
     await update_currency_rates()
+    await load_rate_book()
     _background_task = asyncio.create_task(daily_currency_update())
     
     yield    
@@ -3,7 +3,7 @@ from typing import Optional
 from sqlalchemy import String, Float, Text, DateTime, Date, Boolean, ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.sql import func
-from app.db.base import Base
+from app.db.base import Base, active_index
 
 
 class TariffBenefit(Base):
@@ -12,6 +12,10 @@ class TariffBenefit(Base):
     Manba: Google Drive fayl - https://drive.google.com/file/d/1zt48lIq9nIaIqzZttvXRq-PerbJzghuZ/view
     """
     __tablename__ = "tariff_benefits"
+    __table_args__ = (
+        # Kod diapazoni bo'yicha qidiruv
+        active_index("ix_tariff_benefits_active_code_range", "tnved_code_start", "tnved_code_end"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     
@@ -57,12 +61,17 @@ class CustomsFeeRate(Base):
     Odatda BRV asosida hisoblanadi
     """
     __tablename__ = "customs_fee_rates"
+    __table_args__ = (
+        active_index("ix_customs_fee_rates_active_value_range", "min_customs_value", "max_customs_value"),
+        active_index("ix_customs_fee_rates_active_id", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     
     # Stavka parametrlari
-    min_customs_value: Mapped[Optional[float]] = mapped_column(Float, nullable=True)  # Minimal bojxona qiymati (UZS)
-    max_customs_value: Mapped[Optional[float]] = mapped_column(Float, nullable=True)  # Maksimal bojxona qiymati (UZS)
+    min_customs_value: Mapped[Optional[float]] = mapped_column(Float, nullable=True)  # Minimal bojxona qiymati
+    max_customs_value: Mapped[Optional[float]] = mapped_column(Float, nullable=True)  # Maksimal bojxona qiymati
+    value_currency: Mapped[str] = mapped_column(String(3), default="UZS", server_default="UZS")  # Chegaralar valyutasi: 'UZS' yoki 'USD'
     
     # Yig'im qiymati
     fee_type: Mapped[str] = mapped_column(String(20))  # 'fixed', 'percent', 'brv'
@@ -88,6 +97,9 @@ class BRVRate(Base):
     Har yili o'zgaradi
     """
     __tablename__ = "brv_rates"
+    __table_args__ = (
+        active_index("ix_brv_rates_active_valid_from", "valid_from"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     
@@ -1,18 +1,22 @@
 from typing import Optional
 from sqlalchemy import String, Boolean, Text
 from sqlalchemy.orm import Mapped, mapped_column
-from app.db.base import Base
+from app.db.base import Base, active_index
 
 
 class Country(Base):
     """Mamlakatlar ro'yxati"""
     __tablename__ = "countries"
+    __table_args__ = (
+        active_index("ix_countries_active_name_uz", "name_uz"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     code: Mapped[str] = mapped_column(String(3), unique=True, index=True)  # ISO 3166-1 alpha-2 (UZ, RU, CN...)
     name_uz: Mapped[str] = mapped_column(String(255))
     name_ru: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
     name_en: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    is_rnb: Mapped[bool] = mapped_column(Boolean, default=False)  # RNB (MDH) - eng qulay tarif rejimi
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
 
     def __repr__(self):
@@ -26,6 +30,9 @@ class FreeTradeCountry(Base):
     Manba: https://lex.uz/docs/4911947
     """
     __tablename__ = "free_trade_countries"
+    __table_args__ = (
+        active_index("ix_free_trade_countries_active_id", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     country_code: Mapped[str] = mapped_column(String(3), unique=True, index=True)
@@ -1,8 +1,8 @@
 from datetime import date
 from typing import Optional
-from sqlalchemy import String, Numeric, Date, Boolean, Integer
+from sqlalchemy import String, Numeric, Date, Boolean, Integer, Index
 from sqlalchemy.orm import Mapped, mapped_column
-from app.db.base import Base
+from app.db.base import Base, active_index
 
 class Currency(Base):
     __tablename__ = "currencies"
@@ -20,6 +20,9 @@ class Currency(Base):
     cbu_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)  # CBU API id
 
     __table_args__ = (
+        # Kod + sana bo'yicha kurs, kodning oxirgi faol kursi
+        Index("ix_currencies_code_date", "code", "date"),
+        active_index("ix_currencies_active_code_date", "code", "date"),
         {"schema": None},  # Default schema
     )
 
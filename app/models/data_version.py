@@ -0,0 +1,26 @@
+from datetime import datetime
+from sqlalchemy import String, Integer, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+
+class DataVersion(Base):
+    """
+    Ma'lumotnoma jadvallarining versiyalari.
+    Jadval o'zgarganda (sinxronlash, CBU yangilash, aksiz yuklash) versiya oshiriladi,
+    xotiradagi keshlar esa shu versiya bo'yicha qayta quriladi.
+    """
+    __tablename__ = "data_versions"
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    table_name: Mapped[str] = mapped_column(String(64), unique=True, index=True)
+    version: Mapped[int] = mapped_column(Integer, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now()
+    )
+
+    def __repr__(self):
+        return f"<DataVersion(table={self.table_name}, version={self.version})>"
@@ -6,7 +6,7 @@ from sqlalchemy import Float, String, Boolean, DateTime, Text
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.sql import func
 
-from app.db.base import Base
+from app.db.base import Base, active_index
 
 
 class ExciseRate(Base):
@@ -17,6 +17,9 @@ class ExciseRate(Base):
     - 289-3 modda: Neft mahsulotlari va boshqalar (shakar, shirin ichimliklar)
     """
     __tablename__ = "excise_rates"
+    __table_args__ = (
+        active_index("ix_excise_rates_active_category", "category"),
+    )
     
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     
@@ -1,7 +1,8 @@
 from .tnved import TNVedCode
-from .tariff import TariffRate
+from .tariff import TariffRate, ResolvedTariff
 from .currency import Currency
 from .country import Country, FreeTradeCountry
 from .utilization import UtilizationFee
 from .benefit import TariffBenefit, CustomsFeeRate, BRVRate
 from .excise import ExciseRate
+from .data_version import DataVersion
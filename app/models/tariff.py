@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import Float, String, ForeignKey, DateTime
+from sqlalchemy import Float, String, ForeignKey, DateTime, Integer
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 from app.db.base import Base
@@ -27,3 +27,18 @@ class TariffRate(Base):
 
     def __repr__(self):
         return f"<TariffRate(tnved_id={self.tnved_id}, duty={self.import_duty_percent}%)>"
+
+
+class ResolvedTariff(Base):
+    """
+    Har bir TN VED kod uchun amaldagi tarif (sinxronlashdan keyin qayta quriladi).
+    resolution: 'exact', 'child', 'parent' yoki NULL (tarif topilmagan)
+    """
+    __tablename__ = "resolved_tariffs"
+
+    tnved_id: Mapped[int] = mapped_column(Integer, ForeignKey("tn_ved_codes.id", ondelete="CASCADE"), primary_key=True)
+    tariff_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("tariff_rates.id", ondelete="CASCADE"), nullable=True)
+    resolution: Mapped[Optional[str]] = mapped_column(String(8), nullable=True)
+
+    def __repr__(self):
+        return f"<ResolvedTariff(tnved_id={self.tnved_id}, tariff_id={self.tariff_id}, {self.resolution})>"
@@ -1,20 +1,37 @@
 from typing import Optional, List
-from sqlalchemy import String, Text, Integer, ForeignKey
+from sqlalchemy import String, Text, Integer, ForeignKey, Index, event
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.db.base import Base
+from app.utils.translit import normalize_search_text
 
 class TNVedCode(Base):
     __tablename__ = "tn_ved_codes"
+    __table_args__ = (
+        # Nested-set: kod ostidagi barcha kodlar - bitta oraliq skaneri
+        Index("ix_tn_ved_codes_lft_rgt", "lft", "rgt"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     code: Mapped[str] = mapped_column(String(10), unique=True, index=True)
     full_code: Mapped[str] = mapped_column(String, nullable=True) 
     description: Mapped[str] = mapped_column(Text)
+    # Qidiruv uchun normallashtirilgan tavsif (lotin yozuvi, kichik harf) - yozishda quriladi
+    search_text: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     level: Mapped[int] = mapped_column(Integer)
-    parent_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("tn_ved_codes.id"), nullable=True)
+    parent_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("tn_ved_codes.id"), nullable=True, index=True)
+    # Iyerarxiya (nested-set) - sinxronlashdan keyin `tnved.rebuild_hierarchy` hisoblaydi
+    lft: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    rgt: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     parent: Mapped[Optional["TNVedCode"]] = relationship("TNVedCode", remote_side=[id], back_populates="children")
     children: Mapped[List["TNVedCode"]] = relationship("TNVedCode", back_populates="parent")
     tariff_rate: Mapped[Optional["TariffRate"]] = relationship("TariffRate", uselist=False, back_populates="tnved_code")
 
     def __repr__(self):
         return f"<TNVedCode(code={self.code}, description={self.description[:30]})>"
+
+
+@event.listens_for(TNVedCode, "before_insert")
+@event.listens_for(TNVedCode, "before_update")
+def _set_search_text(mapper, connection, target: TNVedCode) -> None:
+    """Sinxronlash/yuklash skriptlari kod qo'shganda normallashtirilgan tavsifni yozish"""
+    target.search_text = normalize_search_text(target.description)
@@ -3,7 +3,7 @@ from typing import Optional
 from sqlalchemy import String, Float, Integer, Text, DateTime, Boolean
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.sql import func
-from app.db.base import Base
+from app.db.base import Base, active_index
 
 
 class UtilizationFee(Base):
@@ -13,6 +13,10 @@ class UtilizationFee(Base):
     Asosan avtomobillar va elektronika uchun
     """
     __tablename__ = "utilization_fees"
+    __table_args__ = (
+        # Kod prefiksi / diapazoni bo'yicha qidiruv
+        active_index("ix_utilization_fees_active_code_range", "tnved_code_start", "tnved_code_end"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     
@@ -25,6 +25,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.models.currency import Currency as CurrencyModel
 from app.schemas.currency import CurrencyCreate
+from app.crud.currency import exchange_rate_store
+from app.crud.data_version import data_version
 
 # CBU API URL - rasmiy Markaziy Bank API
 CBU_API_URL = "https://cbu.uz/uz/arkhiv-kursov-valyut/json/"
@@ -110,8 +112,14 @@ class CurrencyUpdater:
                 except Exception as e:
                     result["errors"].append(f"{code}: {str(e)}")
             
+            if result["updated"]:
+                await data_version.bump(db, CurrencyModel.__tablename__)
             await db.commit()
             
+            # Kalkulyator bazaga murojaat qilmasligi uchun yangi kurslar keshini almashtirish
+            if result["updated"]:
+                await exchange_rate_store.swap(db)
+            
         except httpx.HTTPError as e:
             result["errors"].append(f"HTTP xatosi: {str(e)}")
         except Exception as e:
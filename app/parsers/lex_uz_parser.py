@@ -13,7 +13,7 @@ from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.crud.tariff import tariff
+from app.crud.tariff import after_tnved_write, tariff
 from app.crud.tnved import tnved
 from app.schemas.tariff import TariffRateCreate
 
@@ -282,6 +282,10 @@ class LexUzParser:
                 print(f"Error saving tariff for {t.tnved_code}: {e}")
                 error_count += 1
         
+        if saved_count:
+            await after_tnved_write(db)
+            await db.commit()
+        
         return saved_count, error_count
     
     async def update_all(self, db: AsyncSession):
@@ -317,11 +321,11 @@ class LexUzParser:
 # CLI uchun
 async def main():
     """Parser'ni ishga tushirish"""
-    from app.db.session import async_session
+    from app.db.session import AsyncSessionLocal
     
     parser = LexUzParser()
     
-    async with async_session() as db:
+    async with AsyncSessionLocal() as db:
         await parser.update_all(db)
 
 
@@ -3,6 +3,7 @@ from typing import List, Dict, Optional
 import docx
 import re
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.crud.tariff import after_tnved_write
 from app.crud.tnved import tnved
 from app.schemas.tnved import TNVedCreate
 
@@ -123,3 +124,6 @@ class TNVedParser:
             except Exception as e:
                 print(f"Error saving {item['code']}: {e}")
                 # Continue or generic error handling
+
+        await after_tnved_write(db)
+        await db.commit()
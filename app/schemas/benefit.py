@@ -33,6 +33,7 @@ class TariffBenefit(TariffBenefitBase):
 class CustomsFeeRateBase(BaseModel):
     min_customs_value: Optional[float] = None
     max_customs_value: Optional[float] = None
+    value_currency: str = "UZS"  # 'UZS' yoki 'USD'
     fee_type: str  # 'fixed', 'percent', 'brv'
     fee_value: float
     min_fee: Optional[float] = None
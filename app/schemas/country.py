@@ -7,6 +7,7 @@ class CountryBase(BaseModel):
     name_uz: str
     name_ru: Optional[str] = None
     name_en: Optional[str] = None
+    is_rnb: bool = False
     is_active: bool = True
 
 
@@ -18,6 +19,7 @@ class CountryUpdate(BaseModel):
     name_uz: Optional[str] = None
     name_ru: Optional[str] = None
     name_en: Optional[str] = None
+    is_rnb: Optional[bool] = None
     is_active: Optional[bool] = None
 
 
@@ -1,5 +1,5 @@
 from typing import Optional, List
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 class TNVedBase(BaseModel):
     code: str
@@ -23,3 +23,35 @@ class TNVed(TNVedInDBBase):
 
 class TNVedWithChildren(TNVed):
     children: List[TNVed] = []
+
+class TNVedTreeNode(TNVed):
+    child_count: int = 0
+    has_tariff: bool = False
+
+class TNVedResolveRequest(BaseModel):
+    codes: List[str] = Field(..., min_length=1, max_length=5000)
+
+class EffectiveTariff(BaseModel):
+    import_duty_percent: Optional[float] = None
+    import_duty_percent_non_rnb: Optional[float] = None
+    import_duty_specific: Optional[float] = None
+    import_duty_specific_non_rnb: Optional[float] = None
+    specific_unit: Optional[str] = None
+    excise_percent: Optional[float] = None
+    excise_specific: Optional[float] = None
+    vat_percent: Optional[float] = None
+    model_config = ConfigDict(from_attributes=True)
+
+class TNVedResolved(BaseModel):
+    code: str
+    exists: bool
+    description: Optional[str] = None
+    tariff: Optional[EffectiveTariff] = None
+    tariff_resolution: Optional[str] = None
+
+class TNVedSuggestRequest(BaseModel):
+    description: str = Field(..., min_length=2, max_length=2000)
+    limit: int = Field(default=10, ge=1, le=50)
+
+class TNVedSuggestion(TNVed):
+    score: float
@@ -0,0 +1,284 @@
+"""
+Ustunli (vektorlashtirilgan) hisoblash - katta fayllarni qayta hisoblash uchun.
+
+CustomsCalculator bilan bir xil qoidalar NumPy massivlari ustida bajariladi:
+1. Ma'lumotnoma qidiruvlari (kod, tarif, kurs, mamlakat, aksiz, utilizatsiya)
+   har bir noyob qiymat uchun bir marta RateBook dan olinadi
+2. Bojxona qiymati, yig'im (BRV diapazonlari), poshlina max(advalor, spetsifik),
+   aksiz, QQS va jami - massiv amallari bilan
+
+Kirish ustunlari API dagi CalculateRequest maydonlari bilan bir xil:
+code, price, currency, weight, quantity, country_origin, has_certificate,
+delivery_cost, insurance_cost, engine_volume, vehicle_age
+"""
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.services.calculator import DutyRateType, select_duty_rates
+from app.services.rate_book import RateBook
+
+# Ustunlar va ularning standart qiymatlari (CalculateRequest bilan bir xil)
+INPUT_DEFAULTS = {
+    "currency": "USD",
+    "quantity": np.nan,
+    "country_origin": "XX",
+    "has_certificate": False,
+    "delivery_cost": 0.0,
+    "insurance_cost": 0.0,
+    "engine_volume": np.nan,
+    "vehicle_age": np.nan,
+}
+REQUIRED_COLUMNS = ("code", "price", "weight")
+
+# Aksiz spetsifik stavka birliklari
+UNIT_1000PCS, UNIT_PCS, UNIT_LITER, UNIT_KG, UNIT_TON, UNIT_ML, UNIT_OTHER = range(7)
+
+
+def _unit_kind(unit: str) -> int:
+    """Aksiz birligini aniqlash (CustomsCalculator._calculate_excise tartibida)"""
+    if "1000pcs" in unit:
+        return UNIT_1000PCS
+    if "pcs" in unit:
+        return UNIT_PCS
+    if "liter" in unit:
+        return UNIT_LITER
+    if "kg" in unit:
+        return UNIT_KG
+    if "ton" in unit:
+        return UNIT_TON
+    if "ml" in unit:
+        return UNIT_ML
+    return UNIT_OTHER
+
+
+def _optional_int(value) -> Optional[int]:
+    return None if pd.isna(value) else int(value)
+
+
+class BatchEngine:
+    """RateBook asosida ko'p qatorli hisoblash"""
+
+    def __init__(self, rate_book: RateBook):
+        self.book = rate_book
+
+    # --- Qidiruvlar (har bir noyob qiymat uchun bir marta) ---
+
+    def _exchange_rate(self, currency_code: str) -> Optional[float]:
+        if currency_code == "UZS":
+            return 1.0
+        found = self.book.get_today_rate(currency_code) or self.book.get_latest_rate(currency_code)
+        return float(found.rate_uzs) if found else None
+
+    def _duty_rate_type(self, country_code: str, has_certificate: bool) -> DutyRateType:
+        if country_code == "XX" or not country_code:
+            return DutyRateType.DOUBLE
+        if self.book.is_free_trade(country_code) and has_certificate:
+            return DutyRateType.FREE_TRADE
+        if self.book.is_rnb(country_code):
+            return DutyRateType.RNB
+        return DutyRateType.NON_RNB
+
+    def _utilization_amount(self, code: str, engine_volume: Optional[int], vehicle_age: Optional[int]) -> float:
+        if not code.startswith("8703"):
+            return 0.0
+        fee = self.book.get_utilization_fee(code, engine_volume=engine_volume, vehicle_age=vehicle_age)
+        if not fee:
+            return 0.0
+        if fee.fee_type == "brv_multiplier" and fee.brv_multiplier:
+            brv_amount = self.book.brv.amount if self.book.brv else 375000
+            return brv_amount * fee.brv_multiplier
+        if fee.fee_type == "fixed" and fee.fee_amount:
+            return fee.fee_amount
+        return 0.0
+
+    # --- Hisoblash ---
+
+    def calculate(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """
+        Jadvaldagi har bir qator uchun bojxona to'lovlarini hisoblash.
+
+        Natijada kirish ustunlariga quyidagilar qo'shiladi: exchange_rate,
+        customs_value_uzs, customs_value_usd, duty_rate_type, tariff_resolution,
+        customs_fee, import_duty, excise, vat, utilization_fee, total_uzs,
+        total_usd, effective_rate_percent, error.
+        """
+        missing = [c for c in REQUIRED_COLUMNS if c not in frame.columns]
+        if missing:
+            raise ValueError(f"Ustunlar topilmadi: {', '.join(missing)}")
+
+        df = frame.copy()
+        for column, default in INPUT_DEFAULTS.items():
+            if column not in df.columns:
+                df[column] = default
+        df["code"] = df["code"].astype(str).str.strip()
+        df["currency"] = df["currency"].fillna("USD").astype(str)
+        df["country_origin"] = df["country_origin"].fillna("XX").astype(str)
+        df["has_certificate"] = df["has_certificate"].fillna(False).astype(bool)
+
+        n = len(df)
+        error = np.full(n, None, dtype=object)
+
+        # 1. Kod va tarif
+        code_idx, codes = pd.factorize(df["code"])
+        tariffs = []
+        resolutions = np.full(len(codes), None, dtype=object)
+        code_errors = np.full(len(codes), None, dtype=object)
+        for i, code in enumerate(codes):
+            code_obj = self.book.get_tnved(code)
+            tariff_obj, resolution = self.book.get_tariff(code_obj) if code_obj else (None, None)
+            if not code_obj:
+                code_errors[i] = f"TNVED kod topilmadi: {code}"
+            elif not tariff_obj:
+                code_errors[i] = (
+                    f"Lex.uz bazasida '{code}' kodi uchun tarif mavjud emas. "
+                    f"Faqat rasmiy lex.uz ma'lumotlari bilan ishlash mumkin."
+                )
+            tariffs.append(tariff_obj)
+            resolutions[i] = resolution
+        error = code_errors[code_idx]
+
+        # 2. Valyuta kurslari
+        currency_idx, currencies = pd.factorize(df["currency"])
+        currency_rates = np.array([self._exchange_rate(c) or np.nan for c in currencies], dtype=float)
+        exchange_rate = currency_rates[currency_idx]
+        no_rate = np.isnan(exchange_rate) & (error == None)  # noqa: E711
+        error[no_rate] = [f"Valyuta kursi topilmadi: {c}" for c in df["currency"].to_numpy()[no_rate]]
+
+        usd_rate = self._exchange_rate("USD")
+        if usd_rate is None:
+            error[error == None] = "Valyuta kursi topilmadi: USD"  # noqa: E711
+            usd_rate = np.nan
+
+        ok = error == None  # noqa: E711
+        price = df["price"].to_numpy(dtype=float)
+        weight = df["weight"].to_numpy(dtype=float)
+        delivery = df["delivery_cost"].fillna(0).to_numpy(dtype=float)
+        insurance = df["insurance_cost"].fillna(0).to_numpy(dtype=float)
+        quantity = df["quantity"].to_numpy(dtype=float)
+
+        # 3. Bojxona qiymati
+        customs_value_uzs = price * exchange_rate + delivery * exchange_rate + insurance * exchange_rate
+        customs_value_usd = customs_value_uzs / usd_rate if usd_rate > 0 else np.zeros(n)
+
+        # 4. Poshlina stavka turi
+        country_keys = list(zip(df["country_origin"], df["has_certificate"]))
+        type_cache: Dict[Tuple[str, bool], DutyRateType] = {}
+        duty_types = np.empty(n, dtype=object)
+        for row, key in enumerate(country_keys):
+            if key not in type_cache:
+                type_cache[key] = self._duty_rate_type(*key)
+            duty_types[row] = type_cache[key]
+
+        # 5. Bojxona rasmiylash yig'imi
+        brv_amount = self.book.brv.amount if self.book.brv else 412000.0
+        schedule = self.book.customs_fee_schedule
+        brackets = schedule.find_many(schedule.bracket_value(customs_value_uzs, customs_value_usd))
+        customs_fee = schedule.fees(brackets, customs_value_uzs, brv_amount)
+
+        # 6. Import poshlina: max(advalor, spetsifik)
+        duty_percent = np.zeros(n)
+        duty_specific = np.zeros(n)
+        rate_cache: Dict[Tuple[int, DutyRateType], Tuple[float, float]] = {}
+        for row in np.flatnonzero(ok):
+            key = (code_idx[row], duty_types[row])
+            if key not in rate_cache:
+                if key[1] == DutyRateType.FREE_TRADE:
+                    rate_cache[key] = (0.0, 0.0)
+                else:
+                    percent, specific, _ = select_duty_rates(tariffs[key[0]], key[1])
+                    rate_cache[key] = (float(percent), float(specific) if specific else 0.0)
+            duty_percent[row], duty_specific[row] = rate_cache[key]
+
+        advalorem_duty = customs_value_uzs * (duty_percent / 100)
+        specific_duty = (duty_specific * usd_rate) * weight
+        import_duty = np.where((specific_duty > advalorem_duty) & (specific_duty > 0), specific_duty, advalorem_duty)
+
+        # 7. Aksiz
+        excise_base = customs_value_uzs + import_duty
+        excise_specific = np.zeros(len(codes))
+        excise_unit = np.full(len(codes), UNIT_OTHER)
+        excise_percent = np.zeros(len(codes))
+        for i, code in enumerate(codes):
+            if tariffs[i] is None:
+                continue
+            entry = self.book.get_excise_rate(code)
+            if entry and entry.import_rate_specific:
+                excise_specific[i] = entry.import_rate_specific
+                excise_unit[i] = _unit_kind(entry.import_rate_unit or "")
+            elif entry and entry.import_rate_percent:
+                excise_percent[i] = entry.import_rate_percent
+            elif tariffs[i].excise_percent:
+                excise_percent[i] = tariffs[i].excise_percent
+
+        specific_rate = excise_specific[code_idx]
+        unit = excise_unit[code_idx]
+        qty = np.where(np.isnan(quantity) | (quantity == 0), 1, quantity)
+        specific_excise = np.select(
+            [unit == UNIT_1000PCS, unit == UNIT_PCS, unit == UNIT_TON, unit == UNIT_ML],
+            [(qty / 1000) * specific_rate, qty * specific_rate, (weight / 1000) * specific_rate, (weight * 1000) * specific_rate],
+            default=weight * specific_rate
+        )
+        excise = np.where(
+            specific_rate != 0,
+            specific_excise,
+            excise_base * (excise_percent[code_idx] / 100)
+        )
+
+        # 8. QQS
+        vat_percent = np.array([t.vat_percent if t else 12.0 for t in tariffs], dtype=float)[code_idx]
+        vat = (customs_value_uzs + import_duty + excise) * (vat_percent / 100)
+
+        # 9. Utilizatsiya yig'imi
+        utilization = np.zeros(n)
+        util_cache: Dict[Tuple[str, Optional[int], Optional[int]], float] = {}
+        engine_volume = df["engine_volume"].to_numpy()
+        vehicle_age = df["vehicle_age"].to_numpy()
+        for row in np.flatnonzero(ok):
+            code = codes[code_idx[row]]
+            if not code.startswith("8703"):
+                continue
+            key = (code, _optional_int(engine_volume[row]), _optional_int(vehicle_age[row]))
+            if key not in util_cache:
+                util_cache[key] = self._utilization_amount(*key)
+            utilization[row] = util_cache[key]
+
+        # 10. Jami
+        total_uzs = customs_fee + import_duty + excise + vat + utilization
+        total_usd = total_uzs / usd_rate if usd_rate > 0 else np.zeros(n)
+        effective = [
+            round(t / cv * 100, 2) if cv > 0 else 0
+            for t, cv in zip(total_uzs.tolist(), customs_value_uzs.tolist())
+        ]
+
+        result = {
+            "exchange_rate": exchange_rate,
+            "customs_value_uzs": customs_value_uzs,
+            "customs_value_usd": customs_value_usd,
+            "duty_rate_type": [t.value for t in duty_types],
+            "tariff_resolution": resolutions[code_idx],
+            "customs_fee": customs_fee,
+            "import_duty": import_duty,
+            "excise": excise,
+            "vat": vat,
+            "utilization_fee": utilization,
+            "total_uzs": total_uzs,
+            "total_usd": total_usd,
+            "effective_rate_percent": effective,
+        }
+        for column, values in result.items():
+            values = np.asarray(values, dtype=object if column in ("duty_rate_type", "tariff_resolution") else float)
+            if values.dtype == float:
+                values = np.where(ok, values, np.nan)
+            else:
+                values = np.where(ok, values, None)
+            df[column] = values
+        df["error"] = error
+        return df
+
+
+def calculate_frame(rate_book: RateBook, frame: pd.DataFrame) -> pd.DataFrame:
+    """Qisqa yo'l: BatchEngine(rate_book).calculate(frame)"""
+    return BatchEngine(rate_book).calculate(frame)
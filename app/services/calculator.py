@@ -17,19 +17,27 @@ Maxsus holatlar:
 - Imtiyozlar - turli chegirmalar
 """
 
+import asyncio
 from dataclasses import dataclass
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Callable, Awaitable, TypeVar
 from datetime import date
 from enum import Enum
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.db.session import ReadSessionPool
+
 from app.crud.tnved import tnved
 from app.crud.tariff import tariff
-from app.crud.currency import currency
-from app.crud.country import free_trade_country
-from app.crud.benefit import tariff_benefit, customs_fee_rate, brv_rate
+from app.crud.currency import exchange_rate_store
+from app.crud.country import country_registry_store
+from app.crud.benefit import CustomsFeeSchedule, tariff_benefit, customs_fee_rate, brv_rate
 from app.crud.utilization import utilization_fee
 from app.crud.excise import excise as excise_crud
+from app.services.lookup import LookupContext
+from app.services.rate_book import RateBook
+
+
+T = TypeVar("T")
 
 
 class DutyRateType(str, Enum):
@@ -40,19 +48,39 @@ class DutyRateType(str, Enum):
     DOUBLE = "double"  # Noma'lum mamlakat (2x stavka)
     PREFERENTIAL = "preferential"  # Imtiyozli
 
-RNB_COUNTRIES = {
-    "RU",  # Rossiya
-    "KZ",  # Qozog'iston
-    "KG",  # Qirg'iziston
-    "TJ",  # Tojikiston
-    "BY",  # Belarusiya
-    "AM",  # Armaniston
-    "AZ",  # Ozarbayjon
-    "MD",  # Moldova
-    "UA",  # Ukraina
-    "GE",  # Gruziya
-    "TM",  # Turkmaniston
-}
+
+def select_duty_rates(tariff_obj, duty_rate_type: DutyRateType):
+    """
+    Stavka turiga qarab poshlina stavkalarini tanlash.
+    
+    Returns:
+        (foiz stavka, spetsifik stavka yoki None, izoh)
+    """
+    # RNB yoki non-RNB stavka tanlash
+    if duty_rate_type == DutyRateType.RNB:
+        # RNB (MDH) mamlakatlari uchun import_duty_percent
+        duty_percent = tariff_obj.import_duty_percent
+        duty_specific = tariff_obj.import_duty_specific
+        rate_note = "RNB stavka (MDH)"
+    elif duty_rate_type == DutyRateType.DOUBLE:
+        # Noma'lum mamlakat - 2x stavka
+        duty_percent = (tariff_obj.import_duty_percent or 0) * 2
+        duty_specific = (tariff_obj.import_duty_specific or 0) * 2
+        rate_note = "Noma'lum mamlakat (2x stavka)"
+    else:
+        # NON_RNB - Boshqa mamlakatlar uchun import_duty_percent_non_rnb
+        duty_percent = getattr(tariff_obj, 'import_duty_percent_non_rnb', None)
+        duty_specific = getattr(tariff_obj, 'import_duty_specific_non_rnb', None)
+        
+        # Agar non_rnb qiymati yo'q bo'lsa, RNB qiymatini 2x qilish
+        if duty_percent is None:
+            duty_percent = (tariff_obj.import_duty_percent or 0) * 2
+        if duty_specific is None:
+            duty_specific = (tariff_obj.import_duty_specific or 0) * 2 if tariff_obj.import_duty_specific else None
+            
+        rate_note = "Non-RNB stavka"
+    
+    return duty_percent or 0, duty_specific, rate_note
 
 
 @dataclass
@@ -114,34 +142,55 @@ class CalculationResult:
 class CustomsCalculator:
     """Bojxona to'lovlari kalkulyatori"""
     
-    def __init__(self, db: AsyncSession):
+    def __init__(
+        self,
+        db: Optional[AsyncSession] = None,
+        rate_book: Optional[RateBook] = None,
+        read_sessions: Optional[ReadSessionPool] = None
+    ):
+        """
+        Args:
+            db: Baza sessiyasi - ma'lumotlar har safar so'rov orqali olinadi
+            rate_book: Xotiradagi ma'lumotnoma - hisoblash bazaga murojaat qilmaydi
+            read_sessions: O'qish sessiyalari puli - bog'liq bo'lmagan qidiruvlar parallel bajariladi
+        """
+        if db is None and rate_book is None and read_sessions is None:
+            raise ValueError("CustomsCalculator uchun db, rate_book yoki read_sessions kerak")
         self.db = db
+        self.rate_book = rate_book
+        self.read_sessions = read_sessions
         self.warnings: List[str] = []
+        self.lookups = self._new_lookups()
+    
+    def _new_lookups(self) -> LookupContext:
+        return LookupContext(source="rate_book" if self.rate_book else "db")
     
     async def calculate(self, input_data: CalculationInput) -> CalculationResult:
         """Asosiy hisoblash funksiyasi"""
         self.warnings = []
+        # Har bir hisoblash uchun yangi qidiruvlar xotirasi
+        self.lookups = self._new_lookups()
         payments: List[PaymentItem] = []
         
+        # Bog'liq bo'lmagan qidiruvlarni parallel bajarish (natijalar self.lookups da)
+        if self.read_sessions and not self.rate_book:
+            await self._prefetch(input_data)
+        
         # 1. TNVED kodni tekshirish va tarif olish
-        code_obj = await tnved.get_by_code(self.db, code=input_data.tnved_code)
+        code_obj = await self._get_tnved(input_data.tnved_code)
         if not code_obj:
             raise ValueError(f"TNVED kod topilmadi: {input_data.tnved_code}")
         
-        # Avval aniq kod uchun tarif qidirish
-        tariff_obj = await tariff.get_by_tnved_id(self.db, tnved_id=code_obj.id)
+        tariff_obj, tariff_resolution = await self._get_tariff(code_obj)
         
-        # Agar topilmasa, shu kod bilan boshlanadigan kodlardan tarif olish
         if not tariff_obj:
-            tariff_obj = await tariff.get_by_code_prefix(self.db, code=input_data.tnved_code)
-            if tariff_obj:
-                self.warnings.append(f"Aniq tarif topilmadi, {input_data.tnved_code}* bo'yicha tarif ishlatilmoqda")
-            else:
-                # TARIF TOPILMASA - XATO QAYTARISH (standart qiymat yo'q!)
-                raise ValueError(
-                    f"Lex.uz bazasida '{input_data.tnved_code}' kodi uchun tarif mavjud emas. "
-                    f"Faqat rasmiy lex.uz ma'lumotlari bilan ishlash mumkin."
-                )
+            # TARIF TOPILMASA - XATO QAYTARISH (standart qiymat yo'q!)
+            raise ValueError(
+                f"Lex.uz bazasida '{input_data.tnved_code}' kodi uchun tarif mavjud emas. "
+                f"Faqat rasmiy lex.uz ma'lumotlari bilan ishlash mumkin."
+            )
+        if tariff_resolution != "exact":
+            self.warnings.append(f"Aniq tarif topilmadi, {input_data.tnved_code}* bo'yicha tarif ishlatilmoqda")
         
         # 2. Valyuta kursini olish
         exchange_rate = await self._get_exchange_rate(input_data.currency_code)
@@ -229,33 +278,149 @@ class CustomsCalculator:
                 "tariff_duty_percent": tariff_obj.import_duty_percent if tariff_obj else None,
                 "tariff_excise_percent": tariff_obj.excise_percent if tariff_obj else None,
                 "tariff_vat_percent": tariff_obj.vat_percent if tariff_obj else 12.0,
+                "tariff_resolution": tariff_resolution,
+                "lookups": self.lookups.stats(),
             },
             warnings=self.warnings
         )
     
+    async def _prefetch(self, input_data: CalculationInput) -> None:
+        """
+        Tarif, valyuta kurslari, erkin savdo, BRV va yig'im jadvalini bir vaqtda olish.
+        Har bir qidiruv puldan alohida sessiya oladi. Xatolar bu yerda e'tiborsiz
+        qoldiriladi - keyingi ketma-ket bosqichda asl tartibda qayta ko'tariladi.
+        """
+        async def tariff_for_code():
+            code_obj = await self._get_tnved(input_data.tnved_code)
+            if code_obj:
+                await self._get_tariff(code_obj)
+        
+        lookups = [
+            tariff_for_code(),
+            self._get_brv(),
+            self._get_customs_fee_schedule(),
+        ]
+        for currency_code in {input_data.currency_code, "USD"} - {"UZS"}:
+            lookups.append(self.lookups.get(
+                "exchange_rate", currency_code, lambda code=currency_code: self._fetch_exchange_rate(code)
+            ))
+        if input_data.country_origin and input_data.country_origin != "XX":
+            lookups.append(self._get_free_trade(input_data.country_origin))
+        
+        await asyncio.gather(*lookups, return_exceptions=True)
+    
+    async def _with_session(self, fetch: Callable[[AsyncSession], Awaitable[T]]) -> T:
+        """Bazadan o'qish: pul bo'lsa alohida sessiyada (parallel), aks holda so'rov sessiyasida"""
+        if self.read_sessions is None:
+            return await fetch(self.db)
+        async with self.read_sessions.session() as db:
+            return await fetch(db)
+    
+    async def _get_tnved(self, code: str):
+        """TNVED kodni olish (RateBook yoki bazadan)"""
+        if self.rate_book:
+            return await self.lookups.get("tnved", code, lambda: self.rate_book.get_tnved(code))
+        return await self.lookups.get(
+            "tnved", code, lambda: self._with_session(lambda db: tnved.get_by_code(db, code=code))
+        )
+    
+    async def _get_tariff(self, code_obj):
+        """
+        Kod uchun tarif va uning qanday topilgani.
+        Avval aniq kod, topilmasa shu kod bilan boshlanadigan yoki ota-kodlardan.
+        """
+        return await self.lookups.get("tariff", code_obj.code, lambda: self._fetch_tariff(code_obj))
+    
+    async def _fetch_tariff(self, code_obj):
+        if self.rate_book:
+            return self.rate_book.get_tariff(code_obj)
+        return await self._with_session(lambda db: self._fetch_tariff_from_db(db, code_obj))
+    
+    async def _fetch_tariff_from_db(self, db: AsyncSession, code_obj):
+        # Sinxronlashda oldindan hisoblangan natija - bitta PK so'rov
+        resolved = await tariff.get_resolved(db, tnved_id=code_obj.id)
+        if resolved is not None and resolved[1] == "exact":
+            return resolved
+        
+        # Kodning o'z tarifi jadval qurilgandan keyin qo'shilgan bo'lishi mumkin
+        tariff_obj = await tariff.get_by_tnved_id(db, tnved_id=code_obj.id)
+        if tariff_obj:
+            return tariff_obj, "exact"
+        if resolved is not None:
+            return resolved
+        
+        return await tariff.resolve_by_code_prefix(db, code=code_obj.code)
+    
+    async def _get_brv(self):
+        """Joriy BRV qiymatini olish (yig'im va utilizatsiya uchun bir marta)"""
+        if self.rate_book:
+            return await self.lookups.get("brv", None, lambda: self.rate_book.brv)
+        return await self.lookups.get(
+            "brv", None, lambda: self._with_session(lambda db: brv_rate.get_current(db))
+        )
+    
+    async def _get_customs_fee_schedule(self) -> CustomsFeeSchedule:
+        """Bojxona rasmiylash yig'imi jadvali"""
+        if self.rate_book:
+            return await self.lookups.get(
+                "customs_fee_schedule", None, lambda: self.rate_book.customs_fee_schedule
+            )
+        return await self.lookups.get(
+            "customs_fee_schedule", None,
+            lambda: self._with_session(lambda db: customs_fee_rate.get_schedule(db))
+        )
+    
     async def _get_exchange_rate(self, currency_code: str) -> float:
         """Valyuta kursini olish"""
         if currency_code == "UZS":
             return 1.0
         
-        # Bugungi kurs
-        curr_obj = await currency.get_by_code_and_date(
-            self.db, code=currency_code, date_obj=date.today()
+        # Bugungi va so'nggi kurs (kirish valyutasi USD bo'lsa, ikkinchi marta xotiradan)
+        curr_obj, found = await self.lookups.get(
+            "exchange_rate", currency_code, lambda: self._fetch_exchange_rate(currency_code)
         )
         
         if curr_obj:
             return float(curr_obj.rate_uzs)
         
-        # Bugungi topilmasa, so'nggi kursni olish
-        rates = await currency.get_latest_rates(self.db)
-        found = next((r for r in rates if r.code == currency_code), None)
-        
+        # Bugungi topilmasa, so'nggi kurs
         if found:
             self.warnings.append(f"Bugungi {currency_code} kursi topilmadi, so'nggi kurs ishlatilmoqda")
             return float(found.rate_uzs)
         
         raise ValueError(f"Valyuta kursi topilmadi: {currency_code}")
     
+    async def _fetch_exchange_rate(self, currency_code: str):
+        """(bugungi kurs, so'nggi kurs) - RateBook yoki jarayon bo'yicha umumiy kurslar keshidan"""
+        if self.rate_book:
+            return (
+                self.rate_book.get_today_rate(currency_code),
+                self.rate_book.get_latest_rate(currency_code),
+            )
+        rates = await self._with_session(exchange_rate_store.get)
+        return rates.get(currency_code, date.today()), rates.get_latest(currency_code)
+    
+    async def _get_country_registry(self):
+        """Mamlakatlar, erkin savdo va RNB ro'yxati - jarayon bo'yicha umumiy keshdan"""
+        return await self.lookups.get(
+            "countries", "registry", lambda: self._with_session(country_registry_store.get)
+        )
+    
+    async def _get_free_trade(self, country_code: str):
+        """Mamlakatning erkin savdo yozuvi (yo'q bo'lsa None)"""
+        code = country_code.upper()
+        if self.rate_book:
+            return await self.lookups.get("free_trade", code, lambda: self.rate_book.free_trade.get(code))
+        registry = await self._get_country_registry()
+        return registry.get_free_trade(code)
+    
+    async def _is_rnb(self, country_code: str) -> bool:
+        """Mamlakat RNB (MDH) rejimidami"""
+        if self.rate_book:
+            return self.rate_book.is_rnb(country_code)
+        registry = await self._get_country_registry()
+        return registry.is_rnb(country_code)
+    
     async def _determine_duty_rate_type(
         self, 
         country_code: str, 
@@ -268,9 +433,7 @@ class CustomsCalculator:
             return DutyRateType.DOUBLE
         
         # Erkin savdo zonasi tekshiruvi
-        is_free_trade = await free_trade_country.is_free_trade(
-            self.db, country_code=country_code
-        )
+        is_free_trade = await self._get_free_trade(country_code) is not None
         
         if is_free_trade and has_certificate:
             return DutyRateType.FREE_TRADE
@@ -280,7 +443,7 @@ class CustomsCalculator:
             )
         
         # RNB (MDH) mamlakatlar tekshiruvi
-        if country_code.upper() in RNB_COUNTRIES:
+        if await self._is_rnb(country_code):
             return DutyRateType.RNB
         
         # Boshqa mamlakatlar - NON_RNB (yuqori stavka)
@@ -291,7 +454,9 @@ class CustomsCalculator:
         Bojxona rasmiylash yig'imini hisoblash.
         
         O'zbekiston bojxona kodeksiga muvofiq (TP-55),
-        bojxona rasmiylash yig'imi BRV asosida hisoblanadi:
+        bojxona rasmiylash yig'imi BRV asosida hisoblanadi.
+        Chegaralar customs_fee_rates jadvalidan olinadi (jadval bo'sh bo'lsa -
+        DEFAULT_CUSTOMS_FEE_BRACKETS):
         
         | Bojxona qiymati (USD)   | BRV koeffitsienti |
         |-------------------------|-------------------|
@@ -305,35 +470,35 @@ class CustomsCalculator:
         """
         
         # BRV qiymatini olish
-        brv_obj = await brv_rate.get_current(self.db)
+        brv_obj = await self._get_brv()
         brv_amount = brv_obj.amount if brv_obj else 412000.0  # 2025 yil uchun default
         
-        # BRV koeffitsientini aniqlash
-        if customs_value_usd <= 1000:
-            brv_coefficient = 0.3
-        elif customs_value_usd <= 5000:
-            brv_coefficient = 0.5
-        elif customs_value_usd <= 10000:
-            brv_coefficient = 1.0
-        elif customs_value_usd <= 20000:
-            brv_coefficient = 1.5
-        elif customs_value_usd <= 50000:
-            brv_coefficient = 3.0
-        elif customs_value_usd <= 100000:
-            brv_coefficient = 5.0
-        else:
-            brv_coefficient = 10.0
+        # Yig'im stavkasini aniqlash
+        schedule = await self._get_customs_fee_schedule()
+        index = schedule.find(schedule.bracket_value(customs_value_uzs, customs_value_usd))
+        self.warnings.extend(schedule.warnings)
+        fee_type = schedule.fee_types[index]
+        fee_value = float(schedule.fee_values[index])
+        amount = schedule.fee(index, customs_value_uzs, brv_amount)
         
-        amount = brv_amount * brv_coefficient
+        if fee_type == "brv":
+            return PaymentItem(
+                name="Customs Fee",
+                name_uz="Bojxona rasmiylash yig'imi",
+                base=brv_amount,
+                rate=fee_value,
+                rate_type="brv",
+                amount=amount,
+                note=f"BRV x {fee_value} (TP-55)"
+            )
         
         return PaymentItem(
             name="Customs Fee",
             name_uz="Bojxona rasmiylash yig'imi",
-            base=brv_amount,
-            rate=brv_coefficient,
-            rate_type="brv",
-            amount=amount,
-            note=f"BRV x {brv_coefficient} (TP-55)"
+            base=customs_value_uzs if fee_type == "percent" else 0,
+            rate=fee_value,
+            rate_type=fee_type,
+            amount=amount
         )
     
     async def _calculate_import_duty(
@@ -370,31 +535,7 @@ class CustomsCalculator:
                 note="Tarif ma'lumoti topilmadi"
             )
         
-        # RNB yoki non-RNB stavka tanlash
-        if duty_rate_type == DutyRateType.RNB:
-            # RNB (MDH) mamlakatlari uchun import_duty_percent
-            duty_percent = tariff_obj.import_duty_percent
-            duty_specific = tariff_obj.import_duty_specific
-            rate_note = "RNB stavka (MDH)"
-        elif duty_rate_type == DutyRateType.DOUBLE:
-            # Noma'lum mamlakat - 2x stavka
-            duty_percent = (tariff_obj.import_duty_percent or 0) * 2
-            duty_specific = (tariff_obj.import_duty_specific or 0) * 2
-            rate_note = "Noma'lum mamlakat (2x stavka)"
-        else:
-            # NON_RNB - Boshqa mamlakatlar uchun import_duty_percent_non_rnb
-            duty_percent = getattr(tariff_obj, 'import_duty_percent_non_rnb', None)
-            duty_specific = getattr(tariff_obj, 'import_duty_specific_non_rnb', None)
-            
-            # Agar non_rnb qiymati yo'q bo'lsa, RNB qiymatini 2x qilish
-            if duty_percent is None:
-                duty_percent = (tariff_obj.import_duty_percent or 0) * 2
-            if duty_specific is None:
-                duty_specific = (tariff_obj.import_duty_specific or 0) * 2 if tariff_obj.import_duty_specific else None
-                
-            rate_note = "Non-RNB stavka"
-        
-        duty_percent = duty_percent or 0
+        duty_percent, duty_specific, rate_note = select_duty_rates(tariff_obj, duty_rate_type)
         
         # Advalor (foizli) hisoblash
         advalorem_duty = customs_value_uzs * (float(duty_percent) / 100)
@@ -447,7 +588,15 @@ class CustomsCalculator:
         excise_base = customs_value_uzs + import_duty_amount
         
         # 1. Avval excise_rates jadvalidan tekshiramiz (yangi sistema)
-        excise_rate_obj = await excise_crud.get_by_tnved_code(self.db, tnved_code)
+        if self.rate_book:
+            excise_rate_obj = await self.lookups.get(
+                "excise", tnved_code, lambda: self.rate_book.get_excise_rate(tnved_code)
+            )
+        else:
+            excise_rate_obj = await self.lookups.get(
+                "excise", tnved_code,
+                lambda: self._with_session(lambda db: excise_crud.get_by_tnved_code(db, tnved_code))
+            )
         
         if excise_rate_obj:
             # Spetsifik stavka (absolyut summa)
@@ -574,12 +723,22 @@ class CustomsCalculator:
         if not tnved_code.startswith("8703"):
             return None
         
-        util_fee_obj = await utilization_fee.get_by_tnved_code(
-            self.db,
-            tnved_code=tnved_code,
-            engine_volume=engine_volume_cc,
-            vehicle_age=vehicle_age_years
-        )
+        key = (tnved_code, engine_volume_cc, vehicle_age_years)
+        if self.rate_book:
+            util_fee_obj = await self.lookups.get("utilization", key, lambda: self.rate_book.get_utilization_fee(
+                tnved_code,
+                engine_volume=engine_volume_cc,
+                vehicle_age=vehicle_age_years
+            ))
+        else:
+            util_fee_obj = await self.lookups.get("utilization", key, lambda: self._with_session(
+                lambda db: utilization_fee.get_by_tnved_code(
+                    db,
+                    tnved_code=tnved_code,
+                    engine_volume=engine_volume_cc,
+                    vehicle_age=vehicle_age_years
+                )
+            ))
         
         if not util_fee_obj:
             self.warnings.append("Avtomobil uchun utilizatsiya yig'imi topilmadi")
@@ -587,7 +746,7 @@ class CustomsCalculator:
         
         # BRV asosida hisoblash
         if util_fee_obj.fee_type == "brv_multiplier" and util_fee_obj.brv_multiplier:
-            brv_obj = await brv_rate.get_current(self.db)
+            brv_obj = await self._get_brv()
             
             if not brv_obj:
                 self.warnings.append("Joriy BRV qiymati topilmadi, default ishlatilmoqda")
@@ -0,0 +1,66 @@
+"""
+So'rov davomidagi ma'lumotnoma qidiruvlari xotirasi.
+
+Bitta hisoblash (yoki bitta API so'rovi) ichida bir xil qidiruv (BRV, USD kursi,
+erkin savdo yozuvi...) faqat bir marta bajariladi. Hit/miss hisoblagichlari
+hisoblash natijasida qaytariladi - har bir hisoblash nechta murojaat qilgani ko'rinadi.
+"""
+
+import asyncio
+import inspect
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple, TypeVar, Union
+
+T = TypeVar("T")
+
+
+class LookupContext:
+    """Qidiruv natijalari (tur, kalit) bo'yicha saqlanadi"""
+
+    def __init__(self, source: str = "db"):
+        self.source = source
+        self._values: Dict[Tuple[str, Hashable], Any] = {}
+        # Bajarilayotgan qidiruvlar - parallel so'ralganda ikkinchisi shu natijani kutadi
+        self._pending: Dict[Tuple[str, Hashable], asyncio.Future] = {}
+        self.hits: Counter = Counter()
+        self.misses: Counter = Counter()
+
+    async def get(
+        self,
+        kind: str,
+        key: Hashable,
+        fetch: Callable[[], Union[T, Awaitable[T]]]
+    ) -> T:
+        """Natija xotirada bo'lsa qaytarish, aks holda `fetch()` chaqirib saqlash"""
+        cache_key = (kind, key)
+        if cache_key in self._values:
+            self.hits[kind] += 1
+            return self._values[cache_key]
+        if cache_key in self._pending:
+            self.hits[kind] += 1
+            return await self._pending[cache_key]
+
+        self.misses[kind] += 1
+        value = fetch()
+        if inspect.isawaitable(value):
+            future = asyncio.ensure_future(value)
+            self._pending[cache_key] = future
+            try:
+                value = await future
+            finally:
+                del self._pending[cache_key]
+        self._values[cache_key] = value
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        """Hisoblagichlar: jami va har bir qidiruv turi bo'yicha"""
+        kinds = sorted(set(self.hits) | set(self.misses))
+        return {
+            "source": self.source,
+            "hits": sum(self.hits.values()),
+            "misses": sum(self.misses.values()),
+            "by_kind": {
+                kind: {"hits": self.hits[kind], "misses": self.misses[kind]}
+                for kind in kinds
+            },
+        }
@@ -0,0 +1,371 @@
+"""
+RateBook - ma'lumotnoma jadvallarining xotiradagi o'zgarmas nusxasi.
+
+Hisoblash uchun kerak bo'lgan barcha jadvallar (tn_ved_codes, tariff_rates,
+currencies, countries, free_trade_countries, brv_rates, excise_rates, utilization_fees,
+tariff_benefits) bir marta o'qiladi va CustomsCalculator bazaga murojaat
+qilmasdan ishlaydi.
+
+RateBook jadval versiyalariga bog'langan (`data_versions`): sinxronlash, CBU
+yangilash yoki aksiz yuklashdan keyin `rate_book_store` uni qayta quradi.
+"""
+
+from dataclasses import dataclass, fields
+from datetime import date, datetime
+from types import MappingProxyType
+from typing import Any, FrozenSet, Iterable, List, Mapping, Optional, Tuple, Type, TypeVar
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.benefit import CustomsFeeSchedule, brv_rate, load_customs_fee_schedule
+from app.crud.country import country_registry_store, load_country_registry
+from app.crud.currency import CurrencyEntry, exchange_rate_store, load_exchange_rates
+from app.crud.tariff import TariffResolver, tariff
+from app.crud.tnved import tnved
+from app.crud.data_version import VersionedCache, data_version
+from app.crud.excise import ExciseTrie
+from app.crud.utilization import UtilizationIndex
+from app.models.benefit import TariffBenefit, BRVRate, CustomsFeeRate
+from app.models.country import Country, FreeTradeCountry
+from app.models.currency import Currency
+from app.models.excise import ExciseRate
+from app.models.tariff import TariffRate
+from app.models.tnved import TNVedCode
+from app.models.utilization import UtilizationFee
+
+E = TypeVar("E")
+
+# RateBook qaysi jadvallardan qurilishi
+RATE_BOOK_TABLES = (
+    TNVedCode.__tablename__,
+    TariffRate.__tablename__,
+    Currency.__tablename__,
+    Country.__tablename__,
+    FreeTradeCountry.__tablename__,
+    BRVRate.__tablename__,
+    CustomsFeeRate.__tablename__,
+    ExciseRate.__tablename__,
+    UtilizationFee.__tablename__,
+    TariffBenefit.__tablename__,
+)
+
+
+@dataclass(frozen=True, slots=True)
+class TNVedEntry:
+    id: int
+    code: str
+    description: str
+    level: int
+    parent_id: Optional[int] = None
+
+
+@dataclass(frozen=True, slots=True)
+class TariffEntry:
+    id: int
+    tnved_id: int
+    import_duty_percent: Optional[float] = None
+    import_duty_percent_non_rnb: Optional[float] = None
+    import_duty_specific: Optional[float] = None
+    import_duty_specific_non_rnb: Optional[float] = None
+    specific_unit: Optional[str] = None
+    excise_percent: Optional[float] = None
+    excise_specific: Optional[float] = None
+    vat_percent: float = 12.0
+
+
+@dataclass(frozen=True, slots=True)
+class FreeTradeEntry:
+    country_code: str
+    country_name: str
+    agreement_name: Optional[str] = None
+    requires_certificate: bool = True
+
+
+@dataclass(frozen=True, slots=True)
+class BRVEntry:
+    year: int
+    amount: float
+    valid_from: date
+    valid_until: Optional[date] = None
+
+
+@dataclass(frozen=True, slots=True)
+class ExciseEntry:
+    id: int
+    category: str
+    product_name_ru: str
+    product_name_uz: Optional[str] = None
+    tnved_codes: Optional[str] = None
+    import_rate_percent: Optional[float] = None
+    import_rate_specific: Optional[float] = None
+    import_rate_unit: Optional[str] = None
+
+
+@dataclass(frozen=True, slots=True)
+class UtilizationEntry:
+    id: int
+    tnved_code_start: str
+    tnved_code_end: Optional[str] = None
+    fee_type: str = "fixed"
+    fee_amount: Optional[float] = None
+    fee_percent: Optional[float] = None
+    brv_multiplier: Optional[float] = None
+    engine_volume_min: Optional[int] = None
+    engine_volume_max: Optional[int] = None
+    vehicle_age_min: Optional[int] = None
+    vehicle_age_max: Optional[int] = None
+
+
+@dataclass(frozen=True, slots=True)
+class BenefitEntry:
+    id: int
+    benefit_type: str
+    tnved_code: Optional[str] = None
+    tnved_code_start: Optional[str] = None
+    tnved_code_end: Optional[str] = None
+    reduction_percent: Optional[float] = None
+    requires_certificate: bool = False
+    certificate_type: Optional[str] = None
+    valid_from: Optional[date] = None
+    valid_until: Optional[date] = None
+
+
+def _entry(cls: Type[E], obj: Any) -> E:
+    """ORM obyekt yoki SQL qatoridan o'zgarmas yozuv yaratish"""
+    values = {f.name: getattr(obj, f.name) for f in fields(cls)}
+    return cls(**values)
+
+
+def _entries(cls: Type[E], objs: Iterable[Any]) -> Tuple[E, ...]:
+    return tuple(_entry(cls, obj) for obj in objs)
+
+
+class RateBook:
+    """
+    Ma'lumotnoma jadvallarining o'qish uchun nusxasi.
+
+    Barcha qidiruvlar sinxron va bazaga murojaat qilmaydi.
+    """
+
+    def __init__(
+        self,
+        *,
+        versions: Mapping[str, int],
+        as_of: date,
+        codes: Iterable[TNVedEntry],
+        tariffs: Iterable[TariffEntry],
+        rates_today: Iterable[CurrencyEntry],
+        latest_rates: Iterable[CurrencyEntry],
+        free_trade: Iterable[FreeTradeEntry],
+        rnb_countries: Iterable[str],
+        brv: Optional[BRVEntry],
+        customs_fee_schedule: CustomsFeeSchedule,
+        excise_rates: Iterable[ExciseEntry],
+        utilization_fees: Iterable[UtilizationEntry],
+        benefits: Iterable[BenefitEntry],
+    ):
+        self.versions: Mapping[str, int] = MappingProxyType(dict(versions))
+        self.as_of = as_of
+        self.built_at = datetime.now()
+
+        self.codes: Mapping[str, TNVedEntry] = MappingProxyType({c.code: c for c in codes})
+        self.tariffs: Mapping[int, TariffEntry] = MappingProxyType({t.tnved_id: t for t in tariffs})
+        self.rates_today: Mapping[str, CurrencyEntry] = MappingProxyType({r.code: r for r in rates_today})
+        self.latest_rates: Mapping[str, CurrencyEntry] = MappingProxyType({r.code: r for r in latest_rates})
+        self.free_trade: Mapping[str, FreeTradeEntry] = MappingProxyType(
+            {f.country_code.upper(): f for f in free_trade}
+        )
+        self.rnb_countries: FrozenSet[str] = frozenset(code.upper() for code in rnb_countries)
+        self.brv = brv
+        self.customs_fee_schedule = customs_fee_schedule
+        self.excise_rates: Tuple[ExciseEntry, ...] = tuple(excise_rates)
+        self._excise_trie = ExciseTrie(self.excise_rates)
+        self.utilization_fees: Tuple[UtilizationEntry, ...] = tuple(utilization_fees)
+        self._utilization_index = UtilizationIndex(self.utilization_fees)
+        self.benefits: Tuple[BenefitEntry, ...] = tuple(benefits)
+
+        # Prefix bo'yicha tarif qidirish (resolved_tariffs bilan bir xil qoida)
+        self._tariff_resolver: TariffResolver[TariffEntry] = TariffResolver(
+            {c.code: c.id for c in self.codes.values()}, self.tariffs
+        )
+
+    @property
+    def version(self) -> str:
+        """Jadval versiyalaridan tuzilgan satr, masalan: 'currencies=4;tariff_rates=2;...'"""
+        return ";".join(f"{name}={self.versions[name]}" for name in sorted(self.versions))
+
+    # --- TN VED va tariflar ---
+
+    def get_tnved(self, code: str) -> Optional[TNVedEntry]:
+        return self.codes.get(code)
+
+    def get_tariff(self, code_obj: TNVedEntry) -> Tuple[Optional[TariffEntry], Optional[str]]:
+        """
+        Kod uchun tarif va uning qanday topilgani: 'exact', 'child' yoki 'parent'.
+        CRUDTariff.get_by_tnved_id + get_by_code_prefix bilan bir xil tartib.
+        """
+        return self._tariff_resolver.resolve(code_obj.code, code_obj.id)
+
+    # --- Valyuta kurslari ---
+
+    def get_today_rate(self, code: str) -> Optional[CurrencyEntry]:
+        return self.rates_today.get(code)
+
+    def get_latest_rate(self, code: str) -> Optional[CurrencyEntry]:
+        return self.latest_rates.get(code)
+
+    # --- Mamlakatlar ---
+
+    def is_free_trade(self, country_code: str) -> bool:
+        return country_code.upper() in self.free_trade
+
+    def is_rnb(self, country_code: str) -> bool:
+        return country_code.upper() in self.rnb_countries
+
+    # --- Aksiz, utilizatsiya, imtiyozlar ---
+
+    def get_excise_rate(self, tnved_code: str) -> Optional[ExciseEntry]:
+        return self._excise_trie.match(tnved_code)
+
+    def get_utilization_fee(
+        self,
+        tnved_code: str,
+        engine_volume: Optional[int] = None,
+        vehicle_age: Optional[int] = None
+    ) -> Optional[UtilizationEntry]:
+        """CRUDUtilizationFee.get_by_tnved_code bilan bir xil: eng uzun prefiksdan boshlab"""
+        return self._utilization_index.match(tnved_code, engine_volume, vehicle_age)
+
+    def get_benefits(self, tnved_code: str, check_date: Optional[date] = None) -> List[BenefitEntry]:
+        """TNVED kodga tegishli amaldagi imtiyozlar"""
+        if check_date is None:
+            check_date = date.today()
+
+        return [
+            b for b in self.benefits
+            if (
+                b.tnved_code == tnved_code
+                or (
+                    b.tnved_code_start is not None
+                    and b.tnved_code_start <= tnved_code
+                    and (b.tnved_code_end is None or b.tnved_code_end >= tnved_code)
+                )
+            )
+            and (b.valid_from is None or b.valid_from <= check_date)
+            and (b.valid_until is None or b.valid_until >= check_date)
+        ]
+
+
+async def load_rate_book(db: AsyncSession) -> RateBook:
+    """Barcha ma'lumotnoma jadvallarini o'qib RateBook qurish"""
+    today = date.today()
+    versions = await data_version.get_versions(db, RATE_BOOK_TABLES)
+
+    codes = await db.execute(select(TNVedCode.__table__))
+    tariffs = await db.execute(select(TariffRate.__table__))
+    exchange_rates = await load_exchange_rates(db)
+    countries = await load_country_registry(db)
+    brv = await brv_rate.get_current(db)
+    excise_rates = await db.execute(
+        select(ExciseRate.__table__).where(ExciseRate.is_active == True).order_by(ExciseRate.id)
+    )
+    utilization_fees = await db.execute(
+        select(UtilizationFee.__table__).where(UtilizationFee.is_active == True).order_by(UtilizationFee.id)
+    )
+    benefits = await db.execute(
+        select(TariffBenefit.__table__).where(TariffBenefit.is_active == True).order_by(TariffBenefit.id)
+    )
+
+    return RateBook(
+        versions=versions,
+        as_of=today,
+        codes=_entries(TNVedEntry, codes),
+        tariffs=_entries(TariffEntry, tariffs),
+        rates_today=exchange_rates.on_date(today),
+        latest_rates=exchange_rates.latest.values(),
+        free_trade=_entries(FreeTradeEntry, countries.free_trade.values()),
+        rnb_countries=countries.rnb,
+        brv=_entry(BRVEntry, brv) if brv else None,
+        customs_fee_schedule=await load_customs_fee_schedule(db),
+        excise_rates=_entries(ExciseEntry, excise_rates),
+        utilization_fees=_entries(UtilizationEntry, utilization_fees),
+        benefits=_entries(BenefitEntry, benefits),
+    )
+
+
+async def load_scoped_rate_book(
+    db: AsyncSession,
+    *,
+    tnved_codes: Iterable[str],
+    currency_codes: Iterable[str],
+    country_codes: Iterable[str]
+) -> RateBook:
+    """
+    Faqat berilgan kodlar uchun RateBook (deklaratsiyani ommaviy hisoblash).
+
+    Har bir jadval IN (...) so'rovlari bilan bir martada o'qiladi:
+    - so'ralgan kodlar va ularning ota-prefikslari (4 raqamgacha)
+    - aniq tarifi yo'q kodlar uchun bola-kodlar (prefix bo'yicha tarif qidirish)
+    """
+    today = date.today()
+    tnved_codes = set(tnved_codes)
+
+    wanted = set(tnved_codes)
+    for code in tnved_codes:
+        wanted.update(code[:prefix_len] for prefix_len in range(len(code) - 1, 3, -1))
+
+    code_rows = {row.code: row for row in await tnved.get_by_codes(db, codes=list(wanted))}
+    tariff_rows = {
+        row.tnved_id: row
+        for row in await tariff.get_by_tnved_ids(db, tnved_ids=[row.id for row in code_rows.values()])
+    }
+
+    # Aniq tarifi yo'q kodlar - bola-kodlar ham kerak
+    missing = [
+        code for code in tnved_codes
+        if code in code_rows and code_rows[code].id not in tariff_rows
+    ]
+    if missing:
+        children = [
+            row for row in await tnved.get_by_prefixes(db, prefixes=missing)
+            if row.code not in code_rows
+        ]
+        code_rows.update({row.code: row for row in children})
+        for row in await tariff.get_by_tnved_ids(db, tnved_ids=[row.id for row in children]):
+            tariff_rows[row.tnved_id] = row
+
+    currency_codes = set(currency_codes) | {"USD"}
+    exchange_rates = await exchange_rate_store.get(db)
+    rates_today = [exchange_rates.get(code, today) for code in currency_codes]
+    latest_rates = [exchange_rates.get_latest(code) for code in currency_codes]
+
+    countries = await country_registry_store.get(db)
+    country_codes = {code.upper() for code in country_codes}
+    free_trade = [countries.free_trade[code] for code in sorted(country_codes) if code in countries.free_trade]
+    brv = await brv_rate.get_current(db)
+    excise_rates = await db.execute(
+        select(ExciseRate.__table__).where(ExciseRate.is_active == True).order_by(ExciseRate.id)
+    )
+    utilization_fees = await db.execute(
+        select(UtilizationFee.__table__).where(UtilizationFee.is_active == True).order_by(UtilizationFee.id)
+    )
+
+    return RateBook(
+        versions={},
+        as_of=today,
+        codes=_entries(TNVedEntry, code_rows.values()),
+        tariffs=_entries(TariffEntry, tariff_rows.values()),
+        rates_today=[r for r in rates_today if r],
+        latest_rates=[r for r in latest_rates if r],
+        free_trade=_entries(FreeTradeEntry, free_trade),
+        rnb_countries=countries.rnb & country_codes,
+        brv=_entry(BRVEntry, brv) if brv else None,
+        customs_fee_schedule=await load_customs_fee_schedule(db),
+        excise_rates=_entries(ExciseEntry, excise_rates),
+        utilization_fees=_entries(UtilizationEntry, utilization_fees),
+        benefits=(),
+    )
+
+
+rate_book_store: VersionedCache[RateBook] = VersionedCache(RATE_BOOK_TABLES, load_rate_book)
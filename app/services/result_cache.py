@@ -0,0 +1,152 @@
+"""
+Hisoblash natijalari keshi.
+
+Bir xil so'rovlar (kod, valyuta, mamlakat, narx...) ko'p takrorlanadi - web
+interfeys formani qayta yuborganda ayniqsa. Natija kirish ma'lumotlarining
+normallashtirilgan xeshi va hisoblash ishlatgan ma'lumotnoma holati (jadval
+versiyalari va sana) bo'yicha saqlanadi: tarif sinxronlash, CBU kurslari
+yangilanishi yoki aksiz/utilizatsiya qayta yuklanishi versiyani o'zgartiradi va
+eski natijalar ishlatilmay qoladi. Kalit tekshiruv keshidan emas, aynan hisoblash
+ishlatgan RateBook (yoki DB rejimida - bazadagi versiyalar) dan olinadi.
+"""
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import asdict, replace
+from datetime import date
+from typing import Any, Dict, Hashable, Mapping, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.crud.benefit import customs_fee_schedule_store
+from app.crud.country import country_registry_store
+from app.crud.currency import exchange_rate_store
+from app.crud.data_version import VersionedCache, data_version
+from app.crud.excise import excise_trie_store
+from app.crud.utilization import utilization_index_store
+from app.services.calculator import CalculationInput, CalculationResult
+from app.services.rate_book import RATE_BOOK_TABLES
+
+
+def _normalize(value: Any) -> Any:
+    """500 va 500.0 bir xil kalit bersin"""
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (int, float)):
+        return float(value)
+    return value
+
+
+def calculation_key(input_data: CalculationInput, version: Hashable) -> str:
+    """Kirish ma'lumotlari va ma'lumotnoma versiyasidan kesh kaliti"""
+    payload = {name: _normalize(value) for name, value in asdict(input_data).items()}
+    raw = json.dumps([payload, version], sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+# DB rejimida hisoblash o'qiydigan xotiradagi keshlar
+DB_MODE_STORES: Tuple[VersionedCache, ...] = (
+    exchange_rate_store,
+    country_registry_store,
+    customs_fee_schedule_store,
+    excise_trie_store,
+    utilization_index_store,
+)
+
+
+def snapshot_version(versions: Mapping[str, int], as_of: date) -> Tuple[Any, ...]:
+    """Hisoblash ishlatgan ma'lumotnoma holati: jadval versiyalari va kurs sanasi"""
+    return tuple(versions.get(name, 0) for name in RATE_BOOK_TABLES) + (as_of.isoformat(),)
+
+
+async def get_reference_versions(db: AsyncSession) -> Dict[str, int]:
+    """Bazadagi joriy versiyalar - DB rejimida kesh kaliti shulardan quriladi"""
+    return await data_version.get_versions(db, RATE_BOOK_TABLES)
+
+
+async def db_snapshot_matches(
+    db: AsyncSession,
+    versions: Mapping[str, int],
+    as_of: date
+) -> bool:
+    """
+    DB rejimidagi natijani `versions` kaliti bilan saqlash mumkinmi.
+
+    Hisoblash davomida versiyalar o'zgarmagan va xotiradagi keshlar aynan shu
+    versiyalarda qurilgan bo'lishi kerak - aks holda natija boshqa holatdan
+    hisoblangan va kalitga mos emas.
+    """
+    if await get_reference_versions(db) != dict(versions):
+        return False
+    for store in DB_MODE_STORES:
+        await store.get(db)
+        if not store.matches(versions, as_of):
+            return False
+    return True
+
+
+class ResultCache:
+    """LRU + TTL kesh: eng eski ishlatilgan yozuv chiqariladi, muddati o'tgani o'qilmaydi"""
+
+    def __init__(self, maxsize: Optional[int] = None, ttl: Optional[float] = None):
+        self.maxsize = settings.CALCULATION_CACHE_SIZE if maxsize is None else maxsize
+        self.ttl = settings.CALCULATION_CACHE_TTL_SECONDS if ttl is None else ttl
+        self._items: "OrderedDict[str, Tuple[float, CalculationResult]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0
+
+    def get(self, key: str) -> Optional[CalculationResult]:
+        item = self._items.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+
+        stored_at, result = item
+        if time.monotonic() - stored_at > self.ttl:
+            del self._items[key]
+            self.misses += 1
+            return None
+
+        self._items.move_to_end(key)
+        self.hits += 1
+        # Saqlangan natijadagi qidiruvlar soni birinchi hisoblashniki - keshdan o'qilganda ko'rsatilmaydi
+        if "lookups" in result.details:
+            return replace(result, details={**result.details, "lookups": {"source": "cache"}})
+        return result
+
+    def put(self, key: str, result: CalculationResult) -> None:
+        if not self.enabled:
+            return
+        self._items[key] = (time.monotonic(), result)
+        self._items.move_to_end(key)
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        self._items.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        requests = self.hits + self.misses
+        return {
+            "size": len(self._items),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / requests, 4) if requests else 0.0,
+        }
+
+
+calculation_cache = ResultCache()
+
+
+def invalidate_calculation_cache() -> None:
+    """Jarayon ichida ma'lumotnoma o'zgarganda (masalan, /currency/update) darhol tozalash"""
+    calculation_cache.clear()
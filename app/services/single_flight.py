@@ -0,0 +1,55 @@
+"""
+Bir xil parallel so'rovlarni birlashtirish (single-flight).
+
+Mashhur kod bir vaqtda ko'p mijozdan so'ralganda (masalan, kurs o'zgarishi
+e'lon qilingandan keyin) har bir so'rov qidiruvlar zanjirini alohida bajarmasligi
+uchun: birinchi so'rov ishni boshlaydi, shu kalit bilan kelgan qolganlari uning
+natijasini (yoki xatosini) kutadi. Ish tugagach kalit o'chiriladi - bu kesh emas.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Kalit bo'yicha bajarilayotgan ishlar"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        future = self._calls.get(key)
+        if future is not None:
+            self.coalesced += 1
+            try:
+                # shield - kutayotgan so'rov uzilsa ham umumiy ish to'xtamaydi
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+            # Boshlagan so'rov uzildi - o'zimiz bajaramiz
+            return await fn()
+
+        future = asyncio.ensure_future(fn())
+        self._calls[key] = future
+        self.started += 1
+        try:
+            return await future
+        finally:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._calls),
+            "started": self.started,
+            "coalesced": self.coalesced,
+        }
+
+
+calculation_flight = SingleFlight()
+tnved_search_flight = SingleFlight()
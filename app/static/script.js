@@ -62,7 +62,7 @@ async function searchTnved(query) {
     const resultsDiv = document.getElementById('tnved-results');
     
     try {
-        const response = await fetch(`${API_BASE}/tnved/search?q=${encodeURIComponent(query)}&limit=10`);
+        const response = await fetch(`${API_BASE}/tnved/typeahead?q=${encodeURIComponent(query)}`);
         
         if (!response.ok) {
             throw new Error('Qidiruv xatosi');
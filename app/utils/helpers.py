@@ -1,4 +1,43 @@
 from datetime import date, datetime
+from typing import Iterable, Iterator, List, Optional, TypeVar
+from sqlalchemy import and_
+from sqlalchemy.sql.elements import ColumnElement
+
+T = TypeVar("T")
+
+# IN (...) so'rovlaridagi parametrlar soni (SQLite limiti 999)
+IN_CHUNK_SIZE = 500
 
 def today_date() -> date:
     return datetime.now().date()
+
+def chunked(items: Iterable[T], size: int = IN_CHUNK_SIZE) -> Iterator[List[T]]:
+    """Ro'yxatni `size` o'lchamli bo'laklarga ajratish"""
+    chunk: List[T] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def prefix_upper_bound(prefix: str) -> Optional[str]:
+    """
+    Prefiks bilan boshlanadigan barcha satrlardan katta eng kichik satr:
+    '8703' -> '8704', '8709' -> '871', '99' -> None (yuqori chegara yo'q)
+    """
+    stripped = prefix.rstrip("9") if prefix.isdigit() else prefix
+    if not stripped:
+        return None
+    return stripped[:-1] + chr(ord(stripped[-1]) + 1)
+
+def starts_with(column: ColumnElement, prefix: str) -> ColumnElement:
+    """
+    LIKE 'prefix%' o'rniga oraliq sharti: column >= '8703' AND column < '8704'.
+    SQLite LIKE uchun oddiy (BINARY) indeksdan foydalanmaydi, oraliq esa foydalanadi.
+    """
+    upper = prefix_upper_bound(prefix)
+    if upper is None:
+        return column >= prefix
+    return and_(column >= prefix, column < upper)
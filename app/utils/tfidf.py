@@ -0,0 +1,93 @@
+"""
+Tavsif bo'yicha kod taklif qilish uchun TF-IDF indeksi.
+
+Matnlar normallashtirilgan so'zlarga bo'linadi, so'zlar qisqa o'zakka qirqiladi
+(rus/o'zbek qo'shimchalari: "автомобили", "avtomobillar" -> "avtomo"). Har bir
+hujjat vektori (1 + log tf) * idf, L2 bo'yicha normallashtirilgan. Matritsa
+ustunlar bo'yicha siyrak saqlanadi (har bir so'z uchun hujjatlar va og'irliklar
+massivi), so'rov - siyrak skalyar ko'paytma: faqat so'rov so'zlari ustunlari qo'shiladi.
+"""
+
+import math
+from collections import Counter
+from typing import Dict, Generic, Hashable, Iterable, List, Tuple, TypeVar
+
+import numpy as np
+
+from app.utils.translit import normalize_search_text
+
+K = TypeVar("K", bound=Hashable)
+
+STEM_LENGTH = 6
+
+
+def terms(text: str) -> List[str]:
+    """Normallashtirilgan, qirqilgan so'zlar (raqamlar va bir harfli so'zlarsiz)"""
+    return [
+        word[:STEM_LENGTH]
+        for word in normalize_search_text(text).split()
+        if len(word) > 1 and not word.isdigit()
+    ]
+
+
+class TfidfIndex(Generic[K]):
+    """Kalit -> matn juftliklari bo'yicha TF-IDF; `search` kosinus o'xshashligi bo'yicha saralaydi"""
+
+    def __init__(self, documents: Iterable[Tuple[K, str]]):
+        self.keys: List[K] = []
+        counts: List[Counter] = []
+        for key, text in documents:
+            self.keys.append(key)
+            counts.append(Counter(terms(text)))
+
+        n_docs = len(self.keys)
+        document_frequency: Counter = Counter()
+        for doc_terms in counts:
+            document_frequency.update(doc_terms.keys())
+        self.idf: Dict[str, float] = {
+            term: math.log((n_docs + 1) / (df + 1)) + 1.0
+            for term, df in document_frequency.items()
+        }
+
+        postings: Dict[str, Tuple[List[int], List[float]]] = {}
+        for doc_id, doc_terms in enumerate(counts):
+            weights = {
+                term: (1.0 + math.log(count)) * self.idf[term]
+                for term, count in doc_terms.items()
+            }
+            norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+            for term, weight in weights.items():
+                docs, values = postings.setdefault(term, ([], []))
+                docs.append(doc_id)
+                values.append(weight / norm)
+
+        self._postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {
+            term: (np.array(docs, dtype=np.int32), np.array(values, dtype=np.float32))
+            for term, (docs, values) in postings.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[K, float]]:
+        query_terms = Counter(term for term in terms(query) if term in self._postings)
+        if not query_terms or limit <= 0:
+            return []
+
+        weights = {
+            term: (1.0 + math.log(count)) * self.idf[term]
+            for term, count in query_terms.items()
+        }
+        norm = math.sqrt(sum(w * w for w in weights.values()))
+
+        scores = np.zeros(len(self.keys), dtype=np.float32)
+        for term, weight in weights.items():
+            docs, values = self._postings[term]
+            scores[docs] += values * (weight / norm)
+
+        candidates = np.flatnonzero(scores)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        # Baho kamayishi, teng bo'lsa - indeksdagi tartib
+        order = candidates[np.lexsort((candidates, -scores[candidates]))]
+        return [(self.keys[doc_id], round(float(scores[doc_id]), 4)) for doc_id in order]
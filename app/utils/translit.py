@@ -0,0 +1,39 @@
+"""
+Qidiruv uchun matnni normallashtirish.
+
+Foydalanuvchilar lotin va kirill alifbosida yozadi, tavsiflar esa asosan ruscha.
+Matn kichik harflarga o'tkaziladi, o'zbek kirill va rus harflari o'zbek lotin
+yozuviga o'giriladi (х -> x, ш -> sh, ў -> o, қ -> q...), apostroflar olib
+tashlanadi (o'zbek -> ozbek) va tinish belgilari bo'sh joyga almashtiriladi.
+Natijada "Ўзбекистон" va "O'zbekiston", "автомобиль" va "avtomobil" bir xil bo'ladi.
+"""
+
+import re
+
+_CYRILLIC_TO_LATIN = {
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "yo",
+    "ж": "j", "з": "z", "и": "i", "й": "y", "к": "k", "л": "l", "м": "m",
+    "н": "n", "о": "o", "п": "p", "р": "r", "с": "s", "т": "t", "у": "u",
+    "ф": "f", "х": "x", "ц": "ts", "ч": "ch", "ш": "sh", "щ": "sh", "ъ": "",
+    "ы": "i", "ь": "", "э": "e", "ю": "yu", "я": "ya",
+    # O'zbek kirill harflari
+    "ў": "o", "қ": "q", "ғ": "g", "ҳ": "h",
+}
+
+# o' / g' dagi apostrof variantlari
+_APOSTROPHES = "'`ʻʼ’‘"
+
+_TRANSLATION = str.maketrans({
+    **_CYRILLIC_TO_LATIN,
+    **{char: "" for char in _APOSTROPHES},
+})
+
+_NON_WORD_RE = re.compile(r"[\W_]+")
+
+
+def normalize_search_text(text: str) -> str:
+    """Qidiruv ko'rinishi: kichik harf, lotin yozuvi, faqat so'zlar va bitta bo'sh joy"""
+    if not text:
+        return ""
+    folded = text.lower().translate(_TRANSLATION)
+    return _NON_WORD_RE.sub(" ", folded).strip()
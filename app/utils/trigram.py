@@ -0,0 +1,145 @@
+"""
+Xatoga chidamli qidiruv uchun trigram indeksi.
+
+Foydalanuvchilar nomlarni xato yozadi ("avtomobl", "телефн") va ILIKE '%q%'
+hech narsa topmaydi. Indeks matnlardagi barcha so'zlarning lug'atini va
+so'z trigramlaridan teskari indeks quradi (pg_trgm uslubida: "  so'z ").
+So'rovdagi har bir so'z uchun o'xshash lug'at so'zlari trigramlar Jaccard
+o'xshashligi bo'yicha topiladi, hujjat bahosi - so'rov so'zlari bo'yicha
+eng yaxshi o'xshashliklar o'rtachasi.
+
+`containing` xuddi shu teskari indeks bilan ILIKE '%q%' ni jadvalni o'qimasdan
+bajaradi: so'rov so'zlaridagi trigramlar kesishmasi nomzodlarni beradi, matnning
+o'zi esa oxirgi tekshiruvda ishlatiladi.
+"""
+
+import re
+from typing import Dict, Generic, Hashable, Iterable, List, Optional, Set, Tuple, TypeVar
+
+import numpy as np
+
+K = TypeVar("K", bound=Hashable)
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def words(text: str) -> List[str]:
+    return _WORD_RE.findall((text or "").lower())
+
+
+def trigrams(word: str) -> Set[str]:
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex(Generic[K]):
+    """
+    Kalit -> matn juftliklari bo'yicha indeks.
+    `search` (kalit, baho) ro'yxatini baho kamayishi bo'yicha qaytaradi.
+    """
+
+    def __init__(self, documents: Iterable[Tuple[K, str]], threshold: float = 0.3):
+        self.threshold = threshold
+        self.keys: List[K] = []
+        self._texts: List[str] = []
+        vocabulary: Dict[str, int] = {}
+        word_docs: List[List[int]] = []
+
+        for key, text in documents:
+            doc_id = len(self.keys)
+            self.keys.append(key)
+            self._texts.append(text or "")
+            for word in set(words(text)):
+                word_id = vocabulary.setdefault(word, len(vocabulary))
+                if word_id == len(word_docs):
+                    word_docs.append([])
+                word_docs[word_id].append(doc_id)
+
+        postings: Dict[str, List[int]] = {}
+        sizes = np.zeros(len(vocabulary), dtype=np.int32)
+        for word, word_id in vocabulary.items():
+            grams = trigrams(word)
+            sizes[word_id] = len(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(word_id)
+
+        self._words = list(vocabulary)
+        self._word_docs = [np.array(docs, dtype=np.int32) for docs in word_docs]
+        self._word_sizes = sizes
+        self._postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _similar_words(self, word: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Lug'atdagi o'xshash so'zlar (id lari) va ularning o'xshashligi"""
+        grams = trigrams(word)
+        hits = [self._postings[gram] for gram in grams if gram in self._postings]
+        if not hits:
+            return np.empty(0, dtype=np.int32), np.empty(0)
+        shared = np.bincount(np.concatenate(hits), minlength=len(self._word_sizes))
+        similarity = shared / (len(grams) + self._word_sizes - shared)
+        word_ids = np.flatnonzero(similarity >= self.threshold)
+        return word_ids, similarity[word_ids]
+
+    def _words_containing(self, fragment: str) -> np.ndarray:
+        """Ichida `fragment` bo'lgan lug'at so'zlari (fragment kamida 3 harf)"""
+        grams = [fragment[i:i + 3] for i in range(len(fragment) - 2)]
+        word_ids: Optional[np.ndarray] = None
+        for gram in grams:
+            ids = self._postings.get(gram)
+            if ids is None:
+                return np.empty(0, dtype=np.int32)
+            word_ids = ids if word_ids is None else np.intersect1d(word_ids, ids, assume_unique=True)
+        return np.array(
+            [word_id for word_id in word_ids if fragment in self._words[word_id]], dtype=np.int32
+        )
+
+    def containing(self, query: str, limit: int = 20) -> List[K]:
+        """
+        Matnida `query` qatori bor kalitlar, indeksdagi tartibda (LIKE '%query%').
+        3 harfdan qisqa so'zlar nomzodlarni toraytirmaydi; hammasi qisqa bo'lsa - bo'sh.
+        """
+        fragments = [word for word in words(query) if len(word) >= 3]
+        if not fragments or limit <= 0:
+            return []
+
+        candidates: Optional[np.ndarray] = None
+        for fragment in fragments:
+            word_ids = self._words_containing(fragment)
+            docs = (
+                np.unique(np.concatenate([self._word_docs[word_id] for word_id in word_ids]))
+                if len(word_ids) else np.empty(0, dtype=np.int32)
+            )
+            candidates = docs if candidates is None else np.intersect1d(candidates, docs, assume_unique=True)
+            if not len(candidates):
+                return []
+
+        found: List[K] = []
+        for doc_id in candidates:
+            if query in self._texts[doc_id]:
+                found.append(self.keys[doc_id])
+                if len(found) >= limit:
+                    break
+        return found
+
+    def search(self, query: str, limit: int = 20) -> List[Tuple[K, float]]:
+        query_words = words(query)
+        if not query_words or not self.keys or limit <= 0:
+            return []
+
+        scores = np.zeros(len(self.keys))
+        for word in query_words:
+            # Har bir hujjat uchun shu so'rov so'ziga eng o'xshash so'z
+            best = np.zeros(len(self.keys))
+            word_ids, similarity = self._similar_words(word)
+            for word_id, value in zip(word_ids, similarity):
+                docs = self._word_docs[word_id]
+                best[docs] = np.maximum(best[docs], value)
+            scores += best
+        scores /= len(query_words)
+
+        candidates = np.flatnonzero(scores >= self.threshold)
+        # Baho kamayishi, teng bo'lsa - indeksdagi tartib
+        order = candidates[np.lexsort((candidates, -scores[candidates]))][:limit]
+        return [(self.keys[doc_id], round(float(scores[doc_id]), 4)) for doc_id in order]
@@ -0,0 +1,36 @@
+"""add data_versions table
+
+Revision ID: 0005_data_versions
+Revises: 0004_excise_rates
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005_data_versions'
+down_revision: Union[str, None] = '0004_excise_rates'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('data_versions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('table_name', sa.String(length=64), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False, default=0),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_data_versions_id'), 'data_versions', ['id'], unique=False)
+    op.create_index(op.f('ix_data_versions_table_name'), 'data_versions', ['table_name'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_data_versions_table_name'), table_name='data_versions')
+    op.drop_index(op.f('ix_data_versions_id'), table_name='data_versions')
+    op.drop_table('data_versions')
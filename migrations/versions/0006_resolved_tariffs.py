@@ -0,0 +1,33 @@
+"""add resolved_tariffs table
+
+Revision ID: 0006_resolved_tariffs
+Revises: 0005_data_versions
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006_resolved_tariffs'
+down_revision: Union[str, None] = '0005_data_versions'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('resolved_tariffs',
+        sa.Column('tnved_id', sa.Integer(), nullable=False),
+        sa.Column('tariff_id', sa.Integer(), nullable=True),
+        sa.Column('resolution', sa.String(length=8), nullable=True),
+        sa.ForeignKeyConstraint(['tnved_id'], ['tn_ved_codes.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['tariff_id'], ['tariff_rates.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('tnved_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('resolved_tariffs')
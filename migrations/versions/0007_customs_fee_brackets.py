@@ -0,0 +1,100 @@
+"""customs_fee_rates value_currency and TP-55 brackets
+
+Revision ID: 0007_customs_fee_brackets
+Revises: 0006_resolved_tariffs
+Create Date: 2026-10-18
+
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007_customs_fee_brackets'
+down_revision: Union[str, None] = '0006_resolved_tariffs'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+customs_fee_rates = sa.table('customs_fee_rates',
+    sa.column('id', sa.Integer),
+    sa.column('min_customs_value', sa.Float),
+    sa.column('max_customs_value', sa.Float),
+    sa.column('value_currency', sa.String),
+    sa.column('fee_type', sa.String),
+    sa.column('fee_value', sa.Float),
+    sa.column('description', sa.Text),
+    sa.column('is_active', sa.Boolean),
+    sa.column('updated_at', sa.DateTime(timezone=True)),
+)
+
+# TP-55: bojxona qiymati (USD) bo'yicha BRV koeffitsientlari
+TP55_BRACKETS = [
+    (0, 1000, 0.3, "$1,000 gacha"),
+    (1000, 5000, 0.5, "$1,000 - $5,000"),
+    (5000, 10000, 1.0, "$5,000 - $10,000"),
+    (10000, 20000, 1.5, "$10,000 - $20,000"),
+    (20000, 50000, 3.0, "$20,000 - $50,000"),
+    (50000, 100000, 5.0, "$50,000 - $100,000"),
+    (100000, None, 10.0, "$100,000 dan yuqori"),
+]
+
+# Upgrade o'chirgan (avval faol bo'lgan) qatorlar - downgrade faqat ularni qayta yoqadi
+DEACTIVATED_TABLE = 'customs_fee_rates_pre_0007'
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('customs_fee_rates') as batch_op:
+        batch_op.add_column(sa.Column('value_currency', sa.String(length=3), server_default='UZS', nullable=False))
+
+    # Kalkulyator avval bu jadvalni ishlatmagan - eski qatorlar o'chiriladi,
+    # amaldagi TP-55 chegaralari jadvalga ko'chiriladi
+    deactivated = op.create_table(DEACTIVATED_TABLE, sa.Column('id', sa.Integer(), primary_key=True))
+    op.execute(deactivated.insert().from_select(
+        ['id'], sa.select(customs_fee_rates.c.id).where(customs_fee_rates.c.is_active == sa.true())
+    ))
+    op.execute(customs_fee_rates.update().values(is_active=False))
+    now = datetime.now(timezone.utc)
+    op.bulk_insert(customs_fee_rates, [
+        {
+            'min_customs_value': low,
+            'max_customs_value': high,
+            'value_currency': 'USD',
+            'fee_type': 'brv',
+            'fee_value': coefficient,
+            'description': description,
+            'is_active': True,
+            'updated_at': now,
+        }
+        for low, high, coefficient, description in TP55_BRACKETS
+    ])
+
+
+def downgrade() -> None:
+    # Faqat upgrade qo'shgan TP-55 qatorlari
+    for low, high, coefficient, description in TP55_BRACKETS:
+        op.execute(customs_fee_rates.delete().where(
+            customs_fee_rates.c.value_currency == 'USD',
+            customs_fee_rates.c.fee_type == 'brv',
+            customs_fee_rates.c.min_customs_value == low,
+            customs_fee_rates.c.max_customs_value.is_(None) if high is None
+            else customs_fee_rates.c.max_customs_value == high,
+            customs_fee_rates.c.fee_value == coefficient,
+            customs_fee_rates.c.description == description,
+        ))
+
+    # Upgrade o'chirgan qatorlar qayta yoqiladi (jadval bo'lmasa - bazani eski upgrade
+    # yangilagan, qaysi qatorlar faol bo'lgani noma'lum; kalkulyator 0007 gacha bu
+    # jadvalni ishlatmagan, shuning uchun holat o'zgartirilmaydi)
+    if DEACTIVATED_TABLE in sa.inspect(op.get_bind()).get_table_names():
+        deactivated = sa.table(DEACTIVATED_TABLE, sa.column('id', sa.Integer))
+        op.execute(
+            customs_fee_rates.update()
+            .where(customs_fee_rates.c.id.in_(sa.select(deactivated.c.id)))
+            .values(is_active=True)
+        )
+        op.drop_table(DEACTIVATED_TABLE)
+    with op.batch_alter_table('customs_fee_rates') as batch_op:
+        batch_op.drop_column('value_currency')
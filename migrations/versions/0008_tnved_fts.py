@@ -0,0 +1,57 @@
+"""tn_ved_codes description full-text index (SQLite FTS5)
+
+Revision ID: 0008_tnved_fts
+Revises: 0007_customs_fee_brackets
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008_tnved_fts'
+down_revision: Union[str, None] = '0007_customs_fee_brackets'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # FTS5 faqat SQLite da; boshqa bazalarda qidiruv ILIKE bilan ishlaydi
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    op.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS tn_ved_fts USING fts5(
+            description, content='tn_ved_codes', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS tn_ved_codes_fts_ai AFTER INSERT ON tn_ved_codes BEGIN
+            INSERT INTO tn_ved_fts(rowid, description) VALUES (new.id, new.description);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS tn_ved_codes_fts_ad AFTER DELETE ON tn_ved_codes BEGIN
+            INSERT INTO tn_ved_fts(tn_ved_fts, rowid, description) VALUES ('delete', old.id, old.description);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS tn_ved_codes_fts_au AFTER UPDATE OF description ON tn_ved_codes BEGIN
+            INSERT INTO tn_ved_fts(tn_ved_fts, rowid, description) VALUES ('delete', old.id, old.description);
+            INSERT INTO tn_ved_fts(rowid, description) VALUES (new.id, new.description);
+        END
+    """)
+    op.execute("INSERT INTO tn_ved_fts(tn_ved_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    op.execute("DROP TRIGGER IF EXISTS tn_ved_codes_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS tn_ved_codes_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS tn_ved_codes_fts_ai")
+    op.execute("DROP TABLE IF EXISTS tn_ved_fts")
@@ -0,0 +1,91 @@
+"""tn_ved_codes.search_text - transliteration-normalized description
+
+Revision ID: 0009_tnved_search_text
+Revises: 0008_tnved_fts
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.translit import normalize_search_text
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009_tnved_search_text'
+down_revision: Union[str, None] = '0008_tnved_fts'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+tn_ved_codes = sa.table('tn_ved_codes',
+    sa.column('id', sa.Integer),
+    sa.column('description', sa.Text),
+    sa.column('search_text', sa.Text),
+)
+
+
+def _drop_fts() -> None:
+    op.execute("DROP TRIGGER IF EXISTS tn_ved_codes_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS tn_ved_codes_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS tn_ved_codes_fts_ai")
+    op.execute("DROP TABLE IF EXISTS tn_ved_fts")
+
+
+def _create_fts(column: str) -> None:
+    op.execute(f"""
+        CREATE VIRTUAL TABLE tn_ved_fts USING fts5(
+            {column}, content='tn_ved_codes', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    """)
+    op.execute(f"""
+        CREATE TRIGGER tn_ved_codes_fts_ai AFTER INSERT ON tn_ved_codes BEGIN
+            INSERT INTO tn_ved_fts(rowid, {column}) VALUES (new.id, new.{column});
+        END
+    """)
+    op.execute(f"""
+        CREATE TRIGGER tn_ved_codes_fts_ad AFTER DELETE ON tn_ved_codes BEGIN
+            INSERT INTO tn_ved_fts(tn_ved_fts, rowid, {column}) VALUES ('delete', old.id, old.{column});
+        END
+    """)
+    op.execute(f"""
+        CREATE TRIGGER tn_ved_codes_fts_au AFTER UPDATE OF {column} ON tn_ved_codes BEGIN
+            INSERT INTO tn_ved_fts(tn_ved_fts, rowid, {column}) VALUES ('delete', old.id, old.{column});
+            INSERT INTO tn_ved_fts(rowid, {column}) VALUES (new.id, new.{column});
+        END
+    """)
+    op.execute("INSERT INTO tn_ved_fts(tn_ved_fts) VALUES ('rebuild')")
+
+
+def upgrade() -> None:
+    op.add_column('tn_ved_codes', sa.Column('search_text', sa.Text(), nullable=True))
+
+    # Mavjud kodlar uchun normallashtirilgan tavsif
+    bind = op.get_bind()
+    rows = bind.execute(sa.select(tn_ved_codes.c.id, tn_ved_codes.c.description)).all()
+    if rows:
+        bind.execute(
+            tn_ved_codes.update()
+            .where(tn_ved_codes.c.id == sa.bindparam('row_id'))
+            .values(search_text=sa.bindparam('normalized')),
+            [{'row_id': row.id, 'normalized': normalize_search_text(row.description)} for row in rows]
+        )
+
+    # FTS5 indeksi endi normallashtirilgan ustun ustida
+    if bind.dialect.name == 'sqlite':
+        _drop_fts()
+        _create_fts('search_text')
+
+
+def downgrade() -> None:
+    is_sqlite = op.get_bind().dialect.name == 'sqlite'
+    if is_sqlite:
+        _drop_fts()
+
+    with op.batch_alter_table('tn_ved_codes') as batch_op:
+        batch_op.drop_column('search_text')
+
+    if is_sqlite:
+        _create_fts('description')
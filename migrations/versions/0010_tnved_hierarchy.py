@@ -0,0 +1,59 @@
+"""tn_ved_codes parent links and nested-set lft/rgt
+
+Revision ID: 0010_tnved_hierarchy
+Revises: 0009_tnved_search_text
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.crud.tnved import compute_hierarchy
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0010_tnved_hierarchy'
+down_revision: Union[str, None] = '0009_tnved_search_text'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+tn_ved_codes = sa.table('tn_ved_codes',
+    sa.column('id', sa.Integer),
+    sa.column('code', sa.String),
+    sa.column('parent_id', sa.Integer),
+    sa.column('lft', sa.Integer),
+    sa.column('rgt', sa.Integer),
+)
+
+
+def upgrade() -> None:
+    op.add_column('tn_ved_codes', sa.Column('lft', sa.Integer(), nullable=True))
+    op.add_column('tn_ved_codes', sa.Column('rgt', sa.Integer(), nullable=True))
+    op.create_index('ix_tn_ved_codes_lft_rgt', 'tn_ved_codes', ['lft', 'rgt'], unique=False)
+
+    # Mavjud kodlar uchun iyerarxiya
+    bind = op.get_bind()
+    codes = {row.code: row.id for row in bind.execute(sa.select(tn_ved_codes.c.id, tn_ved_codes.c.code))}
+    if codes:
+        bind.execute(
+            tn_ved_codes.update()
+            .where(tn_ved_codes.c.id == sa.bindparam('node_id'))
+            .values(parent_id=sa.bindparam('parent'), lft=sa.bindparam('left'), rgt=sa.bindparam('right')),
+            [
+                {'node_id': node_id, 'parent': parent_id, 'left': lft, 'right': rgt}
+                for node_id, (parent_id, lft, rgt) in compute_hierarchy(codes).items()
+            ]
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tn_ved_codes_lft_rgt', table_name='tn_ved_codes')
+    if op.get_bind().dialect.name == 'sqlite':
+        # Jadvalni qayta yaratmaslik uchun (FTS triggerlari saqlanadi) - SQLite 3.35+
+        op.execute("ALTER TABLE tn_ved_codes DROP COLUMN rgt")
+        op.execute("ALTER TABLE tn_ved_codes DROP COLUMN lft")
+    else:
+        op.drop_column('tn_ved_codes', 'rgt')
+        op.drop_column('tn_ved_codes', 'lft')
@@ -0,0 +1,25 @@
+"""index tn_ved_codes.parent_id for tree browsing
+
+Revision ID: 0011_tnved_parent_index
+Revises: 0010_tnved_hierarchy
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0011_tnved_parent_index'
+down_revision: Union[str, None] = '0010_tnved_hierarchy'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_tn_ved_codes_parent_id'), 'tn_ved_codes', ['parent_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_tn_ved_codes_parent_id'), table_name='tn_ved_codes')
@@ -0,0 +1,61 @@
+"""countries.is_rnb - RNB (CIS) membership kept in the database
+
+Revision ID: 0012_country_rnb
+Revises: 0011_tnved_parent_index
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0012_country_rnb'
+down_revision: Union[str, None] = '0011_tnved_parent_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+countries = sa.table('countries',
+    sa.column('id', sa.Integer),
+    sa.column('code', sa.String),
+    sa.column('name_uz', sa.String),
+    sa.column('name_ru', sa.String),
+    sa.column('name_en', sa.String),
+    sa.column('is_rnb', sa.Boolean),
+    sa.column('is_active', sa.Boolean),
+)
+
+# Avval app/services/calculator.py dagi RNB_COUNTRIES ro'yxati
+RNB_COUNTRIES = [
+    {'code': 'RU', 'name_uz': "Rossiya", 'name_ru': "Россия", 'name_en': "Russia"},
+    {'code': 'KZ', 'name_uz': "Qozog'iston", 'name_ru': "Казахстан", 'name_en': "Kazakhstan"},
+    {'code': 'KG', 'name_uz': "Qirg'iziston", 'name_ru': "Кыргызстан", 'name_en': "Kyrgyzstan"},
+    {'code': 'TJ', 'name_uz': "Tojikiston", 'name_ru': "Таджикистан", 'name_en': "Tajikistan"},
+    {'code': 'BY', 'name_uz': "Belarusiya", 'name_ru': "Беларусь", 'name_en': "Belarus"},
+    {'code': 'AM', 'name_uz': "Armaniston", 'name_ru': "Армения", 'name_en': "Armenia"},
+    {'code': 'AZ', 'name_uz': "Ozarbayjon", 'name_ru': "Азербайджан", 'name_en': "Azerbaijan"},
+    {'code': 'MD', 'name_uz': "Moldova", 'name_ru': "Молдова", 'name_en': "Moldova"},
+    {'code': 'UA', 'name_uz': "Ukraina", 'name_ru': "Украина", 'name_en': "Ukraine"},
+    {'code': 'GE', 'name_uz': "Gruziya", 'name_ru': "Грузия", 'name_en': "Georgia"},
+    {'code': 'TM', 'name_uz': "Turkmaniston", 'name_ru': "Туркменистан", 'name_en': "Turkmenistan"},
+]
+
+
+def upgrade() -> None:
+    op.add_column('countries', sa.Column('is_rnb', sa.Boolean(), nullable=False, server_default=sa.false()))
+
+    # Mavjud mamlakatlarni belgilash, yo'qlarini qo'shish (RNB qoidasi avvalgidek ishlashi uchun)
+    bind = op.get_bind()
+    codes = [item['code'] for item in RNB_COUNTRIES]
+    bind.execute(countries.update().where(countries.c.code.in_(codes)).values(is_rnb=True))
+    existing = {row.code for row in bind.execute(sa.select(countries.c.code).where(countries.c.code.in_(codes)))}
+    missing = [item for item in RNB_COUNTRIES if item['code'] not in existing]
+    if missing:
+        op.bulk_insert(countries, [{**item, 'is_rnb': True, 'is_active': True} for item in missing])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('countries') as batch_op:
+        batch_op.drop_column('is_rnb')
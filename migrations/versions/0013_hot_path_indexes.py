@@ -0,0 +1,66 @@
+"""composite and partial (is_active) indexes for hot CRUD queries, excise_rates.is_active
+
+excise_rates.is_active is added only to tables created by 0004 (which lacks it).
+Downgrade drops it only from such tables: a table created by create_all already had
+the column before this revision, so it is left in place there.
+
+Revision ID: 0013_hot_path_indexes
+Revises: 0012_country_rnb
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0013_hot_path_indexes'
+down_revision: Union[str, None] = '0012_country_rnb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (indeks, jadval, ustunlar, faqat faol qatorlar)
+INDEXES = [
+    ('ix_currencies_code_date', 'currencies', ['code', 'date'], False),
+    ('ix_currencies_active_code_date', 'currencies', ['code', 'date'], True),
+    ('ix_countries_active_name_uz', 'countries', ['name_uz'], True),
+    ('ix_free_trade_countries_active_id', 'free_trade_countries', ['id'], True),
+    ('ix_tariff_benefits_active_code_range', 'tariff_benefits', ['tnved_code_start', 'tnved_code_end'], True),
+    ('ix_customs_fee_rates_active_value_range', 'customs_fee_rates', ['min_customs_value', 'max_customs_value'], True),
+    ('ix_brv_rates_active_valid_from', 'brv_rates', ['valid_from'], True),
+    ('ix_utilization_fees_active_code_range', 'utilization_fees', ['tnved_code_start', 'tnved_code_end'], True),
+    ('ix_excise_rates_active_category', 'excise_rates', ['category'], True),
+]
+
+
+def _excise_columns() -> set:
+    return {column['name'] for column in sa.inspect(op.get_bind()).get_columns('excise_rates')}
+
+
+def upgrade() -> None:
+    # 0004 excise_rates.is_active ni yaratmagan (model va CRUD so'rovlari undan foydalanadi)
+    if 'is_active' not in _excise_columns():
+        op.add_column(
+            'excise_rates',
+            sa.Column('is_active', sa.Boolean(), server_default=sa.true(), nullable=False)
+        )
+
+    for name, table, columns, active_only in INDEXES:
+        where = {}
+        if active_only:
+            where = {'sqlite_where': sa.text('is_active = 1'), 'postgresql_where': sa.text('is_active')}
+        op.create_index(name, table, columns, unique=False, **where)
+
+
+def downgrade() -> None:
+    for name, table, _, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
+
+    # Faqat 0004 shaklidagi jadvaldan (ustunni shu revision qo'shgan);
+    # create_all bilan yaratilgan jadvalda is_active avvaldan bor edi - qoldiriladi
+    excise_columns = _excise_columns()
+    if 'is_active' in excise_columns and 'product_name' in excise_columns and 'product_name_ru' not in excise_columns:
+        with op.batch_alter_table('excise_rates') as batch_op:
+            batch_op.drop_column('is_active')
@@ -0,0 +1,30 @@
+"""partial (is_active) index on customs_fee_rates.id for the fee schedule loader
+
+Revision ID: 0014_customs_fee_active_id
+Revises: 0013_hot_path_indexes
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0014_customs_fee_active_id'
+down_revision: Union[str, None] = '0013_hot_path_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Yig'im jadvali loaderi faol qatorlarni id tartibida o'qiydi
+    op.create_index(
+        'ix_customs_fee_rates_active_id', 'customs_fee_rates', ['id'], unique=False,
+        sqlite_where=sa.text('is_active = 1'), postgresql_where=sa.text('is_active')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_customs_fee_rates_active_id', table_name='customs_fee_rates')
@@ -0,0 +1,232 @@
+"""
+CRUD so'rovlari rejalarini tekshirish (EXPLAIN QUERY PLAN).
+
+Vaqtinchalik SQLite bazasi ilova ishga tushgandagidek (modellar + FTS) yaratiladi
+va namunaviy ma'lumotlar bilan to'ldiriladi. Har bir CRUD chaqiruvi bajariladi, uning SQL
+so'rovlari ushlanadi va ular uchun EXPLAIN QUERY PLAN olinadi. Agar biror so'rov
+jadvalni to'liq o'qisa (SCAN <jadval> yoki oddiy indeks bo'yicha SCAN) - skript
+1 kodi bilan tugaydi. Faqat faol qatorlar ustidagi qisman indeks bo'yicha o'qish ruxsat etiladi.
+
+Butun jadvalni xotiraga yuklaydigan loaderlar (RateBook, TN VED indekslari, aksiz
+daraxti) tekshirilmaydi - ular uchun id tartibida to'liq o'qish kutilgan holat.
+
+Ishga tushirish:
+    PYTHONPATH=. python scripts/check_query_plans.py
+    PYTHONPATH=. python scripts/check_query_plans.py --verbose
+
+Xuddi shu chaqiruvlar pytest testi sifatida ham bajariladi: tests/test_query_plans.py
+"""
+
+import asyncio
+import os
+import re
+import sys
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Set, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# Bazani sozlamalar o'qilishidan oldin tanlash
+_tmp_dir = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_tmp_dir.name}/query_plans.db"
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.base import Base
+from app.db.session import AsyncSessionLocal, ReadSessionLocal, engine, read_engine
+from app.models.init import (
+    TNVedCode, TariffRate, Currency, Country, FreeTradeCountry, UtilizationFee,
+    TariffBenefit, CustomsFeeRate, BRVRate
+)
+from app.models.excise import ExciseRate
+from app.crud.benefit import brv_rate, customs_fee_rate, tariff_benefit
+from app.crud.country import country, free_trade_country, load_country_registry
+from app.crud.currency import currency, load_exchange_rates
+from app.crud.data_version import data_version
+from app.crud.excise import excise
+from app.crud.tariff import tariff
+from app.crud.tnved import create_tnved_fts, tnved, tnved_trigram_store
+from app.crud.utilization import utilization_fee
+
+_SCAN_RE = re.compile(r"^SCAN (\w+)(?: USING (?:COVERING )?INDEX (\w+))?")
+
+# (nomi, CRUD chaqiruvi)
+Case = Tuple[str, Callable[[AsyncSession], Awaitable[Any]]]
+
+CASES: List[Case] = [
+    ("data_version.get_versions", lambda db: data_version.get_versions(db, ["currencies", "tariff_rates"])),
+    ("tnved.get_by_code", lambda db: tnved.get_by_code(db, code="8703231990")),
+    ("tnved.get_by_codes", lambda db: tnved.get_by_codes(db, codes=["8703231990", "8703"])),
+    ("tnved.get_by_prefixes", lambda db: tnved.get_by_prefixes(db, prefixes=["870323", "0101"])),
+    ("tnved.get_descendants", lambda db: tnved.get_descendants(db, code="8703")),
+    ("tnved.get_ancestors", lambda db: tnved.get_ancestors(db, code="8703231990")),
+    ("tnved.get_tree_children", lambda db: tnved.get_tree_children(db, code="8703")),
+    ("tnved.get_tree_path", lambda db: tnved.get_tree_path(db, code="8703231990")),
+    ("tnved.search", lambda db: tnved.search(db, q="tovar", limit=10)),
+    ("tnved.search (tavsif ichida)", lambda db: tnved.search(db, q="ova", limit=10)),
+    ("tariff.get_by_tnved_id", lambda db: tariff.get_by_tnved_id(db, tnved_id=1)),
+    ("tariff.get_by_tnved_ids", lambda db: tariff.get_by_tnved_ids(db, tnved_ids=[1, 2, 3])),
+    ("tariff.get_by_code_prefix", lambda db: tariff.get_by_code_prefix(db, code="87032319")),
+    ("tariff.resolve_by_code_prefix", lambda db: tariff.resolve_by_code_prefix(db, code="87032319")),
+    ("tariff.resolve_by_code_prefix (ota-kod)", lambda db: tariff.resolve_by_code_prefix(db, code="0101210000")),
+    ("tariff.get_effective_many", lambda db: tariff.get_effective_many(
+        db, codes={"8703231990": 6, "8703239000": 7, "0101210000": 3}
+    )),
+    ("tariff.get_resolved", lambda db: tariff.get_resolved(db, tnved_id=1)),
+    ("tariff.get_resolved_many", lambda db: tariff.get_resolved_many(db, tnved_ids=[1, 2, 3])),
+    ("currency.get_by_code_and_date", lambda db: currency.get_by_code_and_date(db, code="USD", date_obj=date.today())),
+    ("currency.get_by_codes_and_date", lambda db: currency.get_by_codes_and_date(
+        db, codes=["USD", "EUR"], date_obj=date.today()
+    )),
+    ("currency.get_latest_rate", lambda db: currency.get_latest_rate(db, code="USD")),
+    ("currency.get_latest_rates", lambda db: currency.get_latest_rates(db)),
+    ("load_exchange_rates", load_exchange_rates),
+    ("country.get_by_code", lambda db: country.get_by_code(db, code="RU")),
+    ("country.search", lambda db: country.search(db, q="ros")),
+    ("country.get_all_active", lambda db: country.get_all_active(db)),
+    ("free_trade_country.get_by_code", lambda db: free_trade_country.get_by_code(db, country_code="RU")),
+    ("free_trade_country.get_by_codes", lambda db: free_trade_country.get_by_codes(db, country_codes=["RU", "KZ"])),
+    ("free_trade_country.get_all", lambda db: free_trade_country.get_all(db)),
+    ("load_country_registry", load_country_registry),
+    ("brv_rate.get_current", lambda db: brv_rate.get_current(db)),
+    ("brv_rate.get_by_year", lambda db: brv_rate.get_by_year(db, year=date.today().year)),
+    ("customs_fee_rate.get_applicable_rate", lambda db: customs_fee_rate.get_applicable_rate(db, customs_value=5000)),
+    ("customs_fee_rate.get_schedule", lambda db: customs_fee_rate.get_schedule(db)),
+    ("tariff_benefit.get_by_tnved_code", lambda db: tariff_benefit.get_by_tnved_code(db, tnved_code="8703231990")),
+    ("tariff_benefit.get_duty_exemption", lambda db: tariff_benefit.get_duty_exemption(db, tnved_code="8703231990")),
+    ("excise.get_by_category", lambda db: excise.get_by_category(db, "tobacco")),
+    ("excise.get_all", lambda db: excise.get_all(db)),
+    ("utilization_fee.get_all_for_code_prefix", lambda db: utilization_fee.get_all_for_code_prefix(db, code_prefix="8703")),
+]
+
+
+async def seed(db: AsyncSession) -> None:
+    """Har bir jadvalga bir nechta qator (rejalar uchun ma'lumot hajmi muhim emas)"""
+    today = date.today()
+    codes = ["0101", "010121", "0101210000", "8703", "870323", "8703231990", "8703239000"]
+    db.add_all([TNVedCode(code=code, description=f"Tovar {code}", level=len(code)) for code in codes])
+    await db.flush()
+    await tnved.rebuild_hierarchy(db)
+    db.add_all([TariffRate(tnved_id=i, import_duty_percent=10.0, vat_percent=12.0) for i in (1, 3, 6)])
+    await db.flush()
+    await tariff.rebuild_resolved(db)
+
+    db.add_all([
+        Currency(code=code, rate_uzs=rate, date=today - timedelta(days=days), is_active=True)
+        for code, rate in (("USD", 12850.0), ("EUR", 14100.0), ("RUB", 130.0))
+        for days in range(3)
+    ])
+    db.add_all([
+        Country(code="RU", name_uz="Rossiya", is_rnb=True, is_active=True),
+        Country(code="CN", name_uz="Xitoy", is_active=True),
+        FreeTradeCountry(country_code="RU", country_name="Rossiya", is_active=True),
+        BRVRate(year=today.year, amount=375000.0, valid_from=date(today.year, 1, 1), is_active=True),
+        CustomsFeeRate(min_customs_value=0, max_customs_value=10000, fee_type="brv", fee_value=1.0, is_active=True),
+        ExciseRate(category="tobacco", product_name_ru="Сигареты", tnved_codes="2402", is_active=True),
+        UtilizationFee(tnved_code_start="8703", fee_type="brv_multiplier", brv_multiplier=10.0, is_active=True),
+        TariffBenefit(
+            tnved_code_start="8703", tnved_code_end="8703999999", benefit_type="duty_exempt", is_active=True
+        ),
+    ])
+    await db.commit()
+
+
+def full_scans(plan: List[str], partial_indexes: Set[str]) -> List[str]:
+    """Reja qatorlaridan to'liq o'qilgan jadvallar (qisman indeks bo'yicha o'qishdan tashqari)"""
+    tables = set(Base.metadata.tables)
+    scans = []
+    for detail in plan:
+        match = _SCAN_RE.match(detail)
+        if match and match.group(1) in tables and match.group(2) not in partial_indexes:
+            scans.append(match.group(1))
+    return scans
+
+
+async def load_partial_indexes() -> Set[str]:
+    async with read_engine.connect() as conn:
+        result = await conn.execute(text(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND sql LIKE '% WHERE %'"
+        ))
+        return {row.name for row in result}
+
+
+async def explain(statement: str, parameters: Any) -> List[str]:
+    async with read_engine.connect() as conn:
+        result = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        return [row[-1] for row in result]
+
+
+# (SQL so'rovi, reja qatorlari, to'liq o'qilgan jadvallar)
+Plan = Tuple[str, List[str], List[str]]
+
+
+async def collect_plans() -> Dict[str, List[Plan]]:
+    """Bazani tayyorlab, har bir chaqiruv bajargan so'rovlar rejalarini olish (nomi -> rejalar)"""
+    if not str(engine.url).endswith(os.environ["DATABASE_URL"].split("///", 1)[-1]):
+        # Ilova sozlamalari bu moduldan oldin o'qilgan - haqiqiy bazaga yozmaslik uchun
+        raise RuntimeError("check_query_plans ilova modullaridan oldin import qilinishi kerak")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await create_tnved_fts(conn)
+
+    async with AsyncSessionLocal() as db:
+        await seed(db)
+
+    # Xotiradagi indekslar oldindan quriladi - ularning to'liq o'qishi tekshirilmaydi
+    async with ReadSessionLocal() as db:
+        await tnved_trigram_store.get(db)
+
+    partial_indexes = await load_partial_indexes()
+    captured: List[Tuple[str, Any]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    event.listen(read_engine.sync_engine, "before_cursor_execute", capture)
+    plans: Dict[str, List[Plan]] = {}
+    try:
+        for name, call in CASES:
+            captured.clear()
+            async with ReadSessionLocal() as db:
+                await call(db)
+            plans[name] = []
+            for statement, parameters in list(captured):
+                plan = await explain(statement, parameters)
+                plans[name].append((statement, plan, full_scans(plan, partial_indexes)))
+    finally:
+        event.remove(read_engine.sync_engine, "before_cursor_execute", capture)
+        await read_engine.dispose()
+        await engine.dispose()
+    return plans
+
+
+async def main(verbose: bool) -> int:
+    plans = await collect_plans()
+
+    failures = 0
+    for name, statements in plans.items():
+        if not statements:
+            print(f"?    {name}: so'rov bajarilmadi")
+            continue
+        for _, plan, scans in statements:
+            status = "FAIL" if scans else "ok"
+            if scans:
+                failures += 1
+            if scans or verbose:
+                print(f"{status:4} {name}: {', '.join(scans) or 'indeks'}")
+                for detail in plan:
+                    print(f"       {detail}")
+            else:
+                print(f"ok   {name}")
+
+    print()
+    print(f"{len(plans)} ta chaqiruv, {failures} ta to'liq skan")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main("--verbose" in sys.argv)))
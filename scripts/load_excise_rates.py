@@ -5,6 +5,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from sqlalchemy import select, delete
 from app.db.session import AsyncSessionLocal
+from app.crud.data_version import data_version
 from app.models.excise import ExciseRate
 
 
@@ -321,6 +322,7 @@ async def load_excise_rates():
             session.add(excise)
             loaded += 1
         
+        await data_version.bump(session, ExciseRate.__tablename__)
         await session.commit()
         print(f"✅ {loaded} ta aksiz stavkasi yuklandi")
         result = await session.execute(
@@ -5,9 +5,10 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from app.core.config import settings
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from app.db.base import Base
+from app.crud.tariff import after_tnved_write
+from app.db.session import engine
 from app.models.tnved import TNVedCode
 from app.models.tariff import TariffRate
 SAMPLE_TNVED = [
@@ -125,8 +126,6 @@ SAMPLE_TARIFFS = [
 async def main():
     print("🔢 TNVED kodlar va tariflarni yuklamoqda...")
     
-    engine = create_async_engine(settings.SQLALCHEMY_DATABASE_URI, echo=False)
-    
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     
@@ -150,6 +149,8 @@ async def main():
             if not existing.first():
                 session.add(TariffRate(**item, is_active=True))
         
+        await session.flush()
+        await after_tnved_write(session)
         await session.commit()
         print(f"✅ {len(SAMPLE_TARIFFS)} ta tarif yuklandi")
     
@@ -5,6 +5,7 @@ sys.path.insert(0, '/home/brave/Prog/bojxona-backend')
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from app.db.session import AsyncSessionLocal
+from app.crud.tariff import after_tnved_write
 from app.parsers.lex_uz_parser import LexUzParser
 from app.models.tariff import TariffRate
 from app.models.tnved import TNVedCode
@@ -26,6 +27,7 @@ async def load_tariffs():
     print("\n2. Bazaga yuklash...")
     
     async with AsyncSessionLocal() as db:
+        await db.execute(text("DELETE FROM resolved_tariffs"))
         await db.execute(text("DELETE FROM tariff_rates"))
         await db.commit()
         print("   Eski tariff_rates tozalandi")        
@@ -63,6 +65,8 @@ async def load_tariffs():
                     db.add(tariff_rate)
                     added_tariffs += 1
         
+        await db.flush()
+        await after_tnved_write(db)
         await db.commit()
         print(f"   Qo'shilgan TN VED kodlar: {added_tnved}")
         print(f"   Qo'shilgan tariff stavkalar: {added_tariffs}")
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+"""
+Katta hisoblash fayllarini (CSV / Excel) vektorlashtirilgan dvigatel bilan qayta hisoblash.
+
+Misol:
+    PYTHONPATH=. python scripts/recalculate_batch.py lines.csv results.csv
+
+Kirish ustunlari: code, price, weight (majburiy), currency, quantity, country_origin,
+has_certificate, delivery_cost, insurance_cost, engine_volume, vehicle_age
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pandas as pd
+
+from app.db.session import AsyncSessionLocal
+from app.services.batch_engine import calculate_frame
+from app.services.rate_book import load_rate_book
+
+
+def read_frame(path: Path) -> pd.DataFrame:
+    if path.suffix.lower() in (".xlsx", ".xls"):
+        return pd.read_excel(path, dtype={"code": str})
+    return pd.read_csv(path, dtype={"code": str})
+
+
+def write_frame(frame: pd.DataFrame, path: Path) -> None:
+    if path.suffix.lower() in (".xlsx", ".xls"):
+        frame.to_excel(path, index=False)
+    else:
+        frame.to_csv(path, index=False)
+
+
+async def main(input_path: Path, output_path: Path):
+    frame = read_frame(input_path)
+    print(f" {len(frame)} ta qator o'qildi: {input_path}")
+
+    async with AsyncSessionLocal() as db:
+        book = await load_rate_book(db)
+    print(f" Ma'lumotnoma yuklandi: {len(book.codes)} ta TN VED kod ({book.version})")
+
+    started = time.perf_counter()
+    result = calculate_frame(book, frame)
+    elapsed = time.perf_counter() - started
+
+    write_frame(result, output_path)
+
+    failed = int(result["error"].notna().sum())
+    print(f" Hisoblandi: {len(result) - failed} ta qator, xatolar: {failed} ({elapsed:.2f} s)")
+    print(f" Jami to'lovlar: {result['total_uzs'].sum():,.2f} so'm")
+    print(f" Natija: {output_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hisoblash faylini qayta hisoblash")
+    parser.add_argument("input", type=Path, help="Kirish fayli (.csv yoki .xlsx)")
+    parser.add_argument("output", type=Path, help="Natija fayli (.csv yoki .xlsx)")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.input, args.output))
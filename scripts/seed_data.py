@@ -5,8 +5,9 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from datetime import date
 from sqlalchemy import text
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from app.core.config import settings
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.crud.data_version import data_version
+from app.db.session import engine
 from app.db.base import Base
 from app.models.country import Country, FreeTradeCountry
 from app.models.benefit import BRVRate, CustomsFeeRate
@@ -17,17 +18,17 @@ from app.models.tariff import TariffRate
 
 COUNTRIES = [
     {"code": "UZ", "name_uz": "O'zbekiston", "name_ru": "Узбекистан", "name_en": "Uzbekistan"},
-    {"code": "RU", "name_uz": "Rossiya", "name_ru": "Россия", "name_en": "Russia"},
-    {"code": "KZ", "name_uz": "Qozog'iston", "name_ru": "Казахстан", "name_en": "Kazakhstan"},
-    {"code": "KG", "name_uz": "Qirg'iziston", "name_ru": "Кыргызстан", "name_en": "Kyrgyzstan"},
-    {"code": "TJ", "name_uz": "Tojikiston", "name_ru": "Таджикистан", "name_en": "Tajikistan"},
-    {"code": "TM", "name_uz": "Turkmaniston", "name_ru": "Туркменистан", "name_en": "Turkmenistan"},
-    {"code": "BY", "name_uz": "Belarusiya", "name_ru": "Беларусь", "name_en": "Belarus"},
-    {"code": "AM", "name_uz": "Armaniston", "name_ru": "Армения", "name_en": "Armenia"},
-    {"code": "AZ", "name_uz": "Ozarbayjon", "name_ru": "Азербайджан", "name_en": "Azerbaijan"},
-    {"code": "MD", "name_uz": "Moldova", "name_ru": "Молдова", "name_en": "Moldova"},
-    {"code": "GE", "name_uz": "Gruziya", "name_ru": "Грузия", "name_en": "Georgia"},
-    {"code": "UA", "name_uz": "Ukraina", "name_ru": "Украина", "name_en": "Ukraine"},
+    {"code": "RU", "name_uz": "Rossiya", "name_ru": "Россия", "name_en": "Russia", "is_rnb": True},
+    {"code": "KZ", "name_uz": "Qozog'iston", "name_ru": "Казахстан", "name_en": "Kazakhstan", "is_rnb": True},
+    {"code": "KG", "name_uz": "Qirg'iziston", "name_ru": "Кыргызстан", "name_en": "Kyrgyzstan", "is_rnb": True},
+    {"code": "TJ", "name_uz": "Tojikiston", "name_ru": "Таджикистан", "name_en": "Tajikistan", "is_rnb": True},
+    {"code": "TM", "name_uz": "Turkmaniston", "name_ru": "Туркменистан", "name_en": "Turkmenistan", "is_rnb": True},
+    {"code": "BY", "name_uz": "Belarusiya", "name_ru": "Беларусь", "name_en": "Belarus", "is_rnb": True},
+    {"code": "AM", "name_uz": "Armaniston", "name_ru": "Армения", "name_en": "Armenia", "is_rnb": True},
+    {"code": "AZ", "name_uz": "Ozarbayjon", "name_ru": "Азербайджан", "name_en": "Azerbaijan", "is_rnb": True},
+    {"code": "MD", "name_uz": "Moldova", "name_ru": "Молдова", "name_en": "Moldova", "is_rnb": True},
+    {"code": "GE", "name_uz": "Gruziya", "name_ru": "Грузия", "name_en": "Georgia", "is_rnb": True},
+    {"code": "UA", "name_uz": "Ukraina", "name_ru": "Украина", "name_en": "Ukraine", "is_rnb": True},
     {"code": "CN", "name_uz": "Xitoy", "name_ru": "Китай", "name_en": "China"},
     {"code": "TR", "name_uz": "Turkiya", "name_ru": "Турция", "name_en": "Turkey"},
     {"code": "KR", "name_uz": "Janubiy Koreya", "name_ru": "Южная Корея", "name_en": "South Korea"},
@@ -66,16 +67,15 @@ BRV_RATES = [
     {"year": 2024, "amount": 340000, "valid_from": date(2024, 1, 1), "valid_until": date(2024, 12, 31)},
     {"year": 2025, "amount": 375000, "valid_from": date(2025, 1, 1), "valid_until": None},  
 ]
+# TP-55: bojxona qiymati (USD) bo'yicha BRV koeffitsientlari
 CUSTOMS_FEE_RATES = [
-    {
-        "min_customs_value": 0,
-        "max_customs_value": None,
-        "fee_type": "percent",
-        "fee_value": 0.2,  
-        "min_fee": 50000,  
-        "max_fee": 3000000,  
-        "description": "Standart bojxona rasmiylash yig'imi"
-    }
+    {"min_customs_value": 0, "max_customs_value": 1000, "value_currency": "USD", "fee_type": "brv", "fee_value": 0.3, "description": "$1,000 gacha"},
+    {"min_customs_value": 1000, "max_customs_value": 5000, "value_currency": "USD", "fee_type": "brv", "fee_value": 0.5, "description": "$1,000 - $5,000"},
+    {"min_customs_value": 5000, "max_customs_value": 10000, "value_currency": "USD", "fee_type": "brv", "fee_value": 1.0, "description": "$5,000 - $10,000"},
+    {"min_customs_value": 10000, "max_customs_value": 20000, "value_currency": "USD", "fee_type": "brv", "fee_value": 1.5, "description": "$10,000 - $20,000"},
+    {"min_customs_value": 20000, "max_customs_value": 50000, "value_currency": "USD", "fee_type": "brv", "fee_value": 3.0, "description": "$20,000 - $50,000"},
+    {"min_customs_value": 50000, "max_customs_value": 100000, "value_currency": "USD", "fee_type": "brv", "fee_value": 5.0, "description": "$50,000 - $100,000"},
+    {"min_customs_value": 100000, "max_customs_value": None, "value_currency": "USD", "fee_type": "brv", "fee_value": 10.0, "description": "$100,000 dan yuqori"},
 ]
 
 UTILIZATION_FEES = [
@@ -211,8 +211,6 @@ async def seed_currencies(db: AsyncSession):
 
 async def main():
     print("Starting database seeding...")    
-    engine = create_async_engine(settings.SQLALCHEMY_DATABASE_URI, echo=False)
-    
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     
@@ -225,6 +223,16 @@ async def main():
         await seed_brv_rates(db)
         await seed_customs_fee_rates(db)
         await seed_utilization_fees(db)
+        await data_version.bump(
+            db,
+            Currency.__tablename__,
+            Country.__tablename__,
+            FreeTradeCountry.__tablename__,
+            BRVRate.__tablename__,
+            CustomsFeeRate.__tablename__,
+            UtilizationFee.__tablename__,
+        )
+        await db.commit()
     
     await engine.dispose()
     print("Database seeding completed!")
@@ -5,6 +5,7 @@ import os
 sys.path.append(os.getcwd())
 
 from sqlalchemy import select
+from app.crud.tariff import after_tnved_write
 from app.db.session import AsyncSessionLocal
 from app.models.tnved import TNVedCode
 from app.models.tariff import TariffRate
@@ -38,6 +39,8 @@ async def seed():
             db.add(tariff)
             await db.commit()
             print("Added Tariff Rates")
+        await after_tnved_write(db)
+        await db.commit()
         curr = await db.get(Currency, 1)
         if not curr:
             c = Currency(
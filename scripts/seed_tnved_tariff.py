@@ -4,6 +4,7 @@ import sys
 sys.path.insert(0, '/home/brave/Prog/bojxona-backend')
 
 from sqlalchemy import select
+from app.crud.tariff import after_tnved_write
 from app.db.session import AsyncSessionLocal
 from app.models.tnved import TNVedCode
 from app.models.tariff import TariffRate
@@ -226,6 +227,8 @@ async def seed_tnved_and_tariffs():
                     added_tariff += 1
                     print(f"    Tariff: {rates['import_duty']}% boj, {rates['excise']}% aksiz, {rates['vat']}% QQS")
         
+        await db.flush()
+        await after_tnved_write(db)
         await db.commit()
         
         print(f"\n=== Natija ===")
@@ -5,10 +5,10 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from app.core.config import settings
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from app.parsers.currency_updater import CurrencyUpdater
 from app.db.base import Base
+from app.db.session import engine
 from app.models.currency import Currency
 
 
@@ -16,11 +16,6 @@ async def main():
     print(" CBU valyuta kurslarini yuklamoqda...")
     print(f"   API: https://cbu.uz/uz/arkhiv-kursov-valyut/json/")
     print()
-    engine = create_async_engine(
-        settings.SQLALCHEMY_DATABASE_URI,
-        echo=False
-    )
-    
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     
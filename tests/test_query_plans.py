@@ -0,0 +1,30 @@
+"""
+CRUD so'rovlari jadvalni to'liq o'qimasligi (EXPLAIN QUERY PLAN).
+
+Chaqiruvlar, namunaviy ma'lumotlar va tekshiruv qoidasi scripts/check_query_plans.py
+dan olinadi; skript ilova modullaridan oldin import qilinib vaqtinchalik bazani tanlaydi.
+"""
+
+from scripts import check_query_plans
+
+import asyncio
+from typing import Dict, List
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def plans() -> Dict[str, List[check_query_plans.Plan]]:
+    return asyncio.run(check_query_plans.collect_plans())
+
+
+@pytest.mark.parametrize("name", [name for name, _ in check_query_plans.CASES])
+def test_no_full_scan(plans, name):
+    statements = plans[name]
+    assert statements, f"{name}: so'rov bajarilmadi"
+
+    failures = [
+        f"{', '.join(scans)}: {statement}\n" + "\n".join(plan)
+        for statement, plan, scans in statements if scans
+    ]
+    assert not failures, "\n\n".join(failures)